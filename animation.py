@@ -0,0 +1,297 @@
+"""
+Animation Player for Tic-Tac-Toe Game
+Plays frame generators on a dedicated render thread so game logic never blocks
+"""
+
+import time
+import threading
+from collections import deque
+from config import ANIMATION_FPS, FRAME_DEADLINE_TOLERANCE
+from metrics import REGISTRY
+
+# Deadlines of every FrameScheduler in the process
+FRAMES_MISSED = REGISTRY.counter(
+    'tictactoe_frame_deadline_misses_total', "Animation frames pushed late or merged"
+)
+FRAMES_MERGED = REGISTRY.counter(
+    'tictactoe_frames_merged_total', "Animation frames merged into a later push"
+)
+
+
+def pause(seconds):
+    """
+    A single empty frame that holds for a while.
+
+    Args:
+        seconds: How long to hold
+
+    Yields:
+        The hold time
+    """
+    yield seconds
+
+
+def frame_steps(duration, fps=ANIMATION_FPS):
+    """
+    Split a duration into evenly spaced frames.
+
+    Args:
+        duration: Total seconds
+        fps: Frames per second
+
+    Yields:
+        (progress, hold) for each frame, where progress runs from 0.0 up
+        to (but not including) 1.0 and the holds add up to the duration
+    """
+    count = max(1, round(duration * fps))
+    for i in range(count):
+        yield i / count, duration / count
+
+
+class FrameScheduler:
+    """
+    Paces frames against absolute deadlines on the monotonic clock.
+
+    Each frame is due once the holds of all frames before it have passed,
+    counted from start(). Time spent drawing and pushing is therefore taken
+    out of the holds rather than added to them, and an animation lasts as
+    long as its holds add up to. A frame that is only ready after its own
+    hold has run out is merged into the next one: it stays in the back
+    buffers but is not pushed on its own. Frames with no hold are pushed as
+    soon as they are ready and never count as missed.
+    """
+
+    def __init__(self, commit, tolerance=FRAME_DEADLINE_TOLERANCE,
+                 clock=time.monotonic):
+        """
+        Initialize the scheduler.
+
+        Args:
+            commit: Function that pushes the current frame
+            tolerance: Seconds a frame may be late before it counts as missed
+            clock: Monotonic time source
+        """
+        self.commit = commit
+        self.tolerance = tolerance
+        self.clock = clock
+        self.deadline = None
+
+        # Statistics
+        self.frames = 0
+        self.missed = 0
+        self.dropped = 0
+        self.max_lag = 0.0
+
+    def start(self):
+        """Make the next frame due now."""
+        self.deadline = self.clock()
+
+    def step(self, hold):
+        """
+        Push the frame just drawn, unless it is already too late to be seen.
+
+        Args:
+            hold: Seconds the frame should stay up
+
+        Returns:
+            Seconds to wait before drawing the next frame, or None if the
+            frame was merged into the next one
+        """
+        if self.deadline is None:
+            self.start()
+        due = self.deadline
+        self.deadline += hold
+        lag = self.clock() - due
+        if hold > 0 and lag > self.tolerance:
+            self.missed += 1
+            FRAMES_MISSED.inc()
+            self.max_lag = max(self.max_lag, lag)
+            if lag >= hold:
+                # Too late to be seen: leave it for the next push
+                self.dropped += 1
+                FRAMES_MERGED.inc()
+                return None
+        self.commit()
+        self.frames += 1
+        return max(0.0, self.deadline - self.clock())
+
+    def flush(self):
+        """Push a merged last frame, which stays up however late it is."""
+        self.commit()
+        self.frames += 1
+
+    def run(self, frames, wait=time.sleep):
+        """
+        Play a frame generator, continuing from the current deadline.
+
+        Args:
+            frames: Iterator that draws a frame and yields its hold time
+            wait: Function sleeping for a number of seconds; if it returns
+                  True, playback stops (e.g. Event.wait on a cancel flag)
+
+        Returns:
+            True if played to the end, False if stopped by wait()
+        """
+        delay = 0.0
+        for hold in frames:
+            delay = self.step(hold)
+            if delay is not None and wait(delay):
+                return False
+        if delay is None:
+            self.flush()
+        return True
+
+    def get_stats(self):
+        """
+        Get scheduling statistics.
+
+        Returns:
+            Dict with frames pushed, missed deadlines, frames merged into a
+            later push, and the worst lag behind a deadline in seconds
+        """
+        return {
+            'frames': self.frames,
+            'missed': self.missed,
+            'dropped': self.dropped,
+            'max_lag': self.max_lag,
+        }
+
+
+class AnimationPlayer:
+    """
+    Plays animations on a background render thread.
+
+    An animation is a sequence of frame generators. Each generator draws
+    a frame into the LEDManager back buffers and yields how long to hold it;
+    the player pushes the frame and waits out the hold on its own clock.
+    The frame generators of one animation share a FrameScheduler timeline,
+    so the animation lasts as long as its holds add up to.
+    """
+
+    def __init__(self, leds):
+        """
+        Initialize the player and start the render thread.
+
+        Args:
+            leds: LEDManager whose frames are committed after each step
+        """
+        self.leds = leds
+        self.scheduler = FrameScheduler(leds.commit)
+        self._queue = deque()
+        self._cond = threading.Condition()
+        self._cancel = threading.Event()
+        self._busy = False
+        self._stopping = False
+        self._thread = threading.Thread(
+            target=self._run, name="render", daemon=True
+        )
+        self._thread.start()
+
+    def play(self, *frames, on_done=None):
+        """
+        Queue an animation and return immediately.
+
+        Args:
+            frames: Frame generators, played one after another
+            on_done: Optional function called on the render thread when
+                     the animation finishes without being cancelled
+        """
+        with self._cond:
+            self._queue.append((frames, on_done))
+            self._cond.notify_all()
+
+    def cancel(self):
+        """
+        Stop the current animation and drop any queued ones.
+
+        Blocks until the render thread has left the current frame, so the
+        caller may draw on the LEDs as soon as this returns. The on_done
+        callbacks of cancelled animations are not called.
+        """
+        with self._cond:
+            self._queue.clear()
+            if not self._busy:
+                return
+            self._cancel.set()
+            while self._busy:
+                self._cond.wait()
+            self._cancel.clear()
+
+    def is_busy(self):
+        """
+        Check if an animation is playing or queued.
+
+        Returns:
+            True if the player has work, False if idle
+        """
+        with self._cond:
+            return self._busy or bool(self._queue)
+
+    def wait(self, timeout=None):
+        """
+        Block until all queued animations have finished.
+
+        Args:
+            timeout: Maximum seconds to wait, or None to wait forever
+
+        Returns:
+            True if the player is idle, False on timeout
+        """
+        with self._cond:
+            return self._cond.wait_for(
+                lambda: not self._busy and not self._queue, timeout
+            )
+
+    def stop(self):
+        """Cancel everything and shut down the render thread."""
+        self.cancel()
+        with self._cond:
+            self._stopping = True
+            self._cond.notify_all()
+        self._thread.join()
+
+    def _run(self):
+        """Render thread main loop."""
+        while True:
+            with self._cond:
+                while not self._queue and not self._stopping:
+                    self._cond.wait()
+                if self._stopping:
+                    return
+                frames, on_done = self._queue.popleft()
+                self._busy = True
+
+            try:
+                completed = self._play(frames)
+            except Exception as e:
+                print(f"Animation failed: {e}")
+                completed = False
+
+            with self._cond:
+                self._busy = False
+                self._cond.notify_all()
+
+            if completed and on_done is not None:
+                try:
+                    on_done()
+                except Exception as e:
+                    print(f"Animation callback failed: {e}")
+
+    def _play(self, sequence):
+        """
+        Play a sequence of frame generators.
+
+        Args:
+            sequence: Frame generators to play in order
+
+        Returns:
+            True if played to the end, False if cancelled
+        """
+        self.scheduler.start()
+        for frames in sequence:
+            try:
+                if not self.scheduler.run(frames, self._cancel.wait):
+                    return False
+            finally:
+                frames.close()
+        return True
@@ -0,0 +1,250 @@
+#!/usr/bin/env python3
+"""
+Animation Cache for Tic-Tac-Toe
+Renders the startup, draw and every win animation once into frame
+sequences, stores them in a binary file and memory-maps it on start
+
+File layout (little-endian):
+    header   magic b'TTTA', uint16 version, uint16 reserved, 32-byte key,
+             uint32 tile count, uint32 step count, uint32 op count,
+             uint32 index size
+    index    JSON object mapping animation name to [first step, step count]
+    steps    step count x (uint32 first op, uint16 op count, uint8 fade
+             step, 1 pad, float32 hold)
+    ops      op count x (uint16 panel, uint16 tile)
+    tiles    tile count x one panel of RGB bytes, as drawn (before gamma
+             and brightness)
+             
+A step is one frame: the panels its ops draw, the fade level and the hold
+time. Only panels that change are stored, and identical panel images are
+stored once, so e.g. the draw pulse is a single tile played at different
+fade levels. The key is a hash of config.py and the rendering code; when it
+no longer matches, the file is rebuilt.
+
+Usage:
+    python3 animation_cache.py      # (re)build the cache file
+"""
+
+import os
+import json
+import mmap
+import struct
+import hashlib
+from config import ANIMATION_CACHE_PATH, LEDS_PER_MATRIX, NUM_PANELS
+
+MAGIC = b'TTTA'
+VERSION = 1
+HEADER = struct.Struct('<4sHH32sIIII')
+STEP = struct.Struct('<IHBxf')
+OP = struct.Struct('<HH')
+TILE_SIZE = 3 * LEDS_PER_MATRIX
+
+# Files whose contents decide what the animations look like
+SOURCE_FILES = (
+    'config.py', 'led_manager.py', 'patterns.py', 'glyphs.py', 'animation_cache.py',
+    'animation.py', 'colors.py'
+)
+
+
+def cache_key():
+    """
+    Hash everything the cached frames depend on.
+    
+    Returns:
+        32-byte SHA-256 digest
+    """
+    digest = hashlib.sha256(struct.pack('<H', VERSION))
+    here = os.path.dirname(os.path.abspath(__file__))
+    for name in SOURCE_FILES:
+        with open(os.path.join(here, name), 'rb') as f:
+            digest.update(f.read())
+    return digest.digest()
+
+
+def animation_names():
+    """
+    Names of all cached animations and how to render them live.
+    
+    Returns:
+        Dict mapping name to a function taking an LEDManager and returning
+        its live frame generator
+    """
+    from game_controller import winning_lines
+    from config import BOARD_WIDTH, BOARD_HEIGHT, WIN_LENGTH
+    
+    names = {
+        'startup': lambda leds: leds.render_startup_frames(),
+        'draw': lambda leds: leds.render_draw_frames(),
+    }
+    for line in winning_lines(BOARD_WIDTH, BOARD_HEIGHT, WIN_LENGTH):
+        names[win_name(line)] = lambda leds, line=line: leds.render_win_frames(line)
+    return names
+
+
+def win_name(winning_line):
+    """Cache name of the win animation for a winning line."""
+    return 'win:' + ','.join(str(panel_num) for panel_num in sorted(winning_line))
+
+
+def build(path=ANIMATION_CACHE_PATH):
+    """
+    Render every animation and write the cache file.
+    
+    Each animation is rendered live from a dark board, and every frame is
+    stored as the panels that differ from the frame before. The state left
+    behind when an animation finishes is stored as a final frame with no
+    hold.
+    
+    Args:
+        path: Output file path
+        
+    Returns:
+        Number of distinct panel images written
+    """
+    from hardware import MemoryBackend
+    from led_manager import LEDManager
+    from config import EMPTY_COLOR
+    
+    leds = LEDManager(MemoryBackend(record_frames=False), animation_cache=None)
+    tile_ids = {}
+    tiles = []
+    steps = []
+    ops = []
+    index = {}
+    
+    def panel_tile(panel_num):
+        row, offset = leds._get_row_and_offset(panel_num)
+        return bytes(leds.compositor.frames[row][3 * offset:3 * offset + TILE_SIZE])
+    
+    def add_step(shown, hold):
+        first = len(ops)
+        for panel_num in range(NUM_PANELS):
+            tile = panel_tile(panel_num)
+            if tile != shown[panel_num]:
+                shown[panel_num] = tile
+                tile_id = tile_ids.get(tile)
+                if tile_id is None:
+                    tile_id = tile_ids[tile] = len(tiles)
+                    tiles.append(tile)
+                ops.append(OP.pack(panel_num, tile_id))
+        lut = leds.compositor.lut
+        fade = leds.colors.fade_steps if lut is None else leds.colors.levels.index(lut)
+        changed = len(ops) > first or fade != shown[-1]
+        shown[-1] = fade
+        steps.append(STEP.pack(first, len(ops) - first, fade, hold))
+        return changed
+    
+    for name, render in animation_names().items():
+        first = len(steps)
+        leds.clear_all()
+        # Panel images and fade step as of the last stored frame
+        shown = [bytes(EMPTY_COLOR) * LEDS_PER_MATRIX] * NUM_PANELS + [None]
+        for hold in render(leds):
+            add_step(shown, hold)
+        # Keep the final state only if the animation changed it after its
+        # last frame
+        if not add_step(shown, 0):
+            steps.pop()
+        index[name] = [first, len(steps) - first]
+    
+    index_data = json.dumps(index, separators=(',', ':')).encode()
+    # Pad the index so the tables after it stay 4-byte aligned
+    index_data += b' ' * (-len(index_data) % 4)
+    
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(HEADER.pack(
+            MAGIC, VERSION, 0, cache_key(),
+            len(tiles), len(steps), len(ops), len(index_data)
+        ))
+        f.write(index_data)
+        f.write(b''.join(steps))
+        f.write(b''.join(ops))
+        f.write(b''.join(tiles))
+    os.replace(tmp_path, path)
+    return len(tiles)
+
+
+class AnimationCache:
+    """Prebuilt animation frames, memory-mapped from the cache file."""
+    
+    def __init__(self, path=ANIMATION_CACHE_PATH):
+        """
+        Load the cache, rebuilding the file first if it is missing or stale.
+        
+        Args:
+            path: Cache file path
+        """
+        self.path = path
+        try:
+            self._open()
+        except (OSError, ValueError, struct.error):
+            print(f"Building animation cache: {path}")
+            build(path)
+            self._open()
+    
+    def _open(self):
+        with open(self.path, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            (magic, version, _, key, tile_count, step_count, op_count,
+             index_size) = HEADER.unpack_from(self._mmap)
+            if magic != MAGIC or version != VERSION:
+                raise ValueError(f"Not an animation cache (version {VERSION}): {self.path}")
+            if key != cache_key():
+                raise ValueError(f"Stale animation cache: {self.path}")
+            steps_start = HEADER.size + index_size
+            ops_start = steps_start + STEP.size * step_count
+            self._tiles_start = ops_start + OP.size * op_count
+            if len(self._mmap) != self._tiles_start + TILE_SIZE * tile_count:
+                raise ValueError(f"Truncated animation cache: {self.path}")
+            self.index = json.loads(self._mmap[HEADER.size:steps_start])
+            self._steps = list(STEP.iter_unpack(self._mmap[steps_start:ops_start]))
+            self._ops = list(OP.iter_unpack(self._mmap[ops_start:self._tiles_start]))
+        except Exception:
+            self._mmap.close()
+            raise
+        self._view = memoryview(self._mmap)
+    
+    def __contains__(self, name):
+        return name in self.index
+    
+    def frames(self, leds, name):
+        """
+        Play back a cached animation.
+        
+        Args:
+            leds: LEDManager to draw on
+            name: Animation name
+            
+        Yields:
+            Seconds to hold each frame after it is pushed
+        """
+        first, count = self.index[name]
+        places = [leds._get_row_and_offset(panel_num) for panel_num in range(NUM_PANELS)]
+        blit = leds.compositor.blit
+        view = self._view
+        tiles_start = self._tiles_start
+        set_lut = leds.compositor.set_lut
+        fade_steps = leds.colors.fade_steps
+        luts = [leds.colors.lut(step / fade_steps) for step in range(fade_steps + 1)]
+        try:
+            for first_op, op_count, fade, hold in self._steps[first:first + count]:
+                for panel_num, tile_id in self._ops[first_op:first_op + op_count]:
+                    row, offset = places[panel_num]
+                    start = tiles_start + tile_id * TILE_SIZE
+                    blit(row, offset, view[start:start + TILE_SIZE])
+                set_lut(luts[fade])
+                yield hold
+        finally:
+            leds.set_fade(1.0)
+    
+    def close(self):
+        """Release the memory map."""
+        self._view.release()
+        self._mmap.close()
+
+
+if __name__ == "__main__":
+    count = build()
+    print(f"Wrote {count} frames to {ANIMATION_CACHE_PATH}")
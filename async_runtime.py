@@ -0,0 +1,167 @@
+"""
+Asyncio Runtime for Tic-Tac-Toe
+Button presses as awaitable events and animations as cancellable tasks, so
+the game can run on an asyncio event loop that sleeps without any periodic
+wakeups while the board is idle
+"""
+
+import asyncio
+from collections import deque
+from animation import FrameScheduler
+
+
+class AsyncButtonEvents:
+    """Awaitable view of an InputEventQueue fed by the GPIO event thread."""
+
+    def __init__(self, events):
+        """
+        Attach to a queue. Must be called on the running event loop.
+
+        Args:
+            events: InputEventQueue the button handler puts presses into
+        """
+        self.events = events
+        self._loop = asyncio.get_running_loop()
+        self._ready = asyncio.Event()
+        events.listener = self._wake
+
+    def _wake(self):
+        """Called on the GPIO event thread after each press or wake()."""
+        self._loop.call_soon_threadsafe(self._ready.set)
+
+    async def get(self):
+        """
+        Wait for the next button press.
+
+        Returns:
+            The oldest ButtonEvent, or None if woken without one (see
+            InputEventQueue.wake())
+        """
+        waited = False
+        while True:
+            event = self.events.get(timeout=0)
+            if event is not None or waited:
+                return event
+            # No await since the check above, so a wakeup for a press queued
+            # in between is still pending and sets the flag again
+            self._ready.clear()
+            await self._ready.wait()
+            waited = True
+
+    def close(self):
+        """Detach from the queue."""
+        if self.events.listener == self._wake:
+            self.events.listener = None
+
+
+class AsyncAnimationPlayer:
+    """
+    AnimationPlayer counterpart that plays animations as a task on the
+    running event loop instead of a render thread.
+
+    It has the same play/cancel/is_busy/stop interface, and wait() is a
+    coroutine. All methods must be called on the event loop's thread.
+    Frames are pushed on that thread too, so a push holds up the loop for
+    as long as the strips take.
+    """
+
+    def __init__(self, leds):
+        """
+        Initialize the player.
+
+        Args:
+            leds: LEDManager whose frames are committed after each step
+        """
+        self.leds = leds
+        self.scheduler = FrameScheduler(leds.commit)
+        self._queue = deque()
+        self._task = None
+        # Frame generator playing now
+        self._frames = None
+
+    def play(self, *frames, on_done=None):
+        """
+        Queue an animation and return immediately.
+
+        Args:
+            frames: Frame generators, played one after another
+            on_done: Optional function called on the event loop when the
+                     animation finishes without being cancelled
+        """
+        self._queue.append((frames, on_done))
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    def cancel(self):
+        """
+        Stop the current animation and drop any queued ones.
+
+        The current frame generator is closed before this returns, so the
+        caller may draw on the LEDs right away. The on_done callbacks of
+        cancelled animations are not called.
+        """
+        self._queue.clear()
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        if self._frames is not None:
+            self._frames.close()
+            self._frames = None
+
+    def is_busy(self):
+        """
+        Check if an animation is playing or queued.
+
+        Returns:
+            True if the player has work, False if idle
+        """
+        return self._task is not None
+
+    async def wait(self):
+        """Wait until all queued animations have finished."""
+        while self._task is not None:
+            await asyncio.wait({self._task})
+
+    def stop(self):
+        """Cancel everything."""
+        self.cancel()
+
+    async def _run(self):
+        """Play queued animations until the queue is empty."""
+        try:
+            while self._queue:
+                frames, on_done = self._queue.popleft()
+                try:
+                    await self._play(frames)
+                except Exception as e:
+                    print(f"Animation failed: {e}")
+                    continue
+                if on_done is not None:
+                    on_done()
+        finally:
+            if self._task is asyncio.current_task():
+                self._task = None
+
+    async def _play(self, sequence):
+        """
+        Play a sequence of frame generators.
+
+        Args:
+            sequence: Frame generators to play in order
+        """
+        scheduler = self.scheduler
+        scheduler.start()
+        for frames in sequence:
+            self._frames = frames
+            try:
+                delay = 0.0
+                for hold in frames:
+                    delay = scheduler.step(hold)
+                    if delay is not None:
+                        await asyncio.sleep(delay)
+                if delay is None:
+                    scheduler.flush()
+            finally:
+                if self._frames is frames:
+                    self._frames = None
+                frames.close()
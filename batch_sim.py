@@ -0,0 +1,445 @@
+#!/usr/bin/env python3
+"""
+Batch Self-Play Simulator for Tic-Tac-Toe
+Plays very large numbers of games at once on NumPy arrays of boards and
+reports outcome distributions per pair of policies
+
+Every game in a batch advances one ply per step: the side to move picks a
+cell with its policy for all games at once, and wins are found by testing
+all boards against the winning lines in one array operation. Batches can
+be spread over a process pool to use every core.
+
+Policies:
+    random      uniformly random empty cell
+    center      center first, then corners, then edges (random tie-break)
+    greedy      win if possible, else block, else random
+    perfect     perfect play from the solver table (3x3 board only)
+    NAME@P      play NAME with probability P, else random (e.g. perfect@0.8)
+    
+Usage:
+    python3 batch_sim.py --games 1000000 --x random --o perfect --workers 4
+"""
+
+import sys
+import json
+import time
+import argparse
+from multiprocessing import Pool, cpu_count
+
+import numpy as np
+
+from config import BOARD_WIDTH, BOARD_HEIGHT, WIN_LENGTH
+from game_controller import winning_lines
+
+POLICIES = ('random', 'center', 'greedy', 'perfect')
+
+# Games simulated per array batch
+BATCH_SIZE = 100_000
+
+# Dense best-move table for the perfect policy, built once per process
+_perfect_table = None
+
+
+def parse_policy(spec):
+    """
+    Split a policy spec into its name and skill level.
+    
+    Args:
+        spec: Policy name, optionally with '@P' for the probability of
+              playing it instead of a random move
+              
+    Returns:
+        Tuple of (name, probability)
+    """
+    name, _, skill = spec.partition('@')
+    if name not in POLICIES:
+        raise ValueError(f"Unknown policy '{name}' (choose from {', '.join(POLICIES)})")
+    skill = float(skill) if skill else 1.0
+    if not 0.0 <= skill <= 1.0:
+        raise ValueError(f"Policy skill must be between 0 and 1: {spec}")
+    return name, skill
+
+
+def _perfect_moves():
+    """
+    Build the dense best-move table used by the perfect policy.
+    
+    Returns:
+        uint16 array indexed by base-3 position code (X = 1, O = 2), holding
+        the 9-bit mask of best moves (0 for unreachable or finished games)
+    """
+    global _perfect_table
+    if _perfect_table is None:
+        from solver import Solver
+        solver = Solver()
+        table = np.zeros(3 ** 9, dtype=np.uint16)
+        for code in range(3 ** 9):
+            x_bits = o_bits = 0
+            rest = code
+            for cell in range(9):
+                rest, value = divmod(rest, 3)
+                if value == 1:
+                    x_bits |= 1 << cell
+                elif value == 2:
+                    o_bits |= 1 << cell
+            try:
+                _, moves = solver.lookup(x_bits, o_bits)
+            except KeyError:
+                continue
+            for cell in moves:
+                table[code] |= 1 << cell
+        solver.close()
+        _perfect_table = table
+    return _perfect_table
+
+
+class BoardBatch:
+    """A batch of games on boolean board arrays, one row per game."""
+    
+    def __init__(self, n_games, width, height, win_length, rng):
+        """
+        Start a batch of empty boards.
+        
+        Args:
+            n_games: Number of games in the batch
+            width: Panels per row
+            height: Number of rows
+            win_length: Marks in a row needed to win
+            rng: numpy.random.Generator
+        """
+        self.n = n_games
+        self.width = width
+        self.height = height
+        self.cells = width * height
+        self.rng = rng
+        self.lines = np.array(winning_lines(width, height, win_length), dtype=np.intp)
+        self.x = np.zeros((n_games, self.cells), dtype=bool)
+        self.o = np.zeros((n_games, self.cells), dtype=bool)
+        
+        # Static cell preference for the center policy: center, corners, edges
+        rows, cols = np.divmod(np.arange(self.cells), width)
+        dist = np.abs(rows - (height - 1) / 2) + np.abs(cols - (width - 1) / 2)
+        corner = ((rows == 0) | (rows == height - 1)) & ((cols == 0) | (cols == width - 1))
+        self.preference = -dist + np.where(corner, 0.5, 0.0)
+        
+        self.ternary = 3 ** np.arange(self.cells, dtype=np.int64)
+    
+    def empty(self):
+        """Boolean array of empty cells."""
+        return ~(self.x | self.o)
+    
+    def has_line(self, board):
+        """
+        Test every board for a complete line.
+        
+        Args:
+            board: Boolean (games, cells) array of one player's marks
+            
+        Returns:
+            Boolean array, True where the player has a winning line
+        """
+        return board[:, self.lines].all(axis=2).any(axis=1)
+    
+    def _pick(self, scores, empty):
+        """Pick the highest scoring empty cell per game, random tie-break."""
+        noise = self.rng.random(scores.shape)
+        return np.argmax(np.where(empty, scores + noise, -np.inf), axis=1)
+    
+    def _completing_cells(self, board, empty):
+        """
+        Find cells that would complete a line for a player.
+        
+        Args:
+            board: Boolean (games, cells) array of the player's marks
+            empty: Boolean (games, cells) array of empty cells
+            
+        Returns:
+            Boolean (games, cells) array of winning cells
+        """
+        k = self.lines.shape[1]
+        own = board[:, self.lines].sum(axis=2)                  # (games, lines)
+        free = empty[:, self.lines]                             # (games, lines, k)
+        ready = (own == k - 1) & free.any(axis=2)
+        hits = np.zeros_like(board)
+        games, lines = np.nonzero(ready)
+        if games.size:
+            line_cells = self.lines[lines]                      # (hits, k)
+            free_cells = free[games, lines]                     # (hits, k)
+            hits[games[:, None].repeat(k, 1)[free_cells], line_cells[free_cells]] = True
+        return hits
+    
+    def choose(self, policy, skill, mover, other):
+        """
+        Choose a move for every game.
+        
+        Args:
+            policy: Policy name
+            skill: Probability of playing the policy instead of a random move
+            mover: Boolean board of the side to move
+            other: Boolean board of the opponent
+            
+        Returns:
+            Array with one cell index per game
+        """
+        empty = self.empty()
+        zeros = np.zeros(empty.shape)
+        
+        if policy == 'random':
+            moves = self._pick(zeros, empty)
+        elif policy == 'center':
+            moves = self._pick(zeros + 2 * self.preference, empty)
+        elif policy == 'greedy':
+            wins = self._completing_cells(mover, empty)
+            blocks = self._completing_cells(other, empty)
+            moves = self._pick(4.0 * wins + 2.0 * blocks, empty)
+        elif policy == 'perfect':
+            if self.cells != 9:
+                raise ValueError("The perfect policy needs the classic 3x3 board")
+            x_side = mover if mover is self.x else other
+            o_side = other if mover is self.x else mover
+            codes = x_side @ self.ternary + 2 * (o_side @ self.ternary)
+            best = _perfect_moves()[codes].astype(np.int64)
+            best_cells = (best[:, None] >> np.arange(9)) & 1
+            moves = self._pick(2.0 * best_cells, empty)
+        else:
+            raise ValueError(f"Unknown policy '{policy}'")
+        
+        if skill < 1.0:
+            random_moves = self._pick(zeros, empty)
+            use_random = self.rng.random(self.n) >= skill
+            moves = np.where(use_random, random_moves, moves)
+        return moves
+
+
+class SimulationResult:
+    """Aggregated outcomes of many games between two policies."""
+    
+    def __init__(self, cells):
+        """
+        Start empty counts.
+        
+        Args:
+            cells: Number of panels on the board
+        """
+        self.games = 0
+        self.x_wins = 0
+        self.o_wins = 0
+        self.draws = 0
+        self.total_moves = 0
+        # Outcome counts per opening cell: columns are X win, O win, draw
+        self.by_opening = np.zeros((cells, 3), dtype=np.int64)
+    
+    def add(self, winner, length, opening):
+        """
+        Add a batch of finished games.
+        
+        Args:
+            winner: int8 array, 1 = X won, 2 = O won, 0 = draw
+            length: Number of moves in each game
+            opening: X's first cell in each game
+        """
+        self.games += winner.size
+        self.x_wins += int(np.count_nonzero(winner == 1))
+        self.o_wins += int(np.count_nonzero(winner == 2))
+        self.draws += int(np.count_nonzero(winner == 0))
+        self.total_moves += int(length.sum())
+        column = np.where(winner == 0, 2, winner - 1)
+        np.add.at(self.by_opening, (opening, column), 1)
+    
+    def merge(self, other):
+        """Add another result's counts to this one."""
+        self.games += other.games
+        self.x_wins += other.x_wins
+        self.o_wins += other.o_wins
+        self.draws += other.draws
+        self.total_moves += other.total_moves
+        self.by_opening += other.by_opening
+        return self
+    
+    def summary(self):
+        """
+        Outcome distribution.
+        
+        Returns:
+            Dict with rates, the first-move advantage (X win rate minus
+            O win rate), the mean game length and per-opening outcome rates
+        """
+        games = max(self.games, 1)
+        opening = {}
+        for cell, (x_wins, o_wins, draws) in enumerate(self.by_opening.tolist()):
+            played = x_wins + o_wins + draws
+            if played:
+                opening[cell] = {
+                    'games': played,
+                    'x_win_rate': x_wins / played,
+                    'o_win_rate': o_wins / played,
+                    'draw_rate': draws / played,
+                }
+        return {
+            'games': self.games,
+            'x_win_rate': self.x_wins / games,
+            'o_win_rate': self.o_wins / games,
+            'draw_rate': self.draws / games,
+            'first_move_advantage': (self.x_wins - self.o_wins) / games,
+            'mean_length': self.total_moves / games,
+            'by_opening': opening,
+        }
+
+
+def simulate_batch(n_games, policy_x, policy_o, seed=None, width=BOARD_WIDTH,
+                   height=BOARD_HEIGHT, win_length=WIN_LENGTH):
+    """
+    Play one batch of games to the end.
+    
+    Args:
+        n_games: Number of games
+        policy_x: Policy spec for X
+        policy_o: Policy spec for O
+        seed: Random seed
+        width: Panels per row
+        height: Number of rows
+        win_length: Marks in a row needed to win
+        
+    Returns:
+        SimulationResult
+    """
+    rng = np.random.default_rng(seed)
+    batch = BoardBatch(n_games, width, height, win_length, rng)
+    policies = (parse_policy(policy_x), parse_policy(policy_o))
+    
+    winner = np.zeros(n_games, dtype=np.int8)
+    length = np.full(n_games, batch.cells, dtype=np.int64)
+    opening = np.zeros(n_games, dtype=np.intp)
+    active = np.ones(n_games, dtype=bool)
+    games = np.arange(n_games)
+    
+    for ply in range(batch.cells):
+        side = ply % 2
+        mover, other = (batch.x, batch.o) if side == 0 else (batch.o, batch.x)
+        name, skill = policies[side]
+        moves = batch.choose(name, skill, mover, other)
+        
+        # Finished games keep their final position
+        mover[games[active], moves[active]] = True
+        if ply == 0:
+            opening[:] = moves
+        
+        won = active & batch.has_line(mover)
+        winner[won] = side + 1
+        length[won] = ply + 1
+        active &= ~won
+        if not active.any():
+            break
+    
+    result = SimulationResult(batch.cells)
+    result.add(winner, length, opening)
+    return result
+
+
+def _simulate_chunk(args):
+    """Process pool entry point for simulate_batch()."""
+    return simulate_batch(*args)
+
+
+def simulate(n_games, policy_x='random', policy_o='random', workers=1,
+             batch_size=BATCH_SIZE, seed=None, width=BOARD_WIDTH,
+             height=BOARD_HEIGHT, win_length=WIN_LENGTH):
+    """
+    Simulate many games between two policies.
+    
+    Args:
+        n_games: Total number of games
+        policy_x: Policy spec for X
+        policy_o: Policy spec for O
+        workers: Worker processes (1 runs in this process, None = all cores)
+        batch_size: Games per array batch
+        seed: Random seed for reproducible results
+        width: Panels per row
+        height: Number of rows
+        win_length: Marks in a row needed to win
+        
+    Returns:
+        SimulationResult with the combined counts
+    """
+    # Validate the policies before starting any workers
+    parse_policy(policy_x)
+    parse_policy(policy_o)
+    
+    seeds = np.random.SeedSequence(seed)
+    sizes = [batch_size] * (n_games // batch_size)
+    if n_games % batch_size:
+        sizes.append(n_games % batch_size)
+    chunks = [
+        (size, policy_x, policy_o, child, width, height, win_length)
+        for size, child in zip(sizes, seeds.spawn(len(sizes)))
+    ]
+    
+    result = SimulationResult(width * height)
+    if workers == 1:
+        for chunk in chunks:
+            result.merge(_simulate_chunk(chunk))
+    else:
+        with Pool(workers or cpu_count()) as pool:
+            for partial in pool.imap_unordered(_simulate_chunk, chunks):
+                result.merge(partial)
+    return result
+
+
+def parse_args(argv=None):
+    """
+    Parse command line arguments.
+    
+    Args:
+        argv: Argument list (default: sys.argv[1:])
+        
+    Returns:
+        argparse.Namespace with the parsed options
+    """
+    parser = argparse.ArgumentParser(description="Batch Tic-Tac-Toe self-play")
+    parser.add_argument('--games', type=int, default=1_000_000,
+                        help="number of games (default: %(default)s)")
+    parser.add_argument('--x', default='random', help="policy for X")
+    parser.add_argument('--o', default='random', help="policy for O")
+    parser.add_argument('--workers', type=int, default=1,
+                        help="worker processes, 0 for all cores (default: 1)")
+    parser.add_argument('--batch-size', type=int, default=BATCH_SIZE,
+                        help="games per array batch (default: %(default)s)")
+    parser.add_argument('--seed', type=int, help="random seed")
+    parser.add_argument('--json', metavar='PATH', help="write the summary to PATH")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    """Main entry point."""
+    args = parse_args(argv)
+    start = time.perf_counter()
+    result = simulate(
+        args.games, args.x, args.o, workers=args.workers or None,
+        batch_size=args.batch_size, seed=args.seed
+    )
+    elapsed = time.perf_counter() - start
+    
+    summary = result.summary()
+    
+    print(f"{result.games} games, X = {args.x}, O = {args.o} "
+          f"({result.games / elapsed:,.0f} games/s)")
+    print(f"  X wins: {summary['x_win_rate']:.2%}   O wins: {summary['o_win_rate']:.2%}"
+          f"   draws: {summary['draw_rate']:.2%}")
+    print(f"  first-move advantage: {summary['first_move_advantage']:+.2%}"
+          f"   mean length: {summary['mean_length']:.2f} moves")
+    print("  by opening cell:")
+    for cell, stats in summary['by_opening'].items():
+        print(f"    {cell}: X {stats['x_win_rate']:.2%}  O {stats['o_win_rate']:.2%}"
+              f"  draw {stats['draw_rate']:.2%}  ({stats['games']} games)")
+    
+    if args.json:
+        report = dict(summary, policy_x=args.x, policy_o=args.o,
+                      seconds=elapsed, games_per_second=result.games / elapsed)
+        with open(args.json, 'w') as f:
+            json.dump(report, f, indent=2)
+            f.write('\n')
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,434 @@
+#!/usr/bin/env python3
+"""
+Benchmark Suite for Tic-Tac-Toe Game
+Measures game logic, rendering and full-game throughput on the in-memory
+hardware backend, and compares results against a stored baseline
+
+Usage:
+    python3 benchmark.py                          # run and print results
+    python3 benchmark.py --json results.json      # also write JSON results
+    python3 benchmark.py --save-baseline base.json
+    python3 benchmark.py --baseline base.json     # exit 1 on regression
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import platform
+import contextlib
+
+from hardware import MemoryBackend, set_backend
+
+# Registered benchmarks: name -> (function, unit, higher_is_better)
+BENCHMARKS = {}
+
+# Default allowed slowdown before a result counts as a regression
+DEFAULT_TOLERANCE = 0.20
+
+
+def benchmark(name, unit, higher_is_better=True):
+    """
+    Register a benchmark function.
+
+    The function takes the minimum measuring time in seconds and returns a
+    single number in the given unit.
+
+    Args:
+        name: Benchmark name used in results and baselines
+        unit: Unit of the returned value
+        higher_is_better: True for rates, False for times
+    """
+    def register(func):
+        BENCHMARKS[name] = (func, unit, higher_is_better)
+        return func
+    return register
+
+
+def measure(func, min_time):
+    """
+    Time repeated calls of a function.
+
+    Args:
+        func: Function taking no arguments
+        min_time: Minimum total seconds to spend calling it
+
+    Returns:
+        Best observed seconds per call over several rounds
+    """
+    # Calibrate the number of calls per round
+    loops = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(loops):
+            func()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time / 10:
+            break
+        loops *= 2
+
+    best = elapsed / loops
+    rounds = max(1, int(min_time / max(elapsed, 1e-9)))
+    for _ in range(min(rounds, 10) - 1):
+        start = time.perf_counter()
+        for _ in range(loops):
+            func()
+        best = min(best, (time.perf_counter() - start) / loops)
+    return best
+
+
+@contextlib.contextmanager
+def quiet():
+    """Silence the console output the game prints on every move."""
+    with open(os.devnull, 'w') as devnull:
+        with contextlib.redirect_stdout(devnull):
+            yield
+
+
+def memory_backend():
+    """Create a headless backend that counts pushes without storing frames."""
+    return set_backend(MemoryBackend(record_frames=False))
+
+
+# A full game won by X on the top row, and a full drawn game
+WIN_GAME = [0, 3, 1, 4, 2]
+DRAW_GAME = [0, 1, 2, 4, 3, 5, 7, 6, 8]
+
+
+@benchmark('make_move', 'ops/s')
+def bench_make_move(min_time):
+    from game_controller import GameController
+    with quiet():
+        game = GameController()
+
+        def play():
+            game.reset_game()
+            for panel_num in DRAW_GAME:
+                game.make_move(panel_num)
+
+        return len(DRAW_GAME) / measure(play, min_time)
+
+
+@benchmark('check_win', 'ops/s')
+def bench_check_win(min_time):
+    from game_controller import GameController
+    with quiet():
+        game = GameController()
+        for panel_num in DRAW_GAME[:-1]:
+            game.make_move(panel_num)
+    return 1 / measure(game._check_win, min_time)
+
+
+@benchmark('pattern_to_pixel_indices', 'us/call', higher_is_better=False)
+def bench_pattern_to_pixel_indices(min_time):
+    from patterns import PATTERN_X, pattern_to_pixel_indices
+    return 1e6 * measure(lambda: pattern_to_pixel_indices(PATTERN_X), min_time)
+
+
+@benchmark('set_panel_pattern', 'us/call', higher_is_better=False)
+def bench_set_panel_pattern(min_time):
+    from led_manager import LEDManager
+    from patterns import PATTERN_X, PATTERN_O
+    from config import PLAYER_X_COLOR, PLAYER_O_COLOR
+    with quiet():
+        leds = LEDManager(memory_backend())
+    state = [0]
+
+    def place():
+        # Alternate symbols so every call really changes the panel
+        state[0] ^= 1
+        if state[0]:
+            leds.set_panel_pattern(4, PATTERN_X, PLAYER_X_COLOR)
+        else:
+            leds.set_panel_pattern(4, PATTERN_O, PLAYER_O_COLOR)
+
+    return 1e6 * measure(place, min_time)
+
+
+def frames_per_second(make_frames, min_time):
+    """
+    Count frames an animation can render and push with its holds skipped.
+
+    Args:
+        make_frames: Function taking an LEDManager and returning frames
+        min_time: Minimum seconds to measure
+
+    Returns:
+        Frames per second
+    """
+    from led_manager import LEDManager
+    with quiet():
+        leds = LEDManager(memory_backend())
+    count = [0]
+
+    def play():
+        for _ in make_frames(leds):
+            leds.commit()
+            count[0] += 1
+
+    # Count frames for a single playthrough
+    count[0] = 0
+    play()
+    frames = count[0]
+    return frames / measure(play, min_time)
+
+
+@benchmark('animate_win', 'frames/s')
+def bench_animate_win(min_time):
+    return frames_per_second(lambda leds: leds.win_frames([0, 4, 8]), min_time)
+
+
+@benchmark('animate_draw', 'frames/s')
+def bench_animate_draw(min_time):
+    return frames_per_second(lambda leds: leds.draw_frames(), min_time)
+
+
+@benchmark('image_frames', 'frames/s')
+def bench_image_frames(min_time):
+    import numpy as np
+    from config import BOARD_WIDTH, BOARD_HEIGHT, MATRIX_SIZE
+    # A scrolling color gradient, generated up front
+    y, x = np.mgrid[0:BOARD_HEIGHT * MATRIX_SIZE, 0:BOARD_WIDTH * MATRIX_SIZE]
+    images = [
+        np.stack([(x * 10 + t) % 256, (y * 10 + t) % 256, (x + y + t) % 256], axis=-1)
+        .astype(np.uint8)
+        for t in range(0, 256, 16)
+    ]
+    return frames_per_second(lambda leds: leds.image_frames(images), min_time)
+
+
+@benchmark('replay', 'frames/s')
+def bench_replay(min_time):
+    from replay import Replayer
+    from game_log import GameRecord
+    games = [
+        GameRecord(0, WIN_GAME, [0.5 * i for i in range(len(WIN_GAME))], 'X', [0, 1, 2]),
+        GameRecord(0, DRAW_GAME, [0.5 * i for i in range(len(DRAW_GAME))]),
+    ]
+    return frames_per_second(
+        lambda leds: Replayer(leds, speed=0).replay_frames(games), min_time
+    )
+
+
+def wall_frame_time(parallel, min_time):
+    """
+    Time pushing a full frame to every row, with WS2812B wire timing.
+
+    Simulated on the memory backend: each strip sleeps out its wire time,
+    and the parallel push overlaps those sleeps on worker threads. This
+    bounds what pushing rows together can save; it does not exercise the
+    ws281x driver, where rows sharing a channel are pushed in turn.
+
+    Args:
+        parallel: Push the rows through Backend.show_strips() together
+        min_time: Minimum seconds to measure
+
+    Returns:
+        Milliseconds per frame
+    """
+    from led_manager import LEDManager
+    backend = MemoryBackend(record_frames=False, wire_time=True)
+    set_backend(backend)
+    with quiet():
+        leds = LEDManager(backend, animation_cache=None)
+    compositor = leds.compositor
+    compositor.show_strips = backend.show_strips if parallel else None
+
+    def push():
+        compositor.invalidate()
+        compositor.commit()
+
+    try:
+        return 1e3 * measure(push, min_time)
+    finally:
+        backend.cleanup()
+
+
+@benchmark('wall_frame_serial', 'simulated ms/frame', higher_is_better=False)
+def bench_wall_frame_serial(min_time):
+    return wall_frame_time(False, min_time)
+
+
+@benchmark('wall_frame_parallel', 'simulated ms/frame', higher_is_better=False)
+def bench_wall_frame_parallel(min_time):
+    return wall_frame_time(True, min_time)
+
+
+@benchmark('full_game', 'games/s')
+def bench_full_game(min_time):
+    from main import TicTacToeGame
+    with quiet():
+        game = TicTacToeGame(memory_backend(), game_log_path=None)
+        game.reset_game()
+
+        def play():
+            for panel_num in WIN_GAME:
+                game.on_button_press(panel_num)
+            # Any press skips the end-of-game animation and starts a new game
+            game.on_button_press(0)
+
+        try:
+            return 1 / measure(play, min_time)
+        finally:
+            game.animator.stop()
+
+
+@benchmark('sessions_per_core', 'tables')
+def bench_sessions_per_core(min_time):
+    from sessions import capacity
+    # Simulated seconds per trial; the search runs several trials
+    with quiet():
+        return capacity(duration=10 * min_time)['tables']
+
+
+@benchmark('spectator_fanout', 'ms/update', higher_is_better=False)
+def bench_spectator_fanout(min_time):
+    import socket
+    from spectators import SpectatorServer
+    from config import NUM_PANELS, WIN_LENGTH
+    clients_count = 256
+    with quiet():
+        server = SpectatorServer(0, host='127.0.0.1')
+    clients = [socket.create_connection(('127.0.0.1', server.port))
+               for _ in range(clients_count)]
+    # Full board sent on connect: header, marks and winning line
+    board_size = 6 + NUM_PANELS + WIN_LENGTH
+
+    def receive(client, size):
+        data = b''
+        while len(data) < size:
+            data += client.recv(size - len(data))
+
+    def publish():
+        server.move(4, 'X')
+        for client in clients:
+            receive(client, 3)
+
+    try:
+        for client in clients:
+            receive(client, board_size)
+        return 1e3 * measure(publish, min_time)
+    finally:
+        for client in clients:
+            client.close()
+        server.close()
+
+
+def run_benchmarks(names, min_time):
+    """
+    Run benchmarks.
+
+    Args:
+        names: Benchmark names to run
+        min_time: Minimum seconds to measure each benchmark
+
+    Returns:
+        Dict mapping name to {'value', 'unit', 'higher_is_better'}
+    """
+    results = {}
+    for name in names:
+        func, unit, higher_is_better = BENCHMARKS[name]
+        value = func(min_time)
+        results[name] = {
+            'value': value,
+            'unit': unit,
+            'higher_is_better': higher_is_better,
+        }
+        print(f"  {name:<28}{value:>14.2f} {unit}")
+    return results
+
+
+def compare(results, baseline, tolerance):
+    """
+    Compare results against a baseline.
+
+    Args:
+        results: Results from run_benchmarks()
+        baseline: Benchmarks dict from a saved baseline
+        tolerance: Allowed fractional slowdown (0.2 = 20%)
+
+    Returns:
+        List of (name, baseline value, new value, change) for regressions
+    """
+    regressions = []
+    for name, result in results.items():
+        base = baseline.get(name)
+        if base is None or not base['value']:
+            continue
+        change = (result['value'] - base['value']) / base['value']
+        if not result['higher_is_better']:
+            change = -change
+        marker = ''
+        if change < -tolerance:
+            regressions.append((name, base['value'], result['value'], change))
+            marker = '  REGRESSION'
+        print(f"  {name:<28}{base['value']:>14.2f} -> {result['value']:<14.2f}"
+              f"{change * 100:+7.1f}%{marker}")
+    return regressions
+
+
+def parse_args(argv=None):
+    """
+    Parse command line arguments.
+
+    Args:
+        argv: Argument list (default: sys.argv[1:])
+
+    Returns:
+        argparse.Namespace with the parsed options
+    """
+    parser = argparse.ArgumentParser(description="Tic-Tac-Toe benchmarks")
+    parser.add_argument('names', nargs='*', metavar='NAME',
+                        help="benchmarks to run (default: all): "
+                             + ', '.join(BENCHMARKS))
+    parser.add_argument('--min-time', type=float, default=0.5,
+                        help="minimum seconds to measure each benchmark")
+    parser.add_argument('--json', metavar='PATH',
+                        help="write machine-readable results to PATH")
+    parser.add_argument('--baseline', metavar='PATH',
+                        help="compare against a saved baseline; exit 1 on regression")
+    parser.add_argument('--save-baseline', metavar='PATH',
+                        help="save these results as a baseline")
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE,
+                        help="allowed fractional slowdown (default: %(default)s)")
+    args = parser.parse_args(argv)
+    unknown = [name for name in args.names if name not in BENCHMARKS]
+    if unknown:
+        parser.error(f"unknown benchmark(s): {', '.join(unknown)}")
+    return args
+
+
+def main(argv=None):
+    """Main entry point."""
+    args = parse_args(argv)
+    names = args.names or list(BENCHMARKS)
+
+    print("Running benchmarks:")
+    results = run_benchmarks(names, args.min_time)
+    report = {
+        'python': platform.python_version(),
+        'machine': platform.machine(),
+        'timestamp': time.time(),
+        'benchmarks': results,
+    }
+
+    for path in (args.json, args.save_baseline):
+        if path:
+            with open(path, 'w') as f:
+                json.dump(report, f, indent=2)
+                f.write('\n')
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)['benchmarks']
+        print(f"\nCompared to {args.baseline} (tolerance {args.tolerance:.0%}):")
+        regressions = compare(results, baseline, args.tolerance)
+        if regressions:
+            print(f"\n{len(regressions)} benchmark(s) regressed!")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
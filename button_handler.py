@@ -3,37 +3,46 @@ Button Input Handler for Tic-Tac-Toe Game
 Handles button press detection with debouncing
 """
 
-import RPi.GPIO as GPIO
 import time
+import threading
 from config import BUTTON_PINS, BUTTON_DEBOUNCE
+from hardware import get_backend
+from metrics import REGISTRY
+
+# Button edges of both button inputs, by debounce outcome
+EDGES_ACCEPTED = REGISTRY.counter(
+    'tictactoe_button_edges_total', "Button edges by debounce outcome", result='accepted'
+)
+EDGES_REJECTED = REGISTRY.counter(
+    'tictactoe_button_edges_total', "Button edges by debounce outcome", result='rejected'
+)
 
 
 class ButtonHandler:
     """Manages button input detection with debouncing."""
     
-    def __init__(self, callback=None):
+    def __init__(self, callback=None, backend=None):
         """
         Initialize button handler.
         
         Args:
-            callback: Function to call when button is pressed, receives panel_num
+            callback: Function to call when button is pressed, receives
+                      panel_num and the time.perf_counter() value of the edge
+            backend: Hardware backend (default: the process-wide backend)
         """
         self.callback = callback
+        self.backend = backend or get_backend()
         self.last_press_time = {}
-        
-        # Set up GPIO
-        GPIO.setmode(GPIO.BCM)
+        self._panel_for_pin = {pin: num for num, pin in BUTTON_PINS.items()}
         
         # Configure all button pins as inputs with pull-up resistors
         for panel_num, pin in BUTTON_PINS.items():
-            GPIO.setup(pin, GPIO.IN, pull_up_down=GPIO.PUD_UP)
-            self.last_press_time[panel_num] = 0
+            self.last_press_time[panel_num] = float('-inf')
             
             # Add event detection for button press (falling edge = button press)
-            GPIO.add_event_detect(
+            self.backend.setup_input(
                 pin,
-                GPIO.FALLING,
-                callback=self._button_callback,
+                self._button_callback,
                 bouncetime=int(BUTTON_DEBOUNCE * 1000)  # Convert to milliseconds
             )
         
@@ -46,26 +55,24 @@ class ButtonHandler:
         Args:
             channel: GPIO pin number that triggered the event
         """
-        # Find which panel number this pin corresponds to
-        panel_num = None
-        for num, pin in BUTTON_PINS.items():
-            if pin == channel:
-                panel_num = num
-                break
+        edge_time = time.perf_counter()
         
+        # Find which panel number this pin corresponds to
+        panel_num = self._panel_for_pin.get(channel)
         if panel_num is None:
             return
         
         # Check debounce time
-        current_time = time.time()
-        if current_time - self.last_press_time[panel_num] < BUTTON_DEBOUNCE:
+        if edge_time - self.last_press_time[panel_num] < BUTTON_DEBOUNCE:
+            EDGES_REJECTED.inc()
             return
         
-        self.last_press_time[panel_num] = current_time
+        self.last_press_time[panel_num] = edge_time
+        EDGES_ACCEPTED.inc()
         
         # Call the user callback if set
         if self.callback:
-            self.callback(panel_num)
+            self.callback(panel_num, edge_time)
     
     def wait_for_button(self):
         """
@@ -76,17 +83,18 @@ class ButtonHandler:
             Panel number (0-8) of the pressed button
         """
         pressed_panel = [None]  # Use list to allow modification in nested function
+        pressed = threading.Event()
         
-        def temp_callback(panel_num):
+        def temp_callback(panel_num, edge_time):
             pressed_panel[0] = panel_num
+            pressed.set()
         
         # Temporarily override callback
         old_callback = self.callback
         self.callback = temp_callback
         
-        # Wait for button press
-        while pressed_panel[0] is None:
-            time.sleep(0.01)
+        # Sleep until the GPIO event thread reports a press
+        pressed.wait()
         
         # Restore old callback
         self.callback = old_callback
@@ -108,9 +116,9 @@ class ButtonHandler:
             return False
         
         # Button is pressed when pin reads LOW (pulled to ground)
-        return GPIO.input(pin) == GPIO.LOW
+        return not self.backend.read_input(pin)
     
     def cleanup(self):
         """Clean up GPIO resources."""
         print("Cleaning up button handler")
-        GPIO.cleanup()
+        self.backend.cleanup()
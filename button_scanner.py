@@ -0,0 +1,189 @@
+"""
+Scanned Button Input for Tic-Tac-Toe Game
+Reads all button lines in one batched request per tick of a fixed scan
+clock and debounces each line with an integrator state machine
+"""
+
+import threading
+import time
+from config import BUTTON_PINS, BUTTON_SCAN_INTERVAL, BUTTON_SCAN_SAMPLES
+from hardware import get_backend
+from button_handler import EDGES_ACCEPTED, EDGES_REJECTED
+
+
+class ButtonScanner:
+    """
+    Debounced button input with a drop-in ButtonHandler interface.
+
+    Each line has an integrator that counts up on every scan that reads it
+    low (pressed) and down on every scan that reads it high, between 0 and
+    the sample count. A press is reported when it reaches the top, and the
+    button only arms again once it has counted all the way back down, so
+    contact bounce can neither double a press nor hide a quick one. Presses
+    that settle on the same scan are reported in panel order.
+
+    While every button is released and settled the scan clock stops and the
+    thread sleeps until a falling edge, so an idle board causes no wakeups.
+    """
+
+    def __init__(self, callback=None, backend=None,
+                 interval=BUTTON_SCAN_INTERVAL, samples=BUTTON_SCAN_SAMPLES):
+        """
+        Claim the button lines and start the scan thread.
+
+        Args:
+            callback: Function to call when button is pressed, receives
+                      panel_num and the time.perf_counter() value of the
+                      press's first edge
+            backend: Hardware backend (default: the process-wide backend)
+            interval: Scan clock period in seconds
+            samples: Consecutive samples a press or release needs to count
+        """
+        self.callback = callback
+        self.backend = backend or get_backend()
+        self.interval = interval
+        self.samples = samples
+
+        self._panels = sorted(BUTTON_PINS)
+        self._index = {BUTTON_PINS[panel_num]: i for i, panel_num in enumerate(self._panels)}
+        self._lines = self.backend.input_lines([BUTTON_PINS[p] for p in self._panels])
+        self._count = [0] * len(self._panels)
+        self._pressed = [False] * len(self._panels)
+        # Time of the first edge of a press that has not settled yet
+        self._edge = [None] * len(self._panels)
+
+        # Statistics
+        self.scans = 0
+        self.overruns = 0
+        self.presses = 0
+        self._total_jitter = 0.0
+        self._max_jitter = 0.0
+        self._total_latency = 0.0
+        self._max_latency = 0.0
+
+        self._stopping = False
+        self._thread = threading.Thread(
+            target=self._run, name="button-scan", daemon=True
+        )
+        self._thread.start()
+
+        print("Button scanner initialized")
+
+    def _note_edges(self, edges):
+        """Remember the first edge time of each line that is not pressed yet."""
+        for pin, edge_time in edges.items():
+            i = self._index[pin]
+            if self._edge[i] is None and not self._pressed[i]:
+                self._edge[i] = edge_time
+
+    def _run(self):
+        """Scan thread: sleep until an edge, then scan until all lines settle."""
+        lines = self._lines
+        interval = self.interval
+        next_scan = None
+        while not self._stopping:
+            if next_scan is None:
+                # Every button is released and settled
+                self._note_edges(lines.wait_edge())
+                next_scan = time.perf_counter()
+                continue
+
+            # Sleep until the next tick, picking up edge times meanwhile
+            delay = next_scan - time.perf_counter()
+            while delay > 0 and not self._stopping:
+                self._note_edges(lines.wait_edge(delay))
+                delay = next_scan - time.perf_counter()
+            if self._stopping:
+                break
+
+            now = time.perf_counter()
+            jitter = now - next_scan
+            self.scans += 1
+            self._total_jitter += jitter
+            if jitter > self._max_jitter:
+                self._max_jitter = jitter
+            self._scan(lines.read(), now)
+
+            next_scan += interval
+            if now >= next_scan:
+                # Fell a whole tick behind: restart the clock from now
+                self.overruns += 1
+                next_scan = now + interval
+            if not any(self._count):
+                next_scan = None
+
+    def _scan(self, values, now):
+        """
+        Advance every line's integrator by one sample.
+
+        Args:
+            values: Line levels in panel order, True where high (released)
+            now: time.perf_counter() value of the read
+        """
+        samples = self.samples
+        presses = []
+        for i, high in enumerate(values):
+            count = self._count[i]
+            count = max(count - 1, 0) if high else min(count + 1, samples)
+            self._count[i] = count
+            if count == samples and not self._pressed[i]:
+                self._pressed[i] = True
+                edge_time = self._edge[i]
+                presses.append((self._panels[i], now if edge_time is None else edge_time))
+            elif count == 0:
+                if not self._pressed[i] and self._edge[i] is not None:
+                    # An edge that never settled into a press
+                    EDGES_REJECTED.inc()
+                # Released and settled; forget bounce edges of the release
+                self._pressed[i] = False
+                self._edge[i] = None
+
+        for panel_num, edge_time in presses:
+            latency = time.perf_counter() - edge_time
+            self.presses += 1
+            EDGES_ACCEPTED.inc()
+            self._total_latency += latency
+            if latency > self._max_latency:
+                self._max_latency = latency
+            if self.callback:
+                self.callback(panel_num, edge_time)
+
+    def is_button_pressed(self, panel_num):
+        """
+        Check if a specific button is currently pressed (debounced).
+
+        Args:
+            panel_num: Panel number (0-8) to check
+
+        Returns:
+            True if button is pressed, False otherwise
+        """
+        return self._pressed[self._panels.index(panel_num)]
+
+    def get_stats(self):
+        """
+        Get scan statistics.
+
+        Returns:
+            Dict with scans, overruns, presses, mean and maximum scan jitter
+            (lateness of a scan behind its tick) and mean and maximum
+            edge-to-event latency, in seconds
+        """
+        return {
+            'scans': self.scans,
+            'overruns': self.overruns,
+            'presses': self.presses,
+            'mean_jitter': self._total_jitter / self.scans if self.scans else 0.0,
+            'max_jitter': self._max_jitter,
+            'mean_latency': self._total_latency / self.presses if self.presses else 0.0,
+            'max_latency': self._max_latency,
+        }
+
+    def cleanup(self):
+        """Stop the scan thread, release the lines and clean up the backend."""
+        print("Cleaning up button scanner")
+        self._stopping = True
+        self._lines.wake()
+        self._thread.join()
+        self._lines.close()
+        self.backend.cleanup()
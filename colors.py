@@ -0,0 +1,100 @@
+"""
+Color Pipeline for the LED Matrices
+Precomputed 256-entry lookup tables that apply gamma correction, the global
+LED brightness and fade levels to whole frames in one pass
+"""
+
+from config import LED_BRIGHTNESS, LED_GAMMA, LED_FADE_STEPS
+
+# Table that leaves every value unchanged
+IDENTITY = bytes(range(256))
+
+
+def build_lut(brightness=1.0, gamma=1.0, level=1.0):
+    """
+    Build a lookup table for one output level.
+    
+    The fade level scales the input value before gamma correction, so equal
+    steps in level look like equal steps in brightness. The global
+    brightness then scales the light output linearly, like the strips'
+    own brightness setting did.
+    
+    Args:
+        brightness: Global brightness (0.0-1.0)
+        gamma: Gamma exponent (1.0 = no correction)
+        level: Fade level (0.0-1.0)
+        
+    Returns:
+        256 bytes mapping a channel value to its output value
+    """
+    return bytes(
+        min(255, round(255 * brightness * (value * level / 255) ** gamma))
+        for value in range(256)
+    )
+
+
+class ColorPipeline:
+    """
+    Gamma and brightness tables for every fade level.
+    
+    Each table is built the first time its level is used, so creating the
+    pipeline costs nothing at boot.
+    """
+    
+    def __init__(self, brightness=LED_BRIGHTNESS, gamma=LED_GAMMA,
+                 fade_steps=LED_FADE_STEPS):
+        """
+        Set up the tables.
+        
+        Args:
+            brightness: Global brightness (0.0-1.0)
+            gamma: Gamma exponent (1.0 = no correction)
+            fade_steps: Number of fade levels between off and full
+        """
+        self.brightness = brightness
+        self.gamma = gamma
+        self.fade_steps = fade_steps
+        self._levels = [None] * (fade_steps + 1)
+    
+    def _table(self, step):
+        """Get the table for a fade step, building it on first use."""
+        table = self._levels[step]
+        if table is None:
+            table = self._levels[step] = build_lut(
+                self.brightness, self.gamma, step / self.fade_steps
+            )
+        return table
+    
+    @property
+    def levels(self):
+        """Tables for every fade step, from off to full."""
+        return [self._table(step) for step in range(self.fade_steps + 1)]
+    
+    def lut(self, level=1.0):
+        """
+        Get the table for a fade level.
+        
+        Args:
+            level: Fade level (0.0-1.0), rounded to the nearest step
+            
+        Returns:
+            256-byte table for bytes.translate(), or None if the table
+            would leave every value unchanged
+        """
+        step = round(min(max(level, 0.0), 1.0) * self.fade_steps)
+        table = self._table(step)
+        return None if table == IDENTITY else table
+    
+    def apply(self, color, level=1.0):
+        """
+        Get the output value of a single color.
+        
+        Args:
+            color: RGB tuple (r, g, b)
+            level: Fade level (0.0-1.0)
+            
+        Returns:
+            RGB tuple as it is sent to the LEDs
+        """
+        table = self.lut(level) or IDENTITY
+        return tuple(table[c] for c in color)
@@ -3,10 +3,42 @@ Configuration file for Tic-Tac-Toe Raspberry Pi Zero 2 W
 GPIO pin assignments and hardware constants
 """
 
+import os
+
+# Hardware Backend
+# ================
+
+# 'rpi' drives the real LEDs and GPIO; 'ws281x' does the same with the
+# LEDs on the rpi_ws281x DMA driver directly (faster); 'memory' runs
+# headless and records everything in memory. Overridden by the
+# TICTACTOE_BACKEND environment variable or main.py --backend.
+HARDWARE_BACKEND = 'rpi'
+
+# LED signal frequency and DMA channel of the 'ws281x' backend, which
+# drives the strips through the rpi_ws281x driver without NeoPixel
+WS281X_FREQ_HZ = 800000
+WS281X_DMA = 10
+
+# Push all dirty row strips of a frame together through the backend
+# (both PWM channels in one transfer on 'ws281x') instead of one by one.
+# On 'ws281x', rows sharing a driver channel are chained on its first pin.
+LED_PARALLEL_PUSH = True
+
+# Board Geometry
+# ==============
+
+# Panels per row, rows of panels, and marks in a row needed to win.
+# BUTTON_PINS needs one pin per panel and LED_DATA_PINS one data line per
+# row of panels.
+BOARD_WIDTH = 3
+BOARD_HEIGHT = 3
+WIN_LENGTH = 3
+NUM_PANELS = BOARD_WIDTH * BOARD_HEIGHT
+
 # GPIO Pin Assignments (BCM numbering)
 # =====================================
 
-# Button Input Pins (9 buttons for 9 grid positions)
+# Button Input Pins (one button per panel, numbered row by row)
 # Buttons connect GPIO to GND when pressed (pull-up resistors enabled)
 BUTTON_PINS = {
     0: 17,  # Top-Left
@@ -21,7 +53,7 @@ BUTTON_PINS = {
 }
 
 # LED Matrix Data Pins (through SN74AHCT125N buffer)
-# Each row of 3 matrices shares one data line
+# Each row of matrices shares one data line
 LED_DATA_PINS = {
     0: 12,  # Top row (matrices 0, 1, 2) - GPIO12 (PWM0)
     1: 18,  # Middle row (matrices 3, 4, 5) - GPIO18 (PWM0 alternate)
@@ -37,24 +69,50 @@ TURN_LED_PINS = {
 # LED Matrix Configuration
 # ========================
 
-# Each WS2812B matrix is 8x8 = 64 LEDs
-LEDS_PER_MATRIX = 64
+# Each WS2812B matrix is 8x8 = 64 LEDs, numbered row by row
+MATRIX_SIZE = 8
+LEDS_PER_MATRIX = MATRIX_SIZE * MATRIX_SIZE
 
-# 3 matrices per row
-MATRICES_PER_ROW = 3
+# Matrices per row (one per panel column)
+MATRICES_PER_ROW = BOARD_WIDTH
 
 # Total LEDs per data line (row)
-LEDS_PER_ROW = LEDS_PER_MATRIX * MATRICES_PER_ROW  # 192 LEDs
+LEDS_PER_ROW = LEDS_PER_MATRIX * MATRICES_PER_ROW  # 192 LEDs for 3 matrices
 
-# LED brightness (0-255)
+# LED brightness (0.0-1.0), baked into the output color tables
 LED_BRIGHTNESS = 0.3  # 30% brightness to reduce power draw
 
+# Gamma correction applied to every channel (1.0 = off). WS2812B output is
+# linear in the channel value, which makes low values look too bright.
+LED_GAMMA = 2.8
+
+# Precomputed fade levels between off and full brightness
+LED_FADE_STEPS = 32
+
 # Button Configuration
 # ====================
 
 # Button debounce time in seconds
 BUTTON_DEBOUNCE = 0.2
 
+# How buttons are read: 'edge' registers a library callback per pin;
+# 'scan' reads all button lines in one batched request per tick of a
+# fixed scan clock and debounces them in software (gpiod on the Pi).
+# Overridden by main.py --buttons.
+BUTTON_INPUT = 'edge'
+
+# Scan clock period of the 'scan' input, and how many consecutive samples
+# a line needs before a press or release counts
+BUTTON_SCAN_INTERVAL = 0.001  # seconds
+BUTTON_SCAN_SAMPLES = 5
+
+# GPIO character device the 'scan' input reads on the Pi
+GPIO_CHIP = '/dev/gpiochip0'
+
+# Maximum number of button presses waiting for the game loop
+# (the oldest press is dropped when the queue is full)
+INPUT_QUEUE_SIZE = 32
+
 # Game Configuration
 # ==================
 
@@ -67,8 +125,38 @@ STARTUP_COLOR = (255, 255, 255) # White for startup text
 # Animation timing
 WIN_ANIMATION_DURATION = 3.0  # seconds
 STARTUP_DISPLAY_DURATION = 2.5  # seconds
+DRAW_ANIMATION_DURATION = 3.3  # seconds
 RESET_DELAY = 2.0  # seconds after win before reset
 
+# Frame rate of fades and pulses
+ANIMATION_FPS = 30
+
+# How late a frame may be pushed before it counts as a missed deadline
+FRAME_DEADLINE_TOLERANCE = 0.005  # seconds
+
+# Fast boot: set up the LEDs, buttons and indicators at the same time and
+# accept moves while the startup animation plays (a press skips it).
+# Overridden by main.py --fast-boot / --no-fast-boot.
+FAST_BOOT = True
+
+# Game loop runtime: 'threads' (render thread, blocking main loop) or
+# 'asyncio' (one event loop for presses and animations). Overridden by
+# main.py --runtime.
+RUNTIME = 'threads'
+
+# Single-player mode: 'X' or 'O' to let the board play that side with
+# perfect play, None for two players. Overridden by main.py --ai.
+AI_PLAYER = None
+
+# Solved position table, generated on first use (or by running solver.py)
+SOLVER_TABLE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                 'solver_table.bin')
+
+# Prebuilt startup, win and draw animations, rebuilt automatically when
+# this file or the rendering code changes (None to render them live)
+ANIMATION_CACHE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                    'animations.bin')
+
 # Win celebration colors (rainbow)
 WIN_COLORS = [
     (255, 0, 0),    # Red
@@ -79,3 +167,96 @@ WIN_COLORS = [
     (75, 0, 130),   # Indigo
     (148, 0, 211),  # Violet
 ]
+
+# Diagnostics
+# ===========
+
+# Number of most recent moves kept for latency percentiles
+LATENCY_WINDOW = 500
+
+# Prometheus text endpoint for the game's metrics (None to turn it off).
+# Overridden by main.py --metrics-port.
+METRICS_PORT = None
+METRICS_HOST = '127.0.0.1'
+
+# File the metrics are written to every METRICS_SNAPSHOT_INTERVAL seconds
+# (None to turn snapshots off). Overridden by main.py --metrics-file.
+METRICS_SNAPSHOT_PATH = None
+METRICS_SNAPSHOT_INTERVAL = 60.0
+
+# Multi-Table Sessions
+# ====================
+
+# Seconds without a press after which sessions.py drops a table's session
+SESSION_IDLE_TIMEOUT = 600.0
+
+# Move latency the session capacity benchmark holds at the 99th percentile
+SESSION_TARGET_LATENCY = 0.05  # seconds
+
+# Mean seconds between a table's moves in the capacity benchmark
+SESSION_MOVE_INTERVAL = 2.0
+
+# Most tables the capacity benchmark tries (a short or light load may
+# never reach the latency target)
+SESSION_MAX_TABLES = 65536
+
+# Spectators
+# ==========
+
+# TCP port main.py streams the game to for scoreboards and screens
+# (None to turn the spectator server off). Overridden by main.py --spectators.
+SPECTATOR_PORT = None
+SPECTATOR_HOST = '0.0.0.0'
+
+# Unsent bytes after which a slow client stops getting updates until it
+# has caught up (it then gets the full board once instead)
+SPECTATOR_BUFFER_LIMIT = 4096
+
+# Seconds a client may leave updates unread before it is disconnected
+SPECTATOR_STALL_TIMEOUT = 30.0
+
+# Connections accepted at the same time
+SPECTATOR_MAX_CLIENTS = 512
+
+# Game Log
+# ========
+
+# Append-only binary log of every finished game (None to turn logging off)
+GAME_LOG_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                             'games.log')
+
+# Records are written in batches of this many games, or after
+# GAME_LOG_FLUSH_INTERVAL seconds, whichever comes first
+GAME_LOG_BATCH = 16
+GAME_LOG_FLUSH_INTERVAL = 30.0
+
+# Minimum seconds between fsyncs of the log (limits SD card wear)
+GAME_LOG_FSYNC_INTERVAL = 300.0
+
+# Replay
+# ======
+
+# Playback speed of main.py --replay (0 = as fast as the strips can push)
+REPLAY_SPEED = 1.0
+
+# Longest pause between replayed moves, in recorded seconds
+REPLAY_MAX_MOVE_GAP = 3.0
+
+# Geometry Checks
+# ===============
+
+if sorted(BUTTON_PINS) != list(range(NUM_PANELS)):
+    raise ValueError(
+        f"BUTTON_PINS must map panels 0-{NUM_PANELS - 1} for a "
+        f"{BOARD_WIDTH}x{BOARD_HEIGHT} board"
+    )
+if sorted(LED_DATA_PINS) != list(range(BOARD_HEIGHT)):
+    raise ValueError(
+        f"LED_DATA_PINS must map rows 0-{BOARD_HEIGHT - 1} for a "
+        f"{BOARD_WIDTH}x{BOARD_HEIGHT} board"
+    )
+if WIN_LENGTH > max(BOARD_WIDTH, BOARD_HEIGHT):
+    raise ValueError(
+        f"WIN_LENGTH {WIN_LENGTH} does not fit a "
+        f"{BOARD_WIDTH}x{BOARD_HEIGHT} board"
+    )
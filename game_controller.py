@@ -1,16 +1,116 @@
 """
 Game Controller for Tic-Tac-Toe
 Implements game logic, win detection, and state management
+
+The board is a grid of width x height panels, won with win_length marks in
+a row (3x3 with 3 in a row by default). It is stored as two integers, one
+per player, with bit n set when that player holds panel n.
+
+Win detection is incremental: for every player and each of the four line
+directions, the length of each run of marks is kept at both ends of the
+run. Placing a mark joins the runs on either side of it in O(1) per
+direction, so only lines through the last move are ever looked at.
 """
 
 import time
-from config import RESET_DELAY
+from config import RESET_DELAY, BOARD_WIDTH, BOARD_HEIGHT, WIN_LENGTH
+from metrics import REGISTRY
+
+# Line directions as (row step, column step): row, column, diagonal,
+# anti-diagonal. Each steps towards higher panel numbers.
+DIRECTIONS = [(0, 1), (1, 0), (1, 1), (1, -1)]
+
+# Finished games of every controller in the process
+GAMES = REGISTRY.counter('tictactoe_games_total', "Games played to the end")
+WINS = {
+    player: REGISTRY.counter('tictactoe_wins_total', "Games won", player=player)
+    for player in ('X', 'O')
+}
+DRAWS = REGISTRY.counter('tictactoe_draws_total', "Games drawn")
+
+
+def winning_lines(width, height, win_length):
+    """
+    List every winning line on a board.
+    
+    Args:
+        width: Panels per row
+        height: Number of rows
+        win_length: Marks in a row needed to win
+        
+    Returns:
+        List of lines, each a list of win_length ascending panel numbers
+    """
+    lines = []
+    for dr, dc in DIRECTIONS:
+        for row in range(height):
+            for col in range(width):
+                end_row = row + dr * (win_length - 1)
+                end_col = col + dc * (win_length - 1)
+                if 0 <= end_row < height and 0 <= end_col < width:
+                    lines.append([
+                        (row + dr * i) * width + col + dc * i
+                        for i in range(win_length)
+                    ])
+    return lines
+
+
+# Neighbor and step tables per (width, height), shared by every controller
+# on a board of that size
+_geometries = {}
+
+
+def board_geometry(width, height):
+    """
+    Get the neighbor tables of a board size, building them on first use.
+    
+    Args:
+        width: Panels per row
+        height: Number of rows
+        
+    Returns:
+        (prev, next, steps): per direction, the neighbor of each panel one
+        step backwards/forwards, or -1 off the edge of the board; and per
+        panel, one (run table base, previous neighbor, next neighbor, panel
+        number step) tuple for each direction. All are tuples, since they
+        are shared.
+    """
+    geometry = _geometries.get((width, height))
+    if geometry is not None:
+        return geometry
+    
+    def cell(row, col):
+        if 0 <= row < height and 0 <= col < width:
+            return row * width + col
+        return -1
+    
+    num_panels = width * height
+    prev = []
+    next_ = []
+    for dr, dc in DIRECTIONS:
+        prev_cells = []
+        next_cells = []
+        for panel_num in range(num_panels):
+            row, col = divmod(panel_num, width)
+            prev_cells.append(cell(row - dr, col - dc))
+            next_cells.append(cell(row + dr, col + dc))
+        prev.append(tuple(prev_cells))
+        next_.append(tuple(next_cells))
+    steps = tuple(
+        tuple(
+            (d * num_panels, prev[d][panel_num], next_[d][panel_num], dr * width + dc)
+            for d, (dr, dc) in enumerate(DIRECTIONS)
+        )
+        for panel_num in range(num_panels)
+    )
+    geometry = (tuple(prev), tuple(next_), steps)
+    return _geometries.setdefault((width, height), geometry)
 
 
 class GameController:
     """Manages the Tic-Tac-Toe game logic and state."""
     
-    # Winning line combinations (panel indices)
+    # Winning line combinations (panel indices) on the classic 3x3 board
     WINNING_LINES = [
         # Rows
         [0, 1, 2],
@@ -25,91 +125,198 @@ class GameController:
         [2, 4, 6],
     ]
     
-    def __init__(self):
-        """Initialize the game controller."""
-        self.board = [None] * 9  # None = empty, 'X' or 'O' for filled
-        self.current_player = 'X'  # X always starts
-        self.game_over = False
-        self.winner = None
-        self.winning_line = None
-        print("Game controller initialized")
+    def __init__(self, verbose=True, width=BOARD_WIDTH, height=BOARD_HEIGHT,
+                 win_length=WIN_LENGTH, metrics=True):
+        """
+        Initialize the game controller.
+        
+        Args:
+            verbose: Print moves and results to the console. Turn off when
+                     running the controller in simulations.
+            width: Panels per row
+            height: Number of rows
+            win_length: Marks in a row needed to win
+            metrics: Count finished games in the process metrics. Turn off
+                     when replaying recorded games.
+        """
+        if win_length > max(width, height):
+            raise ValueError(
+                f"A {width}x{height} board cannot hold {win_length} in a row"
+            )
+        
+        self.verbose = verbose
+        self.metrics = metrics
+        self.width = width
+        self.height = height
+        self.win_length = win_length
+        self.num_panels = width * height
+        
+        # Bitmask with every panel set
+        self.full_mask = (1 << self.num_panels) - 1
+        
+        # Neighbor and step tables, shared with other boards of this size
+        self._prev, self._next, self._steps = board_geometry(width, height)
+        
+        self.reset_game(log=False)
+        self._log("Game controller initialized")
     
-    def reset_game(self):
+    def _log(self, message):
+        """Print a message if verbose output is on."""
+        if self.verbose:
+            print(message)
+    
+    @property
+    def board(self):
+        """List of one element per panel, each is None, 'X', or 'O'."""
+        x_bits = self.x_bits
+        o_bits = self.o_bits
+        return [
+            'X' if x_bits >> i & 1 else 'O' if o_bits >> i & 1 else None
+            for i in range(self.num_panels)
+        ]
+    
+    def reset_game(self, log=True):
         """Reset the game to initial state."""
-        print("Resetting game")
-        self.board = [None] * 9
-        self.current_player = 'X'
+        if log:
+            self._log("Resetting game")
+        self.x_bits = 0  # Panels held by X
+        self.o_bits = 0  # Panels held by O
+        self.current_player = 'X'  # X always starts
         self.game_over = False
         self.winner = None
         self.winning_line = None
+        self.last_move = None
+        
+        # Run lengths per player, one block of num_panels entries per
+        # direction; valid at the ends of each run
+        size = len(DIRECTIONS) * self.num_panels
+        self._runs = {'X': [0] * size, 'O': [0] * size}
     
     def is_valid_move(self, panel_num):
         """
         Check if a move is valid.
         
         Args:
-            panel_num: Panel number (0-8)
+            panel_num: Panel number (0 to num_panels - 1)
             
         Returns:
             True if the move is valid, False otherwise
         """
-        if panel_num < 0 or panel_num > 8:
+        if panel_num < 0 or panel_num >= self.num_panels:
             return False
         
         if self.game_over:
             return False
         
         # Square must be empty
-        return self.board[panel_num] is None
+        return not (self.x_bits | self.o_bits) >> panel_num & 1
     
     def make_move(self, panel_num):
         """
         Make a move on the board.
         
         Args:
-            panel_num: Panel number (0-8)
+            panel_num: Panel number (0 to num_panels - 1)
             
         Returns:
             True if move was successful, False otherwise
         """
         if not self.is_valid_move(panel_num):
-            print(f"Invalid move: panel {panel_num}")
+            self._log(f"Invalid move: panel {panel_num}")
             return False
         
         # Place the symbol
-        self.board[panel_num] = self.current_player
-        print(f"Player {self.current_player} placed at panel {panel_num}")
+        if self.current_player == 'X':
+            self.x_bits |= 1 << panel_num
+        else:
+            self.o_bits |= 1 << panel_num
+        self.last_move = panel_num
+        longest_run = self._join_runs(panel_num)
+        self._log(f"Player {self.current_player} placed at panel {panel_num}")
         
         # Check for win or draw
-        if self._check_win():
+        if longest_run >= self.win_length and self._check_win():
             self.game_over = True
             self.winner = self.current_player
-            print(f"Player {self.current_player} wins!")
+            if self.metrics:
+                GAMES.inc()
+                WINS[self.winner].inc()
+            self._log(f"Player {self.current_player} wins!")
             return True
         
         if self._check_draw():
             self.game_over = True
             self.winner = None
-            print("Game is a draw!")
+            if self.metrics:
+                GAMES.inc()
+                DRAWS.inc()
+            self._log("Game is a draw!")
             return True
         
         # Switch player
         self.current_player = 'O' if self.current_player == 'X' else 'X'
-        print(f"Turn: Player {self.current_player}")
+        self._log(f"Turn: Player {self.current_player}")
         
         return True
     
+    def _join_runs(self, panel_num):
+        """
+        Update the current player's run lengths for a newly placed mark.
+        
+        Args:
+            panel_num: Panel the current player just took
+            
+        Returns:
+            Length of the longest run through the panel
+        """
+        bits = self.x_bits if self.current_player == 'X' else self.o_bits
+        runs = self._runs[self.current_player]
+        longest = 0
+        for base, prev_cell, next_cell, step in self._steps[panel_num]:
+            before = runs[base + prev_cell] if prev_cell >= 0 and bits >> prev_cell & 1 else 0
+            after = runs[base + next_cell] if next_cell >= 0 and bits >> next_cell & 1 else 0
+            total = before + after + 1
+            
+            # Record the joined length at both far ends and at the new mark
+            runs[base + panel_num - before * step] = total
+            runs[base + panel_num + after * step] = total
+            runs[base + panel_num] = total
+            if total > longest:
+                longest = total
+        return longest
+    
     def _check_win(self):
         """
-        Check if the current player has won.
+        Check if the current player has won with the last move.
         
         Returns:
             True if current player won, False otherwise
         """
-        for line in self.WINNING_LINES:
-            if all(self.board[i] == self.current_player for i in line):
-                self.winning_line = line
-                return True
+        if self.last_move is None:
+            return False
+        
+        panel_num = self.last_move
+        bits = self.x_bits if self.current_player == 'X' else self.o_bits
+        runs = self._runs[self.current_player]
+        k = self.win_length
+        for d, (base, _, _, _) in enumerate(self._steps[panel_num]):
+            if runs[base + panel_num] < k:
+                continue
+            prev_cells = self._prev[d]
+            next_cells = self._next[d]
+            
+            # Earliest window of k marks that includes the last move
+            start = panel_num
+            for _ in range(k - 1):
+                prev_cell = prev_cells[start]
+                if prev_cell < 0 or not bits >> prev_cell & 1:
+                    break
+                start = prev_cell
+            line = [start]
+            for _ in range(k - 1):
+                line.append(next_cells[line[-1]])
+            self.winning_line = line
+            return True
         return False
     
     def _check_draw(self):
@@ -119,16 +326,16 @@ class GameController:
         Returns:
             True if game is a draw, False otherwise
         """
-        return all(square is not None for square in self.board)
+        return self.x_bits | self.o_bits == self.full_mask
     
     def get_board_state(self):
         """
         Get the current board state.
         
         Returns:
-            List of 9 elements, each is None, 'X', or 'O'
+            List of one element per panel, each is None, 'X', or 'O'
         """
-        return self.board.copy()
+        return self.board
     
     def get_current_player(self):
         """
@@ -162,7 +369,7 @@ class GameController:
         Get the winning line (if there is one).
         
         Returns:
-            List of 3 panel indices, or None if no winner
+            List of win_length panel indices, or None if no winner
         """
         return self.winning_line
     
@@ -178,13 +385,14 @@ class GameController:
     def print_board(self):
         """Print the current board state to console (for debugging)."""
         print("\nCurrent Board:")
-        for row in range(3):
+        board = self.board
+        for row in range(self.height):
             line = []
-            for col in range(3):
-                idx = row * 3 + col
-                symbol = self.board[idx] if self.board[idx] else ' '
+            for col in range(self.width):
+                idx = row * self.width + col
+                symbol = board[idx] if board[idx] else ' '
                 line.append(symbol)
-            print(f" {line[0]} | {line[1]} | {line[2]} ")
-            if row < 2:
-                print("-----------")
+            print(" " + " | ".join(line) + " ")
+            if row < self.height - 1:
+                print("-" * (4 * self.width - 1))
         print()
@@ -0,0 +1,297 @@
+#!/usr/bin/env python3
+"""
+Game Record Log for Tic-Tac-Toe
+Appends every finished game to a binary log as one fixed-size record and
+streams the records back
+
+File layout (little-endian):
+    header   magic b'TTTL', uint16 version, uint8 width, uint8 height,
+             uint8 win length, uint8 reserved, uint16 record size
+    records  one per game:
+             float64  start time (seconds since the epoch)
+             uint8    number of moves
+             uint8    winner (0 draw, 1 X, 2 O)
+             uint8[n] panel of each move (n = width x height, zero padded)
+             uint8[k] winning line (k = win length, 0xFF padded for a draw)
+             uint32[n] time of each move in milliseconds after the start
+             
+Records are packed into a memory buffer and written by a background thread
+in batches, with fsync at most every GAME_LOG_FSYNC_INTERVAL seconds, so
+the game never waits for the SD card. A torn record at the end of the file
+(e.g. after a power cut) is dropped when the log is reopened.
+
+Usage:
+    python3 game_log.py [PATH]      # print a summary of a log
+"""
+
+import os
+import sys
+import time
+import struct
+import threading
+from config import (
+    GAME_LOG_PATH, GAME_LOG_BATCH, GAME_LOG_FLUSH_INTERVAL,
+    GAME_LOG_FSYNC_INTERVAL, BOARD_WIDTH, BOARD_HEIGHT, WIN_LENGTH
+)
+
+MAGIC = b'TTTL'
+VERSION = 1
+HEADER = struct.Struct('<4sHBBBBH')
+
+WINNERS = (None, 'X', 'O')
+NO_PANEL = 0xFF
+
+# Records decoded per read by read_games()
+READ_CHUNK = 4096
+
+
+def record_struct(width, height, win_length):
+    """
+    Get the record layout for a board geometry.
+    
+    Args:
+        width: Panels per row
+        height: Number of rows
+        win_length: Marks in a row needed to win
+        
+    Returns:
+        struct.Struct for one record
+    """
+    n = width * height
+    return struct.Struct(f'<dBB{n}s{win_length}s{n}I')
+
+
+class GameRecord:
+    """One finished game."""
+    
+    __slots__ = ('start', 'moves', 'times', 'winner', 'winning_line')
+    
+    def __init__(self, start, moves, times, winner=None, winning_line=None):
+        """
+        Create a game record.
+        
+        Args:
+            start: time.time() value when the game started
+            moves: Panel numbers in the order they were played (X first)
+            times: Seconds after start of each move
+            winner: 'X', 'O', or None for a draw
+            winning_line: Panel numbers of the winning line, or None
+        """
+        self.start = start
+        self.moves = list(moves)
+        self.times = list(times)
+        self.winner = winner
+        self.winning_line = list(winning_line) if winning_line else None
+    
+    def __repr__(self):
+        return (f"GameRecord(moves={self.moves}, winner={self.winner!r}, "
+                f"winning_line={self.winning_line})")
+
+
+def _read_header(f, path):
+    """Read and check a log header, returning (width, height, win_length)."""
+    header = f.read(HEADER.size)
+    if len(header) < HEADER.size:
+        raise ValueError(f"Not a game log: {path}")
+    magic, version, width, height, win_length, _, size = HEADER.unpack(header)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError(f"Not a game log (version {VERSION}): {path}")
+    if size != record_struct(width, height, win_length).size:
+        raise ValueError(f"Corrupt game log header: {path}")
+    return width, height, win_length
+
+
+class GameLog:
+    """Append-only game log with batched, asynchronous writes."""
+    
+    def __init__(self, path=GAME_LOG_PATH, batch=GAME_LOG_BATCH,
+                 flush_interval=GAME_LOG_FLUSH_INTERVAL,
+                 fsync_interval=GAME_LOG_FSYNC_INTERVAL,
+                 width=BOARD_WIDTH, height=BOARD_HEIGHT, win_length=WIN_LENGTH):
+        """
+        Open the log for appending, creating it if needed.
+        
+        Args:
+            path: Log file path
+            batch: Buffered records that trigger a write
+            flush_interval: Maximum seconds a record waits in the buffer
+            fsync_interval: Minimum seconds between fsyncs (0 = every write)
+            width: Panels per row
+            height: Number of rows
+            win_length: Marks in a row needed to win
+            
+        Raises:
+            ValueError: If the file is not a log for this board geometry
+        """
+        if width * height > NO_PANEL:
+            raise ValueError(f"A {width}x{height} board is too large to log")
+        self.path = path
+        self.batch = batch
+        self.flush_interval = flush_interval
+        self.fsync_interval = fsync_interval
+        self.record = record_struct(width, height, win_length)
+        self.num_panels = width * height
+        self.win_length = win_length
+        
+        self._file = open(path, 'a+b')
+        self._file.seek(0)
+        if self._file.read(1):
+            self._file.seek(0)
+            if _read_header(self._file, path) != (width, height, win_length):
+                self._file.close()
+                raise ValueError(
+                    f"Game log is for a different board geometry: {path}"
+                )
+            # Drop a torn record left by an interrupted write
+            end = self._file.seek(0, os.SEEK_END)
+            torn = (end - HEADER.size) % self.record.size
+            if torn:
+                self._file.truncate(end - torn)
+        else:
+            self._file.write(HEADER.pack(
+                MAGIC, VERSION, width, height, win_length, 0, self.record.size
+            ))
+            self._file.flush()
+        
+        self.written = 0
+        self._buffer = bytearray()
+        self._pending = 0
+        self._last_fsync = time.monotonic()
+        self._closed = False
+        self._cond = threading.Condition()
+        self._writer = threading.Thread(
+            target=self._run, name="game-log", daemon=True
+        )
+        self._writer.start()
+    
+    def append(self, record):
+        """
+        Queue a finished game for writing. Never blocks on I/O.
+        
+        Args:
+            record: GameRecord
+        """
+        n = self.num_panels
+        count = len(record.moves)
+        moves = bytes(record.moves) + bytes(n - count)
+        if record.winning_line:
+            line = bytes(record.winning_line)
+        else:
+            line = bytes([NO_PANEL] * self.win_length)
+        times = [max(0, min(int(t * 1000), 0xFFFFFFFF)) for t in record.times]
+        times += [0] * (n - count)
+        data = self.record.pack(
+            record.start, count, WINNERS.index(record.winner),
+            moves, line, *times
+        )
+        with self._cond:
+            self._buffer += data
+            self._pending += 1
+            # Wake the writer to start the flush timer, or to write a full batch
+            if self._pending == 1 or self._pending >= self.batch:
+                self._cond.notify()
+    
+    def _run(self):
+        """Writer thread: write the buffer in batches until closed."""
+        while True:
+            with self._cond:
+                # Sleep without a timeout while there is nothing to write
+                while not self._pending and not self._closed:
+                    self._cond.wait()
+                if self._pending < self.batch and not self._closed:
+                    self._cond.wait(self.flush_interval)
+                data = self._buffer
+                count = self._pending
+                self._buffer = bytearray()
+                self._pending = 0
+                closed = self._closed
+            if data:
+                self._write(data, count, force_sync=closed)
+            if closed:
+                return
+    
+    def _write(self, data, count, force_sync=False):
+        """Write a batch of records, fsyncing if the interval has passed."""
+        self._file.write(data)
+        self._file.flush()
+        now = time.monotonic()
+        if force_sync or now - self._last_fsync >= self.fsync_interval:
+            os.fsync(self._file.fileno())
+            self._last_fsync = now
+        self.written += count
+    
+    def close(self):
+        """Write and fsync everything still buffered, then close the file."""
+        with self._cond:
+            if self._closed:
+                return
+            self._closed = True
+            self._cond.notify()
+        self._writer.join()
+        self._file.close()
+
+
+def read_games(path=GAME_LOG_PATH):
+    """
+    Stream the records of a game log in order.
+    
+    Records are read in chunks, so logs of any size use constant memory.
+    A torn record at the end of the file is ignored.
+    
+    Args:
+        path: Log file path
+        
+    Yields:
+        GameRecord for each logged game
+    """
+    with open(path, 'rb') as f:
+        width, height, win_length = _read_header(f, path)
+        record = record_struct(width, height, win_length)
+        n = width * height
+        chunk_size = record.size * READ_CHUNK
+        while True:
+            chunk = f.read(chunk_size)
+            usable = len(chunk) - len(chunk) % record.size
+            for fields in record.iter_unpack(memoryview(chunk)[:usable]):
+                start, count, winner, moves, line, *times = fields
+                yield GameRecord(
+                    start,
+                    moves[:count],
+                    [t / 1000 for t in times[:count]],
+                    WINNERS[winner],
+                    None if line[0] == NO_PANEL else line,
+                )
+            if len(chunk) < chunk_size:
+                return
+
+
+def summarize(path=GAME_LOG_PATH):
+    """
+    Count the outcomes in a game log.
+    
+    Args:
+        path: Log file path
+        
+    Returns:
+        Dict with the number of games, X wins, O wins, draws and moves
+    """
+    summary = {'games': 0, 'X': 0, 'O': 0, 'draws': 0, 'moves': 0}
+    for game in read_games(path):
+        summary['games'] += 1
+        summary['moves'] += len(game.moves)
+        if game.winner:
+            summary[game.winner] += 1
+        else:
+            summary['draws'] += 1
+    return summary
+
+
+if __name__ == "__main__":
+    log_path = sys.argv[1] if len(sys.argv) > 1 else GAME_LOG_PATH
+    stats = summarize(log_path)
+    games = max(stats['games'], 1)
+    print(f"{stats['games']} games in {log_path}")
+    print(f"  X wins: {stats['X']} ({stats['X'] / games:.1%})  "
+          f"O wins: {stats['O']} ({stats['O'] / games:.1%})  "
+          f"draws: {stats['draws']} ({stats['draws'] / games:.1%})")
+    print(f"  mean length: {stats['moves'] / games:.2f} moves")
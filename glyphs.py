@@ -0,0 +1,135 @@
+"""
+Glyph compiler for 8x8 LED patterns
+Turns patterns into ready-to-blit, color-applied pixel buffers and caches them
+"""
+
+from collections import OrderedDict
+from config import (
+    LEDS_PER_MATRIX, PLAYER_X_COLOR, PLAYER_O_COLOR,
+    STARTUP_COLOR, EMPTY_COLOR
+)
+from patterns import PATTERN_X, PATTERN_O, STARTUP_LETTERS, pattern_to_pixel_indices
+
+# Maximum number of compiled glyphs kept in the cache
+GLYPH_CACHE_SIZE = 64
+
+
+class Glyph:
+    """A compiled pattern: three RGB bytes per panel pixel."""
+
+    __slots__ = ('data',)
+
+    def __init__(self, pixels):
+        """
+        Create a glyph from a full panel of pixel colors.
+
+        Args:
+            pixels: Sequence of LEDS_PER_MATRIX RGB tuples
+        """
+        self.data = bytes(c for pixel in pixels for c in pixel)
+
+
+def pattern_key(pattern):
+    """
+    Get a hashable key for an 8x8 pattern.
+
+    Patterns are nested lists, so they are reduced to a 64-bit mask with
+    bit (row * 8 + col) set for every lit pixel.
+
+    Args:
+        pattern: 8x8 array where 1 = LED on, 0 = LED off
+
+    Returns:
+        Integer bitmask of lit pixels
+    """
+    mask = 0
+    for index in pattern_to_pixel_indices(pattern):
+        mask |= 1 << index
+    return mask
+
+
+def compile_glyph(pattern, color):
+    """
+    Compile a pattern into a full panel of pixels.
+
+    Brightness and gamma are not baked in; the LED manager's output table
+    applies them to the whole frame.
+
+    Args:
+        pattern: 8x8 array where 1 = LED on, 0 = LED off
+        color: RGB tuple (r, g, b) for lit pixels
+
+    Returns:
+        Glyph with every panel pixel set (unlit pixels are EMPTY_COLOR)
+    """
+    pixels = [EMPTY_COLOR] * LEDS_PER_MATRIX
+    lit = tuple(color)
+    for pixel_idx in pattern_to_pixel_indices(pattern):
+        pixels[pixel_idx] = lit
+    return Glyph(pixels)
+
+
+class GlyphCache:
+    """Bounded LRU cache of compiled glyphs keyed by (pattern, color)."""
+
+    def __init__(self, max_size=GLYPH_CACHE_SIZE):
+        """
+        Initialize the cache.
+
+        Args:
+            max_size: Maximum number of glyphs kept before evicting the oldest
+        """
+        self.max_size = max_size
+        self._glyphs = OrderedDict()
+        # Patterns are module-level constants, so their masks are memoized by
+        # identity. The pattern itself is kept so its id cannot be reused.
+        self._pattern_keys = {}
+        self.hits = 0
+        self.misses = 0
+
+    def _key_for(self, pattern):
+        entry = self._pattern_keys.get(id(pattern))
+        if entry is None or entry[0] is not pattern:
+            entry = (pattern, pattern_key(pattern))
+            self._pattern_keys[id(pattern)] = entry
+        return entry[1]
+
+    def get(self, pattern, color):
+        """
+        Get the compiled glyph for a pattern, compiling it on first use.
+
+        Args:
+            pattern: 8x8 array where 1 = LED on, 0 = LED off
+            color: RGB tuple (r, g, b)
+
+        Returns:
+            Compiled Glyph
+        """
+        key = (self._key_for(pattern), tuple(color))
+        glyph = self._glyphs.get(key)
+        if glyph is not None:
+            self._glyphs.move_to_end(key)
+            self.hits += 1
+            return glyph
+
+        self.misses += 1
+        glyph = compile_glyph(pattern, color)
+        self._glyphs[key] = glyph
+        if len(self._glyphs) > self.max_size:
+            self._glyphs.popitem(last=False)
+        return glyph
+
+    def precompile(self):
+        """Compile the game symbols and startup letters ahead of time."""
+        self.get(PATTERN_X, PLAYER_X_COLOR)
+        self.get(PATTERN_O, PLAYER_O_COLOR)
+        for pattern in STARTUP_LETTERS.values():
+            self.get(pattern, STARTUP_COLOR)
+
+    def clear(self):
+        """Drop all compiled glyphs."""
+        self._glyphs.clear()
+        self._pattern_keys.clear()
+
+    def __len__(self):
+        return len(self._glyphs)
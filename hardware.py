@@ -0,0 +1,788 @@
+"""
+Hardware Backends for Tic-Tac-Toe Game
+Pixel strips, digital inputs and digital outputs behind one interface,
+so the game can run on a Raspberry Pi or headless in memory
+"""
+
+import os
+import ctypes
+import threading
+import time
+from collections import deque
+from config import (
+    HARDWARE_BACKEND, BUTTON_PINS, WS281X_FREQ_HZ, WS281X_DMA, GPIO_CHIP
+)
+
+# WS2812B transfer time: 24 bits per LED at 800 kHz, then the reset latch
+WS2812_LED_TIME = 24 / 800000
+WS2812_RESET_TIME = 50e-6
+
+
+class Backend:
+    """
+    Interface every hardware backend implements.
+
+    Pixel strips returned by pixel_strip() take whole frames as RGB bytes:
+    write(data) replaces the strip contents, show() pushes them to the LEDs,
+    and the brightness attribute (0.0-1.0) scales what is pushed.
+    """
+
+    name = None
+
+    def pixel_strip(self, pin, num_leds, brightness=1.0):
+        """
+        Create a pixel strip on a data pin.
+
+        Args:
+            pin: GPIO pin number (BCM) of the data line
+            num_leds: Number of LEDs on the strip
+            brightness: Initial brightness (0.0-1.0)
+
+        Returns:
+            Pixel strip object
+        """
+        raise NotImplementedError
+
+    def setup_input(self, pin, on_falling, bouncetime):
+        """
+        Configure a pulled-up input and call back on falling edges.
+
+        Args:
+            pin: GPIO pin number (BCM)
+            on_falling: Function called with the pin number on each edge
+            bouncetime: Minimum time between edges in milliseconds
+        """
+        raise NotImplementedError
+
+    def read_input(self, pin):
+        """
+        Read an input pin.
+
+        Args:
+            pin: GPIO pin number (BCM)
+
+        Returns:
+            True if the pin is high, False if it is low
+        """
+        raise NotImplementedError
+
+    def input_lines(self, pins):
+        """
+        Claim pulled-up inputs for batched reading.
+
+        The default reads the pins one at a time through read_input() and
+        wakes on falling edges through setup_input(); backends with a
+        batched interface override this.
+
+        Args:
+            pins: GPIO pin numbers (BCM)
+
+        Returns:
+            Line reader with read(), wait_edge(timeout), wake() and close()
+        """
+        return BackendLines(self, pins)
+
+    def setup_output(self, pin):
+        """
+        Configure an output pin, initially low.
+
+        Args:
+            pin: GPIO pin number (BCM)
+        """
+        raise NotImplementedError
+
+    def write_output(self, pin, value):
+        """
+        Drive an output pin.
+
+        Args:
+            pin: GPIO pin number (BCM)
+            value: True for high, False for low
+        """
+        raise NotImplementedError
+
+    def show_strips(self, strips):
+        """
+        Push several strips as close to simultaneously as the hardware allows.
+
+        The default pushes them one after another; backends that can drive
+        data lines in parallel override this.
+
+        Args:
+            strips: Pixel strips from this backend, already written
+        """
+        for strip in strips:
+            strip.show()
+
+    def cleanup(self):
+        """Release all pins."""
+        raise NotImplementedError
+
+
+class BackendLines:
+    """
+    Batched line reader built from a backend's single-pin calls.
+
+    Edge times are time.perf_counter() values taken in the edge callback.
+    """
+
+    def __init__(self, backend, pins):
+        """
+        Configure the pins as inputs.
+
+        Args:
+            backend: Backend to read through
+            pins: GPIO pin numbers (BCM)
+        """
+        self.backend = backend
+        self.pins = list(pins)
+        self._edges = {}
+        self._woken = False
+        self._cond = threading.Condition()
+        for pin in self.pins:
+            backend.setup_input(pin, self._on_edge, bouncetime=0)
+
+    def _on_edge(self, pin):
+        with self._cond:
+            self._edges.setdefault(pin, time.perf_counter())
+            self._cond.notify()
+
+    def read(self):
+        """
+        Read every line.
+
+        Returns:
+            List of booleans in pin order, True where the line is high
+        """
+        return [self.backend.read_input(pin) for pin in self.pins]
+
+    def wait_edge(self, timeout=None):
+        """
+        Wait for falling edges.
+
+        Args:
+            timeout: Maximum seconds to wait, or None to wait until an edge
+                     or wake()
+
+        Returns:
+            Dict mapping pin to the time of its first edge since the last
+            call (empty on timeout or wake())
+        """
+        with self._cond:
+            self._cond.wait_for(lambda: self._edges or self._woken, timeout)
+            self._woken = False
+            edges = self._edges
+            self._edges = {}
+            return edges
+
+    def wake(self):
+        """Make a thread blocked in wait_edge() return."""
+        with self._cond:
+            self._woken = True
+            self._cond.notify_all()
+
+    def close(self):
+        """Nothing to release; the pins are released with the backend."""
+
+
+class GpiodLines:
+    """
+    Batched line reader on the GPIO character device (libgpiod 2.x).
+
+    All lines share one kernel request, so read() is a single ioctl.
+    Edge timestamps come from the kernel on CLOCK_MONOTONIC, the clock
+    time.perf_counter() uses on Linux.
+    """
+
+    def __init__(self, pins, chip=GPIO_CHIP):
+        """
+        Request the lines as pulled-up inputs with falling-edge detection.
+
+        Args:
+            pins: GPIO pin numbers (BCM), i.e. line offsets on the chip
+            chip: Path of the GPIO character device
+        """
+        import gpiod
+        from gpiod.line import Bias, Direction, Edge, Value
+
+        self.pins = list(pins)
+        self._active = Value.ACTIVE
+        settings = gpiod.LineSettings(
+            direction=Direction.INPUT, bias=Bias.PULL_UP,
+            edge_detection=Edge.FALLING
+        )
+        self._request = gpiod.request_lines(
+            chip, consumer="tictactoe", config={tuple(self.pins): settings}
+        )
+        # Lets wake() interrupt a thread blocked in wait_edge()
+        self._wake_read, self._wake_write = os.pipe()
+
+    def read(self):
+        """
+        Read every line in one request.
+
+        Returns:
+            List of booleans in pin order, True where the line is high
+        """
+        return [value == self._active for value in self._request.get_values(self.pins)]
+
+    def wait_edge(self, timeout=None):
+        """
+        Wait for falling edges.
+
+        Args:
+            timeout: Maximum seconds to wait, or None to wait until an edge
+                     or wake()
+
+        Returns:
+            Dict mapping pin to the time of its first edge since the last
+            call (empty on timeout or wake())
+        """
+        import select
+        ready, _, _ = select.select([self._request.fd, self._wake_read], [], [], timeout)
+        edges = {}
+        if self._wake_read in ready:
+            os.read(self._wake_read, 64)
+        if self._request.fd in ready:
+            for event in self._request.read_edge_events():
+                edges.setdefault(event.line_offset, event.timestamp_ns / 1e9)
+        return edges
+
+    def wake(self):
+        """Make a thread blocked in wait_edge() return."""
+        os.write(self._wake_write, b'x')
+
+    def close(self):
+        """Release the lines. No thread may be waiting on them."""
+        self._request.release()
+        os.close(self._wake_read)
+        os.close(self._wake_write)
+
+
+class NeoPixelStrip:
+    """Adapts an Adafruit NeoPixel strip to the frame-based strip interface."""
+
+    def __init__(self, pixels):
+        """
+        Wrap a NeoPixel strip.
+
+        Args:
+            pixels: neopixel.NeoPixel created with auto_write=False
+        """
+        self._pixels = pixels
+
+    @property
+    def brightness(self):
+        return self._pixels.brightness
+
+    @brightness.setter
+    def brightness(self, value):
+        self._pixels.brightness = value
+
+    def write(self, data):
+        """
+        Replace the strip contents.
+
+        Args:
+            data: RGB bytes (3 per LED)
+        """
+        self._pixels[:] = list(zip(data[0::3], data[1::3], data[2::3]))
+
+    def show(self):
+        """Push the strip contents to the LEDs."""
+        self._pixels.show()
+
+    def deinit(self):
+        """Release the data line."""
+        self._pixels.deinit()
+
+
+class RPiBackend(Backend):
+    """
+    Raspberry Pi hardware through Adafruit NeoPixel and RPi.GPIO.
+
+    Strips are always pushed one after another: every NeoPixel object goes
+    through the one LED driver instance the Blinka library keeps.
+    """
+
+    name = 'rpi'
+
+    def __init__(self):
+        """Import the hardware libraries and select BCM pin numbering."""
+        import board
+        import neopixel
+        import RPi.GPIO as GPIO
+
+        self._board = board
+        self._neopixel = neopixel
+        self._gpio = GPIO
+        GPIO.setmode(GPIO.BCM)
+
+    def pixel_strip(self, pin, num_leds, brightness=1.0):
+        pixels = self._neopixel.NeoPixel(
+            getattr(self._board, f"D{pin}"),
+            num_leds,
+            brightness=brightness,
+            auto_write=False,
+            pixel_order=self._neopixel.GRB
+        )
+        return NeoPixelStrip(pixels)
+
+    def setup_input(self, pin, on_falling, bouncetime):
+        GPIO = self._gpio
+        GPIO.setup(pin, GPIO.IN, pull_up_down=GPIO.PUD_UP)
+        GPIO.add_event_detect(
+            pin,
+            GPIO.FALLING,
+            callback=on_falling,
+            bouncetime=bouncetime
+        )
+
+    def read_input(self, pin):
+        return self._gpio.input(pin) == self._gpio.HIGH
+
+    def input_lines(self, pins):
+        return GpiodLines(pins)
+
+    def setup_output(self, pin):
+        self._gpio.setup(pin, self._gpio.OUT)
+        self._gpio.output(pin, self._gpio.LOW)
+
+    def write_output(self, pin, value):
+        self._gpio.output(pin, self._gpio.HIGH if value else self._gpio.LOW)
+
+    def cleanup(self):
+        self._gpio.cleanup()
+
+
+class WS281xStrip:
+    """
+    Pixel strip driven straight through the rpi_ws281x DMA driver.
+
+    The frame is kept in the driver's own LED word layout (one little-endian
+    0xWWRRGGBB word per LED, i.e. bytes B, G, R, W), so write() is three
+    strided slice copies and show() a single memmove into the driver's
+    buffer; the driver does the GRB wire ordering in C.
+    """
+
+    def __init__(self, backend, pin, num_leds, brightness=1.0):
+        """
+        Create a strip.
+
+        Args:
+            backend: WS281xBackend that owns the driver
+            pin: GPIO pin number (BCM) of the data line
+            num_leds: Number of LEDs on the strip
+            brightness: Initial brightness (0.0-1.0)
+        """
+        self.backend = backend
+        self.pin = pin
+        self.num_leds = num_leds
+        self.brightness = brightness
+        # Byte offset of this strip in its channel's chained LED array
+        self.offset = 0
+        self.buffer = bytearray(4 * num_leds)
+        # ctypes view sharing the buffer's memory, for memmove without a copy
+        self.cbuffer = (ctypes.c_char * len(self.buffer)).from_buffer(self.buffer)
+
+    def write(self, data):
+        """
+        Replace the strip contents.
+
+        Args:
+            data: RGB bytes (3 per LED)
+        """
+        buffer = self.buffer
+        buffer[0::4] = data[2::3]
+        buffer[1::4] = data[1::3]
+        buffer[2::4] = data[0::3]
+
+    def show(self):
+        """Push the strip contents to the LEDs."""
+        self.backend.render(self)
+
+    def deinit(self):
+        """Nothing to release; the backend tears down the driver on cleanup."""
+
+
+class WS281xBackend(RPiBackend):
+    """
+    Raspberry Pi hardware with LEDs on the rpi_ws281x driver directly.
+
+    Inputs and outputs use RPi.GPIO like RPiBackend. The driver runs two
+    hardware channels at once (PWM0 on GPIO 12/18, PWM1 on GPIO 13/19; PCM
+    and SPI use channel 0), each with one data pin. Strips on the same
+    channel are chained into one LED buffer driven from the first pin
+    created on that channel, so their rows must be daisy-chained in that
+    order (data out of one row to data in of the next). The driver is
+    initialized once, on the first push, and never re-initialized on the
+    frame path; show_strips() sends both channels in one driver transfer.
+    """
+
+    name = 'ws281x'
+
+    # Data pins on the driver's second channel
+    CHANNEL_1_PINS = (13, 19, 41, 45, 53)
+
+    def __init__(self):
+        """Import the GPIO and LED driver libraries."""
+        import RPi.GPIO as GPIO
+        import _rpi_ws281x as ws
+
+        self._gpio = GPIO
+        self._ws = ws
+        GPIO.setmode(GPIO.BCM)
+
+        self._driver = None
+        # Strips chained on each channel, in order, and the address of the
+        # driver's LED array for the channel
+        self._strips = [[], []]
+        self._leds = [None, None]
+
+    def pixel_strip(self, pin, num_leds, brightness=1.0):
+        if self._driver is not None:
+            raise RuntimeError("Cannot add a ws281x strip after the driver has started")
+        strip = WS281xStrip(self, pin, num_leds, brightness)
+        chain = self._strips[1 if pin in self.CHANNEL_1_PINS else 0]
+        if chain:
+            strip.offset = chain[-1].offset + len(chain[-1].buffer)
+            print(f"GPIO {pin} shares a driver channel with GPIO {chain[0].pin}; "
+                  f"its LEDs are driven chained after GPIO {chain[-1].pin}'s")
+        chain.append(strip)
+        return strip
+
+    def _check(self, resp, action):
+        if resp != 0:
+            message = self._ws.ws2811_get_return_t_str(resp)
+            raise RuntimeError(f"ws2811_{action} failed with code {resp} ({message})")
+
+    def _start(self):
+        """Initialize the driver with every channel's chained strips."""
+        ws = self._ws
+        self._driver = ws.new_ws2811_t()
+        for channum, chain in enumerate(self._strips):
+            chan = ws.ws2811_channel_get(self._driver, channum)
+            ws.ws2811_channel_t_count_set(chan, sum(strip.num_leds for strip in chain))
+            ws.ws2811_channel_t_gpionum_set(chan, chain[0].pin if chain else 0)
+            ws.ws2811_channel_t_invert_set(chan, 0)
+            ws.ws2811_channel_t_brightness_set(chan, 0)
+            ws.ws2811_channel_t_strip_type_set(chan, ws.WS2811_STRIP_GRB)
+        ws.ws2811_t_freq_set(self._driver, WS281X_FREQ_HZ)
+        ws.ws2811_t_dmanum_set(self._driver, WS281X_DMA)
+        self._check(ws.ws2811_init(self._driver), 'init')
+
+        for channum, chain in enumerate(self._strips):
+            if chain:
+                chan = ws.ws2811_channel_get(self._driver, channum)
+                self._leds[channum] = int(ws.ws2811_channel_t_leds_get(chan))
+
+    def render(self, strip):
+        """
+        Send a strip's frame out.
+
+        The driver always sends whole channels, so this pushes every strip;
+        the others repeat their last frame.
+
+        Args:
+            strip: WS281xStrip to show
+        """
+        self._render()
+
+    def show_strips(self, strips):
+        """
+        Push strips in a single driver transfer.
+
+        Args:
+            strips: WS281xStrip objects, already written
+        """
+        self._render()
+
+    def _render(self):
+        """Send every strip's frame out on both channels."""
+        ws = self._ws
+        if self._driver is None:
+            self._start()
+
+        for channum, chain in enumerate(self._strips):
+            if not chain:
+                continue
+            leds = self._leds[channum]
+            for strip in chain:
+                ctypes.memmove(leds + strip.offset, strip.cbuffer, len(strip.buffer))
+            # One brightness per channel; the chain runs at its first strip's
+            chan = ws.ws2811_channel_get(self._driver, channum)
+            ws.ws2811_channel_t_brightness_set(chan, int(255 * chain[0].brightness))
+        self._check(ws.ws2811_render(self._driver), 'render')
+
+    def cleanup(self):
+        if self._driver is not None:
+            self._ws.ws2811_fini(self._driver)
+            self._ws.delete_ws2811_t(self._driver)
+            self._driver = None
+        super().cleanup()
+
+
+class MemoryStrip:
+    """Pixel strip that records every pushed frame instead of lighting LEDs."""
+
+    def __init__(self, backend, pin, num_leds, brightness=1.0):
+        """
+        Create an in-memory strip.
+
+        Args:
+            backend: MemoryBackend that records the pushed frames
+            pin: GPIO pin number (BCM) of the data line
+            num_leds: Number of LEDs on the strip
+            brightness: Initial brightness (0.0-1.0)
+        """
+        self.backend = backend
+        self.pin = pin
+        self.num_leds = num_leds
+        self.brightness = brightness
+        self.data = bytearray(3 * num_leds)
+        self.shows = 0
+
+    def write(self, data):
+        """
+        Replace the strip contents.
+
+        Args:
+            data: RGB bytes (3 per LED)
+        """
+        self.data[:] = data
+
+    def show(self):
+        """Record the strip contents as a pushed frame."""
+        self.shows += 1
+        if self.backend.wire_time:
+            # Hold the data line as long as the real transfer would take
+            time.sleep(self.num_leds * WS2812_LED_TIME + WS2812_RESET_TIME)
+        self.backend.record_frame(self)
+
+    def deinit(self):
+        """Nothing to release."""
+
+    def get_pixel(self, index):
+        """
+        Get the color of one LED as last written.
+
+        Args:
+            index: LED index on the strip
+
+        Returns:
+            RGB tuple (r, g, b)
+        """
+        return tuple(self.data[3 * index:3 * index + 3])
+
+
+class MemoryBackend(Backend):
+    """
+    Headless backend that keeps all pin and LED state in memory.
+
+    Every pushed frame is recorded as (timestamp, pin, brightness, data) with
+    time.perf_counter() timestamps, and button edges can be injected with
+    press() or inject_edge().
+    """
+
+    name = 'memory'
+
+    def __init__(self, max_frames=None, record_frames=True, wire_time=False):
+        """
+        Initialize the backend.
+
+        Args:
+            max_frames: Keep only the most recent frames (None = keep all)
+            record_frames: Set to False to only count pushes, e.g. when
+                           benchmarking
+            wire_time: Make each show() take as long as sending the strip
+                       to real WS2812B LEDs, to measure push timing
+        """
+        self.frames = deque(maxlen=max_frames)
+        self.record_frames = record_frames
+        self.wire_time = wire_time
+        self._pushers = None
+        self.strips = {}
+        self.inputs = {}
+        self.outputs = {}
+        self.output_history = []
+        self._callbacks = {}
+        self._bouncetime = {}
+        self._last_edge = {}
+        self._lock = threading.Lock()
+
+    def pixel_strip(self, pin, num_leds, brightness=1.0):
+        strip = MemoryStrip(self, pin, num_leds, brightness)
+        self.strips[pin] = strip
+        return strip
+
+    def record_frame(self, strip):
+        """
+        Record a pushed frame.
+
+        Args:
+            strip: MemoryStrip that was shown
+        """
+        if self.record_frames:
+            with self._lock:
+                self.frames.append((
+                    time.perf_counter(), strip.pin,
+                    strip.brightness, bytes(strip.data)
+                ))
+
+    def show_strips(self, strips):
+        """
+        Push strips concurrently, one worker thread per data line.
+
+        With wire_time this overlaps the simulated transfers, which is an
+        upper bound on what a real parallel push saves.
+
+        Args:
+            strips: MemoryStrip objects, already written
+        """
+        if len(strips) < 2:
+            super().show_strips(strips)
+            return
+        if self._pushers is None:
+            from concurrent.futures import ThreadPoolExecutor
+            self._pushers = ThreadPoolExecutor(
+                max_workers=max(len(self.strips), 2), thread_name_prefix="push"
+            )
+        for future in [self._pushers.submit(strip.show) for strip in strips]:
+            future.result()
+
+    def setup_input(self, pin, on_falling, bouncetime):
+        self.inputs[pin] = True
+        self._callbacks[pin] = on_falling
+        self._bouncetime[pin] = bouncetime / 1000
+        self._last_edge[pin] = float('-inf')
+
+    def read_input(self, pin):
+        return self.inputs.get(pin, True)
+
+    def setup_output(self, pin):
+        self.write_output(pin, False)
+
+    def write_output(self, pin, value):
+        value = bool(value)
+        self.outputs[pin] = value
+        self.output_history.append((time.perf_counter(), pin, value))
+
+    def inject_edge(self, pin):
+        """
+        Simulate a falling edge on an input pin.
+
+        The pin is left low; call release() to pull it high again. Edges
+        within the pin's bouncetime are ignored like the GPIO library does.
+
+        Args:
+            pin: GPIO pin number (BCM)
+
+        Returns:
+            True if the edge was delivered to the callback
+        """
+        self.inputs[pin] = False
+        now = time.perf_counter()
+        if now - self._last_edge.get(pin, float('-inf')) < self._bouncetime.get(pin, 0):
+            return False
+        self._last_edge[pin] = now
+        callback = self._callbacks.get(pin)
+        if callback is None:
+            return False
+        callback(pin)
+        return True
+
+    def release(self, pin):
+        """
+        Pull an input pin high again.
+
+        Args:
+            pin: GPIO pin number (BCM)
+        """
+        self.inputs[pin] = True
+
+    def press(self, panel_num, hold=0.0):
+        """
+        Press and release the button of a panel.
+
+        Args:
+            panel_num: Panel number (0-8)
+            hold: Seconds to keep the button down; a scanned input needs
+                  several scan periods to see a press
+
+        Returns:
+            True if the edge was delivered to the callback
+        """
+        pin = BUTTON_PINS[panel_num]
+        delivered = self.inject_edge(pin)
+        if hold:
+            time.sleep(hold)
+        self.release(pin)
+        return delivered
+
+    def cleanup(self):
+        self._callbacks.clear()
+        if self._pushers is not None:
+            self._pushers.shutdown()
+            self._pushers = None
+
+
+# Backend names selectable with HARDWARE_BACKEND or TICTACTOE_BACKEND
+BACKENDS = {
+    RPiBackend.name: RPiBackend,
+    WS281xBackend.name: WS281xBackend,
+    MemoryBackend.name: MemoryBackend,
+}
+
+_backend = None
+
+
+def create_backend(name=None):
+    """
+    Create a hardware backend by name.
+
+    Args:
+        name: Backend name; defaults to the TICTACTOE_BACKEND environment
+              variable, then config.HARDWARE_BACKEND
+
+    Returns:
+        New Backend instance
+    """
+    name = name or os.environ.get('TICTACTOE_BACKEND') or HARDWARE_BACKEND
+    try:
+        backend_class = BACKENDS[name]
+    except KeyError:
+        raise ValueError(
+            f"Unknown hardware backend '{name}' "
+            f"(choose from {', '.join(sorted(BACKENDS))})"
+        ) from None
+    return backend_class()
+
+
+def get_backend():
+    """
+    Get the process-wide hardware backend, creating the default on first use.
+
+    Returns:
+        Backend instance
+    """
+    global _backend
+    if _backend is None:
+        _backend = create_backend()
+    return _backend
+
+
+def set_backend(backend):
+    """
+    Select the process-wide hardware backend.
+
+    Args:
+        backend: Backend instance, or a backend name
+
+    Returns:
+        The selected Backend instance
+    """
+    global _backend
+    if isinstance(backend, str):
+        backend = create_backend(backend)
+    _backend = backend
+    return backend
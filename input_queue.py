@@ -0,0 +1,152 @@
+"""
+Input Event Queue for Tic-Tac-Toe Game
+Hands button presses from the GPIO event thread to the main game loop
+"""
+
+import threading
+import time
+from collections import deque
+from config import INPUT_QUEUE_SIZE
+
+
+class ButtonEvent:
+    """A button press with the time it was seen on the GPIO event thread."""
+
+    __slots__ = ('panel_num', 'timestamp', 'edge_time')
+
+    def __init__(self, panel_num, timestamp, edge_time=None):
+        """
+        Create a button event.
+
+        Args:
+            panel_num: Panel number (0-8) that was pressed
+            timestamp: time.perf_counter() value when the press was queued
+            edge_time: time.perf_counter() value of the GPIO edge
+                       (defaults to timestamp)
+        """
+        self.panel_num = panel_num
+        self.timestamp = timestamp
+        self.edge_time = timestamp if edge_time is None else edge_time
+
+    def __repr__(self):
+        return f"ButtonEvent(panel_num={self.panel_num}, timestamp={self.timestamp})"
+
+
+class InputEventQueue:
+    """
+    Bounded, thread-safe queue of button events.
+
+    Overflow policy: when the queue is full the OLDEST waiting event is
+    dropped to make room, so the presses players are making right now are
+    never lost behind stale ones. Dropped events are counted.
+    """
+
+    def __init__(self, max_size=INPUT_QUEUE_SIZE):
+        """
+        Initialize the queue.
+
+        Args:
+            max_size: Maximum number of events waiting to be handled
+        """
+        self.max_size = max_size
+        self._events = deque()
+        self._cond = threading.Condition()
+        self._woken = False
+
+        # Optional function called after every put(), on the putting
+        # thread, e.g. to wake an event loop
+        self.listener = None
+
+        # Statistics
+        self.received = 0
+        self.dropped = 0
+        self.max_depth = 0
+        self._handled = 0
+        self._total_wait = 0.0
+        self._max_wait = 0.0
+
+    def put(self, panel_num, edge_time=None):
+        """
+        Queue a button press. Safe to call from the GPIO event thread.
+
+        Args:
+            panel_num: Panel number (0-8) that was pressed
+            edge_time: time.perf_counter() value of the GPIO edge, if known
+        """
+        event = ButtonEvent(panel_num, time.perf_counter(), edge_time)
+        with self._cond:
+            if len(self._events) >= self.max_size:
+                self._events.popleft()
+                self.dropped += 1
+            self._events.append(event)
+            self.received += 1
+            if len(self._events) > self.max_depth:
+                self.max_depth = len(self._events)
+            self._cond.notify()
+        listener = self.listener
+        if listener is not None:
+            listener()
+
+    def wake(self):
+        """
+        Make a waiting get() return None, so the caller can handle a
+        request made outside the queue (e.g. by a signal handler).
+        """
+        with self._cond:
+            self._woken = True
+            self._cond.notify()
+        listener = self.listener
+        if listener is not None:
+            listener()
+
+    def get(self, timeout=None):
+        """
+        Wait for the next button press.
+
+        Args:
+            timeout: Maximum seconds to wait, or None to wait forever
+
+        Returns:
+            The oldest ButtonEvent, or None on timeout or after wake()
+        """
+        with self._cond:
+            self._cond.wait_for(lambda: self._events or self._woken, timeout)
+            self._woken = False
+            if not self._events:
+                return None
+            event = self._events.popleft()
+            wait = time.perf_counter() - event.timestamp
+            self._handled += 1
+            self._total_wait += wait
+            if wait > self._max_wait:
+                self._max_wait = wait
+            return event
+
+    def clear(self):
+        """Discard all waiting events."""
+        with self._cond:
+            self._events.clear()
+
+    def __len__(self):
+        with self._cond:
+            return len(self._events)
+
+    def get_stats(self):
+        """
+        Get queue statistics.
+
+        Returns:
+            Dict with current and maximum depth, event counts, and mean and
+            maximum wait time in seconds between a press and its handling
+        """
+        with self._cond:
+            handled = self._handled
+            return {
+                'depth': len(self._events),
+                'max_depth': self.max_depth,
+                'received': self.received,
+                'handled': handled,
+                'dropped': self.dropped,
+                'mean_wait': self._total_wait / handled if handled else 0.0,
+                'max_wait': self._max_wait,
+            }
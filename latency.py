@@ -0,0 +1,143 @@
+"""
+Button-to-Photon Latency Tracking for Tic-Tac-Toe Game
+Times each stage from the GPIO edge to the strip push for a move
+"""
+
+import sys
+import threading
+import time
+from collections import deque
+from config import LATENCY_WINDOW
+
+
+class MoveTrace:
+    """Per-stage timestamps for a single move."""
+
+    __slots__ = ('start', 'last', 'stages')
+
+    def __init__(self, start):
+        """
+        Start a trace.
+
+        Args:
+            start: time.perf_counter() value of the GPIO edge
+        """
+        self.start = start
+        self.last = start
+        self.stages = {}
+
+    def mark(self, stage, now=None):
+        """
+        Record the end of a stage.
+
+        Args:
+            stage: Stage name
+            now: time.perf_counter() value the stage ended at (default: now)
+        """
+        if now is None:
+            now = time.perf_counter()
+        self.stages[stage] = now - self.last
+        self.last = now
+
+
+class LatencyTracker:
+    """Rolling per-stage latency percentiles over the most recent moves."""
+
+    # Stages in the order they happen for a move
+    STAGES = ('debounce', 'queue', 'logic', 'render', 'push', 'total')
+
+    def __init__(self, window=LATENCY_WINDOW):
+        """
+        Initialize the tracker.
+
+        Args:
+            window: Number of most recent moves kept per stage
+        """
+        self._samples = {stage: deque(maxlen=window) for stage in self.STAGES}
+        # Reentrant, so a dump on a thread already holding the lock (the
+        # game loop dumps on SIGUSR1) cannot hang it
+        self._lock = threading.RLock()
+
+    def begin(self, edge_time):
+        """
+        Start tracing a move.
+
+        Args:
+            edge_time: time.perf_counter() value of the GPIO edge
+
+        Returns:
+            MoveTrace to mark stages on
+        """
+        return MoveTrace(edge_time)
+
+    def record(self, trace):
+        """
+        Add a finished trace to the rolling window.
+
+        Args:
+            trace: MoveTrace whose stages have all been marked
+        """
+        with self._lock:
+            for stage, duration in trace.stages.items():
+                samples = self._samples.get(stage)
+                if samples is not None:
+                    samples.append(duration)
+            self._samples['total'].append(trace.last - trace.start)
+
+    def percentiles(self):
+        """
+        Compute latency percentiles for every stage.
+
+        Returns:
+            Dict mapping stage name to a dict with 'count', 'p50', 'p95'
+            and 'p99' in seconds (None when there are no samples)
+        """
+        with self._lock:
+            snapshot = {stage: sorted(s) for stage, s in self._samples.items()}
+
+        result = {}
+        for stage in self.STAGES:
+            values = snapshot[stage]
+            result[stage] = {
+                'count': len(values),
+                'p50': _percentile(values, 50),
+                'p95': _percentile(values, 95),
+                'p99': _percentile(values, 99),
+            }
+        return result
+
+    def dump(self, file=None):
+        """
+        Print a latency table.
+
+        Args:
+            file: Stream to print to (default: stdout)
+        """
+        file = file or sys.stdout
+        print("Button-to-photon latency (ms):", file=file)
+        print(f"  {'stage':<10}{'count':>7}{'p50':>9}{'p95':>9}{'p99':>9}",
+              file=file)
+        for stage, stats in self.percentiles().items():
+            cells = ''.join(
+                f"{'-' if stats[p] is None else f'{stats[p] * 1000:.2f}':>9}"
+                for p in ('p50', 'p95', 'p99')
+            )
+            print(f"  {stage:<10}{stats['count']:>7}{cells}", file=file)
+        file.flush()
+
+
+def _percentile(sorted_values, percent):
+    """
+    Nearest-rank percentile of an already sorted list.
+
+    Args:
+        sorted_values: Ascending list of values
+        percent: Percentile (0-100)
+
+    Returns:
+        The percentile value, or None for an empty list
+    """
+    if not sorted_values:
+        return None
+    rank = max(0, -(-len(sorted_values) * percent // 100) - 1)
+    return sorted_values[min(rank, len(sorted_values) - 1)]
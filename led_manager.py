@@ -1,206 +1,594 @@
 """
 LED Matrix Manager for Tic-Tac-Toe Game
-Controls 9 WS2812B 8x8 LED matrices using NeoPixel library
+Controls the WS2812B 8x8 LED matrices (one per panel) through the hardware backend
 """
 
-import board
-import neopixel
 import time
 from config import (
-    LED_DATA_PINS, LEDS_PER_ROW, LEDS_PER_MATRIX,
+    LED_DATA_PINS, LEDS_PER_ROW, LEDS_PER_MATRIX, MATRIX_SIZE,
+    BOARD_WIDTH, BOARD_HEIGHT, NUM_PANELS,
     PLAYER_X_COLOR, PLAYER_O_COLOR, EMPTY_COLOR,
-    STARTUP_COLOR, WIN_COLORS, LED_BRIGHTNESS
+    STARTUP_COLOR, WIN_COLORS, ANIMATION_CACHE_PATH, LED_PARALLEL_PUSH,
+    STARTUP_DISPLAY_DURATION, WIN_ANIMATION_DURATION, DRAW_ANIMATION_DURATION
 )
-from patterns import get_pattern, pattern_to_pixel_indices, get_all_pixels
+from patterns import get_pattern
+from glyphs import GlyphCache
+from colors import ColorPipeline
+from animation_cache import AnimationCache, win_name
+from hardware import get_backend
+from animation import FrameScheduler, frame_steps
+from metrics import REGISTRY
+
+# Strip pushes of every LEDManager in the process
+STRIP_SHOWS = REGISTRY.counter('tictactoe_strip_shows_total', "LED strips pushed")
+PUSH_SECONDS = REGISTRY.histogram(
+    'tictactoe_led_push_seconds', "Time to push the changed strips of a frame"
+)
+
+
+class FrameCompositor:
+    """
+    Back buffers for the row strips with dirty tracking.
+    
+    Drawing only touches the back buffers; commit() pushes each changed
+    strip exactly once, however many panels were drawn on it. The back
+    buffers hold the colors as drawn; the output lookup table (gamma,
+    brightness and fade level) is applied to the whole frame on commit.
+    """
+    
+    def __init__(self, strips, leds_per_strip, show_strips=None):
+        """
+        Initialize the compositor.
+        
+        Args:
+            strips: Dict mapping row number to backend pixel strip
+            leds_per_strip: Number of LEDs on each strip
+            show_strips: Optional function pushing a list of written strips
+                         at once (e.g. Backend.show_strips); by default each
+                         strip is shown in turn
+        """
+        self.show_strips = show_strips
+        self.strips = strips
+        self.frames = {
+            row: bytearray(3 * leds_per_strip) for row in strips
+        }
+        # Start dirty so the first commit pushes a known state to the LEDs
+        self.dirty = set(strips)
+        self.requested_pushes = 0
+        self.shows = 0
+        self.saved = 0
+        # Draws since the last commit
+        self._pending = 0
+        self.lut = None
+    
+    def set_lut(self, lut):
+        """
+        Select the output lookup table.
+        
+        Args:
+            lut: 256-byte table applied to every channel value on commit,
+                 or None to push the back buffers unchanged
+        """
+        if lut != self.lut:
+            self.lut = lut
+            self.invalidate()
+    
+    def blit(self, row, offset, data):
+        """
+        Copy RGB bytes into a row's back buffer.
+        
+        Args:
+            row: Row number of the strip
+            offset: Starting LED index on the strip
+            data: RGB bytes (3 per LED)
+        """
+        self.requested_pushes += 1
+        self._pending += 1
+        frame = self.frames[row]
+        start = 3 * offset
+        end = start + len(data)
+        if frame[start:end] != data:
+            frame[start:end] = data
+            self.dirty.add(row)
+    
+    def fill(self, row, offset, count, color):
+        """
+        Fill a run of LEDs in a row's back buffer with one color.
+        
+        Args:
+            row: Row number of the strip
+            offset: Starting LED index on the strip
+            count: Number of LEDs to fill
+            color: RGB tuple (r, g, b)
+        """
+        self.blit(row, offset, bytes(color) * count)
+    
+    def invalidate(self):
+        """Mark every strip dirty, e.g. after an output table change."""
+        self.dirty.update(self.strips)
+    
+    def commit(self):
+        """
+        Push every dirty strip once.
+        
+        Returns:
+            Number of strips pushed
+        """
+        pushed = len(self.dirty)
+        # Draws this push absorbs; strips dirtied by invalidate() alone
+        # were never drawn on, so they cannot make the saving negative
+        self.saved += max(0, self._pending - pushed)
+        self._pending = 0
+        if not pushed:
+            return 0
+        start = time.perf_counter()
+        lut = self.lut
+        strips = []
+        for row in sorted(self.dirty):
+            frame = self.frames[row]
+            strip = self.strips[row]
+            strip.write(frame if lut is None else frame.translate(lut))
+            strips.append(strip)
+        if self.show_strips is not None and pushed > 1:
+            # Every frame is written first, so all rows go out together
+            self.show_strips(strips)
+        else:
+            for strip in strips:
+                strip.show()
+        self.shows += pushed
+        self.dirty.clear()
+        STRIP_SHOWS.inc(pushed)
+        PUSH_SECONDS.observe(time.perf_counter() - start)
+        return pushed
+    
+    @property
+    def shows_saved(self):
+        """Number of strip pushes avoided compared to one show per draw."""
+        return self.saved
 
 
 class LEDManager:
     """Manages all LED matrix operations for the Tic-Tac-Toe game."""
     
-    def __init__(self):
-        """Initialize NeoPixel strips for all three rows of matrices."""
-        # Map GPIO pin numbers to board pin objects
-        pin_map = {
-            12: board.D12,
-            18: board.D18,
-            19: board.D19,
-        }
+    def __init__(self, backend=None, animation_cache=ANIMATION_CACHE_PATH,
+                 clear=True, colors=None):
+        """
+        Initialize pixel strips for all rows of matrices.
         
-        # Create NeoPixel strips for each row
+        Args:
+            backend: Hardware backend (default: the process-wide backend)
+            animation_cache: Prebuilt animation file to play the startup,
+                             win and draw animations from, an open
+                             AnimationCache to share, or None to render
+                             them live
+            clear: Push dark frames to every strip now; without it, the
+                   first commit() pushes every strip instead
+            colors: ColorPipeline to share (default: a new one)
+        """
+        self.backend = backend or get_backend()
+        
+        # Create a pixel strip for each row. Brightness and gamma are baked
+        # into the pushed frames, so the strips run at full brightness and
+        # never scale pixels themselves.
         self.strips = {}
         for row_num, gpio_pin in LED_DATA_PINS.items():
-            self.strips[row_num] = neopixel.NeoPixel(
-                pin_map[gpio_pin],
-                LEDS_PER_ROW,
-                brightness=LED_BRIGHTNESS,
-                auto_write=False,
-                pixel_order=neopixel.GRB
+            self.strips[row_num] = self.backend.pixel_strip(
+                gpio_pin, LEDS_PER_ROW, brightness=1.0
             )
         
+        # Back buffers; all drawing goes through here and is pushed by commit()
+        self.compositor = FrameCompositor(
+            self.strips, LEDS_PER_ROW,
+            show_strips=self.backend.show_strips if LED_PARALLEL_PUSH else None
+        )
+        
+        # Output tables for LED_BRIGHTNESS, gamma and fade levels
+        self.colors = colors or ColorPipeline()
+        self.compositor.set_lut(self.colors.lut())
+        
+        # Compiled glyphs; brightness is applied by the output table
+        self.glyphs = GlyphCache()
+        self.glyphs.precompile()
+        
+        # Prebuilt animations (built on first start, or when stale)
+        self._owns_animations = not isinstance(animation_cache, AnimationCache)
+        if not animation_cache:
+            self.animations = None
+        elif self._owns_animations:
+            self.animations = AnimationCache(animation_cache)
+        else:
+            self.animations = animation_cache
+        
+        # Strip LED to wall pixel permutation for draw_image(), built on
+        # first use
+        self._wall_order = None
+        
         # Clear all LEDs on initialization
-        self.clear_all()
+        if clear:
+            self.clear_all()
+    
+    def _get_row_and_offset(self, panel_num):
+        """
+        Get the row number and LED offset for a given panel number.
+        
+        Args:
+            panel_num: Panel number (0 to NUM_PANELS - 1)
+            
+        Returns:
+            Tuple of (row, offset) where offset is the starting LED index
+        """
+        row, col = divmod(panel_num, BOARD_WIDTH)
+        return row, col * LEDS_PER_MATRIX
     
     def _get_strip_and_offset(self, panel_num):
         """
-        Get the NeoPixel strip and LED offset for a given panel number.
+        Get the pixel strip and LED offset for a given panel number.
         
         Args:
-            panel_num: Panel number (0-8)
+            panel_num: Panel number (0 to NUM_PANELS - 1)
             
         Returns:
             Tuple of (strip, offset) where offset is the starting LED index
         """
-        row = panel_num // 3  # 0, 1, or 2
-        col = panel_num % 3   # 0, 1, or 2
-        strip = self.strips[row]
-        offset = col * LEDS_PER_MATRIX
-        return strip, offset
+        row, offset = self._get_row_and_offset(panel_num)
+        return self.strips[row], offset
     
-    def set_panel_pattern(self, panel_num, pattern, color):
+    def draw_panel_pattern(self, panel_num, pattern, color):
         """
-        Display a pattern on a specific panel.
+        Draw a pattern into a panel's back buffer without pushing it.
         
         Args:
-            panel_num: Panel number (0-8)
+            panel_num: Panel number (0 to NUM_PANELS - 1)
             pattern: 8x8 array where 1 = LED on, 0 = LED off
             color: RGB tuple (r, g, b)
         """
         if pattern is None:
             return
         
-        strip, offset = self._get_strip_and_offset(panel_num)
-        pixel_indices = pattern_to_pixel_indices(pattern)
+        row, offset = self._get_row_and_offset(panel_num)
+        glyph = self.glyphs.get(pattern, color)
         
-        # Clear the panel first
-        for i in range(LEDS_PER_MATRIX):
-            strip[offset + i] = EMPTY_COLOR
+        # Blit the whole compiled panel (unlit pixels included) in one copy
+        self.compositor.blit(row, offset, glyph.data)
+    
+    def fill_panel(self, panel_num, color):
+        """
+        Fill a panel's back buffer with one color without pushing it.
         
-        # Set the pattern pixels
-        for pixel_idx in pixel_indices:
-            strip[offset + pixel_idx] = color
+        Args:
+            panel_num: Panel number (0 to NUM_PANELS - 1)
+            color: RGB tuple (r, g, b)
+        """
+        row, offset = self._get_row_and_offset(panel_num)
+        self.compositor.fill(row, offset, LEDS_PER_MATRIX, color)
+    
+    def commit(self):
+        """
+        Push all panels drawn since the last commit.
         
-        strip.show()
+        Returns:
+            Number of strips pushed
+        """
+        return self.compositor.commit()
     
-    def set_panel_symbol(self, panel_num, symbol):
+    def _image_rows(self, image):
         """
-        Display X or O symbol on a panel.
+        Rearrange an image into strip LED order.
+        
+        Args:
+            image: uint8 array, either the whole wall as
+                   (BOARD_HEIGHT * 8, BOARD_WIDTH * 8, 3) or one 8x8 tile per
+                   panel as (NUM_PANELS, 8, 8, 3)
+                   
+        Returns:
+            Array of shape (BOARD_HEIGHT, LEDS_PER_ROW, 3)
+        """
+        import numpy as np
+        
+        image = np.asarray(image, dtype=np.uint8)
+        wall_shape = (BOARD_HEIGHT * MATRIX_SIZE, BOARD_WIDTH * MATRIX_SIZE, 3)
+        panel_shape = (NUM_PANELS, MATRIX_SIZE, MATRIX_SIZE, 3)
+        
+        if image.shape == panel_shape:
+            # Panels are already in strip order: row by row, each panel's
+            # pixels row by row
+            return image.reshape(BOARD_HEIGHT, LEDS_PER_ROW, 3)
+        
+        if image.shape == wall_shape:
+            if self._wall_order is None:
+                rows = np.arange(BOARD_HEIGHT)[:, None]
+                col, pixel = np.divmod(np.arange(LEDS_PER_ROW)[None, :], LEDS_PER_MATRIX)
+                y, x = np.divmod(pixel, MATRIX_SIZE)
+                self._wall_order = (
+                    (rows * MATRIX_SIZE + y) * wall_shape[1] + col * MATRIX_SIZE + x
+                )
+            return image.reshape(-1, 3)[self._wall_order]
+        
+        raise ValueError(
+            f"Image shape {image.shape} is neither {wall_shape} nor {panel_shape}"
+        )
+    
+    def draw_image(self, image):
+        """
+        Draw a full-wall image into the back buffers without pushing it.
+        
+        Args:
+            image: uint8 array of shape (BOARD_HEIGHT * 8, BOARD_WIDTH * 8, 3)
+                   for the whole wall, or (NUM_PANELS, 8, 8, 3) per panel
+        """
+        rows = self._image_rows(image)
+        for row in self.strips:
+            self.compositor.blit(row, 0, rows[row].tobytes())
+    
+    def show_image(self, image):
+        """
+        Display a full-wall image.
+        
+        Args:
+            image: uint8 array, see draw_image()
+        """
+        self.draw_image(image)
+        self.commit()
+    
+    def image_frames(self, images, fps=None):
+        """
+        Frames from a stream of images, e.g. a generated effect or video.
+        
+        Args:
+            images: Iterable of uint8 arrays, see draw_image()
+            fps: Frame rate, or None to push as fast as the strips allow
+            
+        Yields:
+            Seconds to hold each frame after it is pushed
+        """
+        hold = 1 / fps if fps else 0
+        for image in images:
+            self.draw_image(image)
+            yield hold
+    
+    def set_fade(self, level):
+        """
+        Fade every panel without redrawing it. Takes effect on the next commit.
+        
+        Args:
+            level: Fade level (0.0 = off, 1.0 = full brightness)
+        """
+        self.compositor.set_lut(self.colors.lut(level))
+    
+    def set_panel_pattern(self, panel_num, pattern, color):
+        """
+        Display a pattern on a specific panel.
         
         Args:
-            panel_num: Panel number (0-8)
+            panel_num: Panel number (0 to NUM_PANELS - 1)
+            pattern: 8x8 array where 1 = LED on, 0 = LED off
+            color: RGB tuple (r, g, b)
+        """
+        if pattern is None:
+            return
+        
+        self.draw_panel_pattern(panel_num, pattern, color)
+        self.commit()
+    
+    def draw_panel_symbol(self, panel_num, symbol):
+        """
+        Draw X or O symbol into a panel's back buffer without pushing it.
+        
+        Args:
+            panel_num: Panel number (0 to NUM_PANELS - 1)
             symbol: 'X' or 'O'
         """
         pattern = get_pattern(symbol)
         color = PLAYER_X_COLOR if symbol == 'X' else PLAYER_O_COLOR
-        self.set_panel_pattern(panel_num, pattern, color)
+        self.draw_panel_pattern(panel_num, pattern, color)
+    
+    def set_panel_symbol(self, panel_num, symbol, trace=None):
+        """
+        Display X or O symbol on a panel.
+        
+        Args:
+            panel_num: Panel number (0 to NUM_PANELS - 1)
+            symbol: 'X' or 'O'
+            trace: Optional MoveTrace to mark the 'render' and 'push' stages on
+        """
+        self.draw_panel_symbol(panel_num, symbol)
+        if trace is not None:
+            trace.mark('render')
+        self.commit()
+        if trace is not None:
+            trace.mark('push')
     
     def clear_panel(self, panel_num):
         """
         Clear all LEDs on a specific panel.
         
         Args:
-            panel_num: Panel number (0-8)
+            panel_num: Panel number (0 to NUM_PANELS - 1)
         """
-        strip, offset = self._get_strip_and_offset(panel_num)
-        for i in range(LEDS_PER_MATRIX):
-            strip[offset + i] = EMPTY_COLOR
-        strip.show()
+        self.fill_panel(panel_num, EMPTY_COLOR)
+        self.commit()
     
     def clear_all(self):
         """Clear all LEDs on all panels."""
-        for strip in self.strips.values():
-            strip.fill(EMPTY_COLOR)
-            strip.show()
+        for row in self.strips:
+            self.compositor.fill(row, 0, LEDS_PER_ROW, EMPTY_COLOR)
+        self.commit()
     
-    def display_startup_sequence(self):
-        """Display 'TIC TAC TOE' text across all panels."""
-        print("Displaying startup sequence: TIC TAC TOE")
+    def play(self, frames):
+        """
+        Play a frame generator in the calling thread, blocking until done.
+        
+        Args:
+            frames: Iterator that draws a frame and yields its hold time
+        """
+        FrameScheduler(self.commit).run(frames)
+    
+    def _cached_frames(self, name):
+        """Frames of a prebuilt animation, or None if it is not cached."""
+        if self.animations is not None and name in self.animations:
+            return self.animations.frames(self, name)
+        return None
+    
+    def startup_frames(self):
+        """
+        Frames for the 'TIC TAC TOE' startup display.
+        
+        Returns:
+            Frame generator, from the animation cache when available
+        """
+        return self._cached_frames('startup') or self.render_startup_frames()
+    
+    def render_startup_frames(self):
+        """
+        Render the 'TIC TAC TOE' startup display live.
         
+        Yields:
+            Seconds to hold each frame after it is pushed
+        """
         # Display each letter on its corresponding panel
-        for panel_num in range(9):
+        for panel_num in range(NUM_PANELS):
             pattern = get_pattern(panel_num)
-            self.set_panel_pattern(panel_num, pattern, STARTUP_COLOR)
-            time.sleep(0.1)  # Small delay between each panel
+            self.draw_panel_pattern(panel_num, pattern, STARTUP_COLOR)
+            yield 0.1  # Small delay between each panel
         
         # Hold the display
-        time.sleep(2.5)
+        yield STARTUP_DISPLAY_DURATION
         
         # Fade out effect
-        for brightness in range(10, 0, -1):
-            for row_strip in self.strips.values():
-                row_strip.brightness = LED_BRIGHTNESS * (brightness / 10)
-                row_strip.show()
-            time.sleep(0.1)
-        
-        # Reset brightness and clear
-        for row_strip in self.strips.values():
-            row_strip.brightness = LED_BRIGHTNESS
-        self.clear_all()
-        print("Startup sequence complete")
+        try:
+            for progress, hold in frame_steps(1.0):
+                self.set_fade(1.0 - progress)
+                yield hold
+        finally:
+            # Reset the fade and clear, even if the fade was cancelled
+            self.set_fade(1.0)
+            for row in self.strips:
+                self.compositor.fill(row, 0, LEDS_PER_ROW, EMPTY_COLOR)
+        yield 0
     
-    def animate_win(self, winning_line):
+    def win_frames(self, winning_line):
         """
-        Display a celebration animation for the winning line.
+        Frames for the celebration animation on the winning line.
         
         Args:
-            winning_line: List of 3 panel numbers that form the winning line
+            winning_line: List of panel numbers that form the winning line
+            
+        Returns:
+            Frame generator, from the animation cache when available
         """
-        print(f"Animating win for panels: {winning_line}")
+        return (self._cached_frames(win_name(winning_line))
+                or self.render_win_frames(winning_line))
+    
+    def render_win_frames(self, winning_line):
+        """
+        Render the celebration animation on the winning line live.
+        
+        Args:
+            winning_line: List of panel numbers that form the winning line
+            
+        Yields:
+            Seconds to hold each frame after it is pushed
+        """
+        # The rainbow takes two thirds of the animation, the flashes the rest
+        cycles = 3
+        flashes = 4
+        rainbow_hold = WIN_ANIMATION_DURATION * 2 / 3 / (cycles * len(WIN_COLORS))
+        flash_hold = WIN_ANIMATION_DURATION / 3 / (2 * flashes)
         
         # Rainbow chase effect on winning panels
-        for cycle in range(3):  # 3 complete rainbow cycles
-            for color_idx, color in enumerate(WIN_COLORS):
+        for cycle in range(cycles):
+            for color in WIN_COLORS:
+                # Fill entire panels with current rainbow color
                 for panel_num in winning_line:
-                    strip, offset = self._get_strip_and_offset(panel_num)
-                    # Fill entire panel with current rainbow color
-                    for i in range(LEDS_PER_MATRIX):
-                        strip[offset + i] = color
-                    strip.show()
-                time.sleep(0.15)
+                    self.fill_panel(panel_num, color)
+                yield rainbow_hold
         
         # Flash effect
-        for _ in range(4):
+        for _ in range(flashes):
             # All winning panels bright white
             for panel_num in winning_line:
-                strip, offset = self._get_strip_and_offset(panel_num)
-                for i in range(LEDS_PER_MATRIX):
-                    strip[offset + i] = (255, 255, 255)
-                strip.show()
-            time.sleep(0.2)
+                self.fill_panel(panel_num, (255, 255, 255))
+            yield flash_hold
             
             # Turn off
             for panel_num in winning_line:
-                self.clear_panel(panel_num)
-            time.sleep(0.2)
+                self.fill_panel(panel_num, EMPTY_COLOR)
+            yield flash_hold
+    
+    def draw_frames(self):
+        """
+        Frames for the draw/tie animation.
+        
+        Returns:
+            Frame generator, from the animation cache when available
+        """
+        return self._cached_frames('draw') or self.render_draw_frames()
+    
+    def render_draw_frames(self):
+        """
+        Render the draw/tie animation live.
+        
+        Yields:
+            Seconds to hold each frame after it is pushed
+        """
+        # Pulse all panels with purple color: fill once, then step through
+        # the precomputed fade levels
+        for panel_num in range(NUM_PANELS):
+            self.fill_panel(panel_num, (128, 0, 128))
+        pulses = 3
+        try:
+            for progress, hold in frame_steps(DRAW_ANIMATION_DURATION):
+                # Fade in, then fade out, once per pulse
+                phase = progress * pulses % 1.0
+                self.set_fade(1.0 - abs(1.0 - 2 * phase))
+                yield hold
+        finally:
+            # Leave the panels dark at full fade level
+            for panel_num in range(NUM_PANELS):
+                self.fill_panel(panel_num, EMPTY_COLOR)
+            self.set_fade(1.0)
+    
+    def display_startup_sequence(self):
+        """Display 'TIC TAC TOE' text across all panels."""
+        print("Displaying startup sequence: TIC TAC TOE")
+        self.play(self.startup_frames())
+        print("Startup sequence complete")
+    
+    def animate_win(self, winning_line):
+        """
+        Display a celebration animation for the winning line.
+        
+        Args:
+            winning_line: List of panel numbers that form the winning line
+        """
+        print(f"Animating win for panels: {winning_line}")
+        self.play(self.win_frames(winning_line))
     
     def animate_draw(self):
         """Display an animation for a draw/tie game."""
         print("Animating draw")
+        self.play(self.draw_frames())
+    
+    def get_push_stats(self):
+        """
+        Get strip push statistics from the compositor.
         
-        # Pulse all panels with purple color
-        for _ in range(3):
-            # Fade in
-            for brightness in range(0, 11):
-                for panel_num in range(9):
-                    strip, offset = self._get_strip_and_offset(panel_num)
-                    color = tuple(int(c * brightness / 10) for c in (128, 0, 128))
-                    for i in range(LEDS_PER_MATRIX):
-                        strip[offset + i] = color
-                    strip.show()
-                time.sleep(0.05)
-            
-            # Fade out
-            for brightness in range(10, -1, -1):
-                for panel_num in range(9):
-                    strip, offset = self._get_strip_and_offset(panel_num)
-                    color = tuple(int(c * brightness / 10) for c in (128, 0, 128))
-                    for i in range(LEDS_PER_MATRIX):
-                        strip[offset + i] = color
-                    strip.show()
-                time.sleep(0.05)
+        Returns:
+            Dict with 'requested', 'shows' and 'saved' push counts
+        """
+        return {
+            'requested': self.compositor.requested_pushes,
+            'shows': self.compositor.shows,
+            'saved': self.compositor.shows_saved,
+        }
     
     def cleanup(self):
         """Clean up resources and turn off all LEDs."""
         print("Cleaning up LED manager")
+        stats = self.get_push_stats()
+        print(f"Strip pushes: {stats['shows']} shown, {stats['saved']} saved")
         self.clear_all()
         for strip in self.strips.values():
             strip.deinit()
+        if self.animations is not None and self._owns_animations:
+            self.animations.close()
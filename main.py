@@ -4,71 +4,355 @@ Tic-Tac-Toe Game - Main Entry Point
 Raspberry Pi Zero 2 W with WS2812B LED Matrices
 """
 
+import os
 import sys
 import time
 import signal
+import argparse
+import threading
 from game_controller import GameController
 from led_manager import LEDManager
 from button_handler import ButtonHandler
 from turn_indicator import TurnIndicator
-from config import RESET_DELAY
+from animation import AnimationPlayer, pause
+from input_queue import InputEventQueue
+from latency import LatencyTracker
+from hardware import get_backend, set_backend, BACKENDS
+from game_log import GameLog, GameRecord
+from metrics import REGISTRY
+from config import (
+    RESET_DELAY, AI_PLAYER, GAME_LOG_PATH, REPLAY_SPEED, FAST_BOOT, EMPTY_COLOR,
+    RUNTIME, BUTTON_INPUT, SPECTATOR_PORT, METRICS_PORT, METRICS_SNAPSHOT_PATH
+)
+
+# Fallback start time for process_age() where /proc is not available
+_LOADED = time.monotonic()
+
+TIME_TO_READY = REGISTRY.gauge(
+    'tictactoe_time_to_ready_seconds',
+    "Seconds from process start until the board accepted moves"
+)
+
+
+def process_age():
+    """
+    Seconds since this process started.
+    
+    Uses the kernel's start time of the process, so interpreter startup and
+    module imports are included. Falls back to the time since this module
+    was loaded where /proc is not available.
+    
+    Returns:
+        Seconds since process start
+    """
+    try:
+        with open('/proc/self/stat') as f:
+            # Field 22 (starttime), counted after the ')' closing the name
+            start_ticks = int(f.read().rsplit(')', 1)[1].split()[19])
+        with open('/proc/uptime') as f:
+            uptime = float(f.read().split()[0])
+        return max(0.0, uptime - start_ticks / os.sysconf('SC_CLK_TCK'))
+    except (OSError, ValueError, IndexError):
+        return time.monotonic() - _LOADED
+
+
+def run_together(*funcs, parallel=True):
+    """
+    Call functions at the same time, each on its own thread.
+    
+    Args:
+        funcs: Functions taking no arguments
+        parallel: False to call them one after another instead
+        
+    Returns:
+        List of their return values, in order
+        
+    Raises:
+        The first exception raised by any of them, once all have finished
+    """
+    results = [None] * len(funcs)
+    errors = [None] * len(funcs)
+    
+    def call(index):
+        try:
+            results[index] = funcs[index]()
+        except Exception as e:
+            errors[index] = e
+    
+    if parallel:
+        threads = [
+            threading.Thread(target=call, args=(index,), name=f"init-{index}")
+            for index in range(len(funcs))
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    else:
+        for index in range(len(funcs)):
+            call(index)
+    
+    for error in errors:
+        if error is not None:
+            raise error
+    return results
 
 
 class TicTacToeGame:
     """Main game class that coordinates all components."""
     
-    def __init__(self):
-        """Initialize all game components."""
+    def __init__(self, backend=None, ai_player=AI_PLAYER,
+                 game_log_path=GAME_LOG_PATH, fast_boot=FAST_BOOT,
+                 runtime=RUNTIME, button_input=BUTTON_INPUT,
+                 spectator_port=SPECTATOR_PORT, metrics_port=METRICS_PORT,
+                 metrics_path=METRICS_SNAPSHOT_PATH):
+        """
+        Initialize all game components.
+        
+        Args:
+            backend: Hardware backend (default: the process-wide backend)
+            ai_player: 'X' or 'O' for the side the board plays itself,
+                       None for two players
+            game_log_path: File every finished game is appended to,
+                           None to turn the game log off
+            fast_boot: Set up the components at the same time and play the
+                       startup animation while already accepting moves
+            runtime: 'threads' to play animations on a render thread and
+                     block in run(), 'asyncio' for run_async()
+            button_input: 'edge' for a GPIO callback per button, 'scan' to
+                          read all buttons on a scan clock
+            spectator_port: TCP port to stream the game to spectators on,
+                            None to turn the spectator server off
+            metrics_port: Local TCP port of the Prometheus metrics endpoint,
+                          None to turn it off
+            metrics_path: File the metrics are snapshotted to, None to turn
+                          snapshots off
+        """
         print("=" * 50)
         print("Tic-Tac-Toe Game - Initializing...")
         print("=" * 50)
         
         # Initialize components
+        self.backend = backend or get_backend()
+        print(f"Hardware backend: {self.backend.name}")
         self.game = GameController()
-        self.leds = LEDManager()
-        self.turn_indicator = TurnIndicator()
-        self.buttons = ButtonHandler(callback=self.on_button_press)
+        self.fast_boot = fast_boot
+        
+        # Presses are queued by the GPIO event thread and handled by run()
+        self.events = InputEventQueue()
+        
+        # Button-to-photon latency per move
+        self.latency = LatencyTracker()
+        
+        # Metrics of every module, exported while the game runs
+        self.metrics = None
+        if metrics_port is not None or metrics_path:
+            from metrics import MetricsExporter
+            self.metrics = MetricsExporter(port=metrics_port, path=metrics_path)
+        
+        # Single-player mode: the board answers with perfect play
+        self.ai_player = ai_player
+        if ai_player:
+            if (self.game.width, self.game.height, self.game.win_length) != (3, 3, 3):
+                raise ValueError("Single-player mode needs the classic 3x3 board")
+        
+        # The components don't depend on each other, so on fast boot they
+        # are set up at the same time. The LEDs are not cleared: the first
+        # startup frame pushes every strip anyway.
+        (self.leds, self.turn_indicator, self.buttons, self.solver,
+         self.game_log, self.spectators) = run_together(
+            lambda: LEDManager(self.backend, clear=not fast_boot),
+            lambda: TurnIndicator(self.backend),
+            lambda: self._open_buttons(button_input),
+            self._load_solver,
+            lambda: self._open_game_log(game_log_path),
+            lambda: self._open_spectators(spectator_port),
+            parallel=fast_boot,
+        )
+        if runtime == 'asyncio':
+            from async_runtime import AsyncAnimationPlayer
+            self.animator = AsyncAnimationPlayer(self.leds)
+        else:
+            self.animator = AnimationPlayer(self.leds)
+        self._start_clock()
         
         # Flag to track if we're waiting for input
         self.waiting_for_input = False
         
+        # Set by request_latency_dump(); the game loop does the dump
+        self._dump_requested = False
+        
+        # Serializes button handling with the end-of-game reset, which runs
+        # on the render thread
+        self._lock = threading.RLock()
+        
+        # Incremented on every reset so a stale end-of-game callback can
+        # tell that the game it belongs to was already skipped
+        self.round = 0
+        
+        # Set while the startup animation plays in the background
+        self._intro = False
+        
+        # Seconds from process start until moves were accepted
+        self.time_to_ready = None
+        
         print("Initialization complete!")
     
-    def on_button_press(self, panel_num):
+    def _open_buttons(self, button_input):
+        """Set up the button input that feeds the event queue."""
+        if button_input == 'scan':
+            from button_scanner import ButtonScanner
+            return ButtonScanner(callback=self.events.put, backend=self.backend)
+        return ButtonHandler(callback=self.events.put, backend=self.backend)
+    
+    def _load_solver(self):
+        """Load the perfect-play table in single-player mode."""
+        if not self.ai_player:
+            return None
+        from solver import Solver
+        return Solver()
+    
+    def _open_game_log(self, path):
+        """Open the game log, or return None if it is turned off."""
+        if not path:
+            return None
+        return GameLog(
+            path, width=self.game.width,
+            height=self.game.height, win_length=self.game.win_length
+        )
+    
+    def _open_spectators(self, port):
+        """Start the spectator server, or return None if it is turned off."""
+        if port is None:
+            return None
+        from spectators import SpectatorServer
+        return SpectatorServer(
+            port, width=self.game.width,
+            height=self.game.height, win_length=self.game.win_length
+        )
+    
+    def on_button_press(self, panel_num, event=None):
         """
         Callback for button press events.
         
         Args:
             panel_num: Panel number (0-8) that was pressed
+            event: Optional ButtonEvent the press came from, used to time
+                   the move from its GPIO edge
+        """
+        with self._lock:
+            self._handle_button_press(panel_num, event)
+    
+    def _handle_button_press(self, panel_num, event=None):
+        """
+        Handle a button press while holding the game lock.
+        
+        Args:
+            panel_num: Panel number (0-8) that was pressed
+            event: Optional ButtonEvent the press came from
         """
+        trace = None
+        if event is not None:
+            trace = self.latency.begin(event.edge_time)
+            trace.mark('debounce', event.timestamp)
+            trace.mark('queue')
+        
+        # Any press during the startup animation skips it, and still counts
+        # as a move
+        if self._intro:
+            self._intro = False
+            self.animator.cancel()
+            for panel in range(self.game.num_panels):
+                self.leds.fill_panel(panel, EMPTY_COLOR)
+            if self.ai_player == 'X':
+                self._play_ai_move()
+                return
+        
+        # Any press during the end-of-game animation skips to the next game
+        if self.game.is_game_over() and self.animator.is_busy():
+            print("\nSkipping end-of-game animation")
+            self.animator.cancel()
+            self.reset_game()
+            return
+        
         # Only process if we're waiting for input and game is not over
         if not self.waiting_for_input or self.game.is_game_over():
             return
         
+        # The board's own moves are not made with the buttons
+        if self.game.get_current_player() == self.ai_player:
+            return
+        
         print(f"\nButton pressed: Panel {panel_num}")
         
         # Try to make the move
         if self.game.make_move(panel_num):
+            if trace is not None:
+                trace.mark('logic')
+            
             # Valid move - update LED display
             current_player = self.game.get_board_state()[panel_num]
-            self.leds.set_panel_symbol(panel_num, current_player)
-            
-            # Print board state for debugging
-            self.game.print_board()
+            self.leds.set_panel_symbol(panel_num, current_player, trace)
+            if trace is not None:
+                self.latency.record(trace)
             
-            # Check if game is over
-            if self.game.is_game_over():
-                self.handle_game_over()
-            else:
-                # Update turn indicator for next player
-                self.turn_indicator.set_player(self.game.get_current_player())
+            self._after_move()
         else:
             print("Invalid move - square already occupied!")
     
+    def _after_move(self):
+        """Finish a move: end the game, or pass the turn to the next player."""
+        self.moves.append(self.game.last_move)
+        self.move_times.append(time.monotonic() - self._game_clock)
+        if self.spectators is not None:
+            self.spectators.move(
+                self.game.last_move, self.game.get_board_state()[self.game.last_move]
+            )
+        
+        # Print board state for debugging
+        self.game.print_board()
+        
+        # Check if game is over
+        if self.game.is_game_over():
+            self.handle_game_over()
+            return
+        
+        # Update turn indicator for next player
+        self.turn_indicator.set_player(self.game.get_current_player())
+        if self.spectators is not None:
+            self.spectators.turn(self.game.get_current_player())
+        
+        if self.game.get_current_player() == self.ai_player:
+            self._play_ai_move()
+    
+    def _play_ai_move(self):
+        """Make the board's own move in single-player mode."""
+        panel_num = self.solver.best_move(self.game)
+        print(f"\nBoard plays: Panel {panel_num}")
+        self.game.make_move(panel_num)
+        self.leds.set_panel_symbol(panel_num, self.game.get_board_state()[panel_num])
+        self._after_move()
+    
     def handle_game_over(self):
-        """Handle game over state (win or draw)."""
+        """
+        Handle game over state (win or draw).
+        
+        The end-of-game animation is queued on the render thread and this
+        returns immediately; the game resets when the animation finishes.
+        """
         self.waiting_for_input = False
         
+        if self.game_log is not None:
+            self.game_log.append(GameRecord(
+                self.game_start, self.moves, self.move_times,
+                self.game.get_winner(), self.game.get_winning_line()
+            ))
+        if self.spectators is not None:
+            if self.game.get_winner():
+                self.spectators.win(self.game.get_winner(), self.game.get_winning_line())
+            else:
+                self.spectators.draw()
+        
         if self.game.get_winner():
             # Someone won
             winner = self.game.get_winner()
@@ -78,11 +362,11 @@ class TicTacToeGame:
             print(f"Player {winner} WINS!")
             print(f"{'=' * 50}\n")
             
-            # Flash winner's turn indicator
-            self.turn_indicator.flash_winner(winner, times=5)
-            
-            # Animate winning line
-            self.leds.animate_win(winning_line)
+            # Flash winner's turn indicator, then animate winning line
+            frames = (
+                self.turn_indicator.flash_frames(winner, times=5),
+                self.leds.win_frames(winning_line),
+            )
         else:
             # Draw
             print(f"\n{'=' * 50}")
@@ -90,62 +374,270 @@ class TicTacToeGame:
             print(f"{'=' * 50}\n")
             
             # Animate draw
-            self.leds.animate_draw()
+            frames = (self.leds.draw_frames(),)
         
-        # Wait before resetting
-        time.sleep(RESET_DELAY)
+        # Wait before resetting for a new game
+        game_round = self.round
+        self.animator.play(
+            *frames, pause(RESET_DELAY),
+            on_done=lambda: self._finish_game(game_round)
+        )
+    
+    def _finish_game(self, game_round):
+        """
+        Reset after the end-of-game animation, unless it was already skipped.
         
-        # Reset for new game
-        self.reset_game()
+        Args:
+            game_round: Value of self.round when the game ended
+        """
+        with self._lock:
+            if self.round == game_round:
+                self.reset_game()
+    
+    def _end_intro(self):
+        """Let the board make the first move once the startup animation ends."""
+        with self._lock:
+            if self._intro:
+                self._intro = False
+                if self.ai_player == 'X' and not self.moves:
+                    self._play_ai_move()
+    
+    def _report_ready(self):
+        """Record and print how long it took until moves were accepted."""
+        self.time_to_ready = process_age()
+        TIME_TO_READY.set(self.time_to_ready)
+        print(f"Ready {self.time_to_ready * 1000:.0f} ms after process start")
+    
+    def _start_clock(self):
+        """Start timing a new game for the game log."""
+        self.game_start = time.time()
+        # Move times come from the monotonic clock, so a wall-clock step
+        # during the game cannot make them negative
+        self._game_clock = time.monotonic()
+        self.moves = []
+        self.move_times = []
     
     def reset_game(self):
         """Reset the game for a new round."""
         print("\nResetting for new game...\n")
         
         # Reset game state
+        self.round += 1
         self.game.reset_game()
+        self._start_clock()
         
         # Clear all LED matrices
         self.leds.clear_all()
         
         # Set turn indicator to Player X
         self.turn_indicator.set_player('X')
+        if self.spectators is not None:
+            self.spectators.reset()
         
         # Ready to accept input again
         self.waiting_for_input = True
+        
+        # In single-player mode the board may have the first move
+        if self.ai_player == 'X':
+            self._play_ai_move()
+    
+    def _show_intro(self):
+        """Play the startup display on the animator; the first press skips it."""
+        print("Displaying startup sequence: TIC TAC TOE")
+        self._intro = True
+        self.animator.play(self.leds.startup_frames(), on_done=self._end_intro)
+    
+    def _open_board(self):
+        """Light the turn indicator for X and start accepting moves."""
+        # Set initial turn indicator
+        self.turn_indicator.set_player('X')
+        
+        print("\n" + "=" * 50)
+        print("Game Ready! Player X starts.")
+        if self.ai_player:
+            print(f"Single-player mode: the board plays {self.ai_player}.")
+        print("Press any button to make your move.")
+        print("=" * 50 + "\n")
+        
+        # Start accepting input
+        with self._lock:
+            self._start_clock()
+            self.waiting_for_input = True
+            self._report_ready()
+            if self.ai_player == 'X' and not self._intro:
+                self._play_ai_move()
+    
+    def request_latency_dump(self):
+        """
+        Ask the game loop to print the latency percentiles.
+        
+        Safe to call from a signal handler: it only sets a flag and wakes
+        the loop, which does the printing between moves.
+        """
+        self._dump_requested = True
+        self.events.wake()
+    
+    def _next_event(self, event):
+        """
+        Handle requests that woke the game loop.
+        
+        Args:
+            event: Result of waiting for a press (None if only woken)
+            
+        Returns:
+            The event, unchanged
+        """
+        if self._dump_requested:
+            self._dump_requested = False
+            self.latency.dump()
+        return event
     
     def run(self):
         """Run the main game loop."""
         try:
-            # Display startup sequence
-            self.leds.display_startup_sequence()
-            
-            # Set initial turn indicator
-            self.turn_indicator.set_player('X')
-            
-            # Start accepting input
-            self.waiting_for_input = True
-            
-            print("\n" + "=" * 50)
-            print("Game Ready! Player X starts.")
-            print("Press any button to make your move.")
-            print("=" * 50 + "\n")
+            # Display startup sequence. On fast boot it plays on the render
+            # thread and the first press skips it.
+            if self.fast_boot:
+                self._show_intro()
+            else:
+                self.leds.display_startup_sequence()
+            self._open_board()
             
-            # Main game loop - just keep running and let callbacks handle everything
+            # Main game loop - block until the next button press
             while True:
-                time.sleep(0.1)
-                
+                event = self._next_event(self.events.get())
+                if event is not None:
+                    self.on_button_press(event.panel_num, event)
+        
+        except KeyboardInterrupt:
+            print("\n\nGame interrupted by user")
+        finally:
+            self.cleanup()
+    
+    def run_async(self):
+        """
+        Run the main game loop on an asyncio event loop.
+        
+        Needs the game to be created with runtime='asyncio'. Presses are
+        awaited and animations run as tasks on the loop, so an idle board
+        sleeps without periodic wakeups.
+        """
+        import asyncio
+        try:
+            asyncio.run(self._serve())
         except KeyboardInterrupt:
             print("\n\nGame interrupted by user")
         finally:
             self.cleanup()
     
+    async def _serve(self):
+        """Event loop side of run_async()."""
+        from async_runtime import AsyncButtonEvents
+        events = AsyncButtonEvents(self.events)
+        try:
+            if self.fast_boot:
+                self._show_intro()
+            else:
+                print("Displaying startup sequence: TIC TAC TOE")
+                self.animator.play(self.leds.startup_frames())
+                await self.animator.wait()
+            self._open_board()
+            
+            # Main game loop - wait for the next button press
+            while True:
+                event = self._next_event(await events.get())
+                if event is not None:
+                    self.on_button_press(event.panel_num, event)
+        finally:
+            events.close()
+    
+    def run_replay(self, path, speed=REPLAY_SPEED, loop=False):
+        """
+        Replay recorded games on the board.
+        
+        Without loop, the log is played once and the game shuts down (a
+        repeatable load test). With loop, the log repeats as an attract mode
+        until any button is pressed, then this returns so run() can start a
+        real game.
+        
+        Args:
+            path: Game log file to replay
+            speed: Playback speed multiplier (0 = as fast as possible)
+            loop: Repeat until a button is pressed
+        """
+        from replay import Replayer, loop_games
+        from game_log import read_games
+        replayer = Replayer(self.leds, speed, self.turn_indicator)
+        records = loop_games(path) if loop else read_games(path)
+        speed_name = f"{speed:g}x" if speed else "maximum"
+        print(f"\nReplaying {path} at {speed_name} speed"
+              + (" - press any button to play" if loop else ""))
+        
+        finished = False
+        try:
+            self.animator.play(replayer.replay_frames(records))
+            if loop:
+                # The press only ends the replay; it is not a move
+                while self._next_event(self.events.get()) is None:
+                    pass
+                self.animator.cancel()
+                self.events.clear()
+                self.leds.clear_all()
+                self.turn_indicator.turn_off_all()
+            else:
+                self.animator.wait()
+            finished = True
+        except KeyboardInterrupt:
+            print("\n\nReplay interrupted by user")
+        finally:
+            stats = replayer.get_stats()
+            print(f"Replay: {stats['games']} games, {stats['moves']} moves, "
+                  f"{stats['frames']} frames ({stats['shows']} strip pushes) "
+                  f"in {stats['seconds']:.2f} s - "
+                  f"{stats['frames_per_second']:.1f} frames/s, "
+                  f"{stats['moves_per_second']:.1f} moves/s")
+            if not (finished and loop):
+                self.cleanup()
+    
     def cleanup(self):
         """Clean up all resources."""
         print("\nCleaning up...")
+        self.animator.stop()
         self.leds.cleanup()
         self.turn_indicator.cleanup()
         self.buttons.cleanup()
+        if self.game_log is not None:
+            self.game_log.close()
+            print(f"Game log: {self.game_log.written} games written "
+                  f"to {self.game_log.path}")
+        if self.metrics is not None:
+            self.metrics.close()
+        if self.spectators is not None:
+            self.spectators.close()
+            stats = self.spectators.get_stats()
+            print(f"Spectators: {stats['connections']} connections, "
+                  f"{stats['published']} updates, {stats['resyncs']} resyncs, "
+                  f"{stats['disconnected']} disconnected")
+        
+        stats = self.events.get_stats()
+        print(f"Input queue: {stats['handled']} handled, "
+              f"{stats['dropped']} dropped, max depth {stats['max_depth']}, "
+              f"wait mean {stats['mean_wait'] * 1000:.2f} ms / "
+              f"max {stats['max_wait'] * 1000:.2f} ms")
+        if hasattr(self.buttons, 'get_stats'):
+            stats = self.buttons.get_stats()
+            print(f"Button scan: {stats['scans']} scans, "
+                  f"{stats['overruns']} overruns, "
+                  f"jitter mean {stats['mean_jitter'] * 1000:.3f} ms / "
+                  f"max {stats['max_jitter'] * 1000:.3f} ms, "
+                  f"edge-to-event mean {stats['mean_latency'] * 1000:.2f} ms / "
+                  f"max {stats['max_latency'] * 1000:.2f} ms")
+        stats = self.animator.scheduler.get_stats()
+        print(f"Animations: {stats['frames']} frames pushed, "
+              f"{stats['missed']} missed deadlines, "
+              f"{stats['dropped']} merged, "
+              f"max lag {stats['max_lag'] * 1000:.2f} ms")
+        self.latency.dump()
         print("Cleanup complete. Goodbye!")
 
 
@@ -155,14 +647,103 @@ def signal_handler(sig, frame):
     sys.exit(0)
 
 
+def parse_args(argv=None):
+    """
+    Parse command line arguments.
+    
+    Args:
+        argv: Argument list (default: sys.argv[1:])
+        
+    Returns:
+        argparse.Namespace with the parsed options
+    """
+    parser = argparse.ArgumentParser(description="Tic-Tac-Toe LED matrix game")
+    parser.add_argument(
+        '--backend', choices=sorted(BACKENDS),
+        help="hardware backend (default: config.HARDWARE_BACKEND)"
+    )
+    parser.add_argument(
+        '--ai', choices=['X', 'O'], default=AI_PLAYER,
+        help="single-player mode: the board plays this side"
+    )
+    parser.add_argument(
+        '--fast-boot', action=argparse.BooleanOptionalAction, default=FAST_BOOT,
+        help="accept moves while the startup animation plays "
+             "(default: %(default)s)"
+    )
+    parser.add_argument(
+        '--runtime', choices=['threads', 'asyncio'], default=RUNTIME,
+        help="run the game loop on threads or on an asyncio event loop "
+             "(default: %(default)s)"
+    )
+    parser.add_argument(
+        '--buttons', choices=['edge', 'scan'], default=BUTTON_INPUT,
+        help="read buttons with per-pin edge callbacks or on a batched "
+             "scan clock (default: %(default)s)"
+    )
+    parser.add_argument(
+        '--spectators', metavar='PORT', type=int, default=SPECTATOR_PORT,
+        help="stream the game to spectator clients on this TCP port "
+             "(default: %(default)s)"
+    )
+    parser.add_argument(
+        '--metrics-port', metavar='PORT', type=int, default=METRICS_PORT,
+        help="serve Prometheus metrics on this local TCP port "
+             "(default: %(default)s)"
+    )
+    parser.add_argument(
+        '--metrics-file', metavar='PATH', default=METRICS_SNAPSHOT_PATH,
+        help="write a metrics snapshot to PATH periodically "
+             "(default: %(default)s)"
+    )
+    parser.add_argument(
+        '--replay', metavar='LOG',
+        help="replay the games in a game log, then exit"
+    )
+    parser.add_argument(
+        '--speed', type=float, default=REPLAY_SPEED,
+        help="replay speed multiplier, 0 for as fast as possible "
+             "(default: %(default)s)"
+    )
+    parser.add_argument(
+        '--loop', action='store_true',
+        help="with --replay: repeat as an attract mode until a button is "
+             "pressed, then start a game"
+    )
+    args = parser.parse_args(argv)
+    if args.replay and args.runtime == 'asyncio':
+        parser.error("--replay needs --runtime threads")
+    return args
+
+
 def main():
     """Main entry point."""
+    args = parse_args()
+    if args.backend:
+        set_backend(args.backend)
+    
     # Set up signal handler for graceful shutdown
     signal.signal(signal.SIGINT, signal_handler)
     
     # Create and run game
-    game = TicTacToeGame()
-    game.run()
+    game = TicTacToeGame(
+        ai_player=args.ai, fast_boot=args.fast_boot, runtime=args.runtime,
+        button_input=args.buttons, spectator_port=args.spectators,
+        metrics_port=args.metrics_port, metrics_path=args.metrics_file
+    )
+    
+    # Dump latency percentiles on demand: kill -USR1 <pid>
+    signal.signal(signal.SIGUSR1, lambda sig, frame: game.request_latency_dump())
+    
+    if args.replay:
+        game.run_replay(args.replay, args.speed, args.loop)
+        if not args.loop:
+            return
+    
+    if args.runtime == 'asyncio':
+        game.run_async()
+    else:
+        game.run()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,324 @@
+"""
+Metrics Registry for Tic-Tac-Toe
+Counters and histograms that the game modules update on their hot paths,
+exported in the Prometheus text format over HTTP and to a snapshot file
+"""
+
+import os
+import time
+import socket
+import threading
+from bisect import bisect_left
+from http.server import HTTPServer, BaseHTTPRequestHandler
+from config import METRICS_HOST, METRICS_SNAPSHOT_INTERVAL
+
+# Upper bounds in seconds of the default histogram buckets
+DEFAULT_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005,
+                   0.01, 0.025, 0.05, 0.1, 0.25)
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+class Counter:
+    """
+    A value that only goes up.
+
+    Several threads update some counters (the main and render threads both
+    push strips), and += on a shared number can lose an update. Each thread
+    therefore adds into its own shard, with no lock, and the value is the
+    sum of the shards.
+    """
+
+    __slots__ = ('_local', '_shards')
+
+    def __init__(self):
+        self._local = threading.local()
+        self._shards = []
+
+    def inc(self, amount=1):
+        """Add to the counter."""
+        try:
+            shard = self._local.shard
+        except AttributeError:
+            shard = self._local.shard = [0]
+            self._shards.append(shard)
+        shard[0] += amount
+
+    @property
+    def value(self):
+        """Total over all threads."""
+        return sum(shard[0] for shard in self._shards)
+
+
+class Gauge:
+    """A value that is set, e.g. a duration measured once."""
+
+    __slots__ = ('value',)
+
+    def __init__(self):
+        self.value = 0
+
+    def set(self, value):
+        """Replace the value."""
+        self.value = value
+
+
+class Histogram:
+    """
+    Observations counted into fixed buckets, plus their count and sum.
+
+    Like a Counter, each thread counts into its own shard. Buckets are
+    counted individually and only made cumulative on export, so an
+    observation is one search and two additions, with no lock.
+    """
+
+    __slots__ = ('bounds', '_local', '_shards')
+
+    def __init__(self, bounds):
+        """
+        Initialize the histogram.
+
+        Args:
+            bounds: Sorted upper bounds of the buckets (+Inf is implied)
+        """
+        self.bounds = tuple(bounds)
+        self._local = threading.local()
+        # [bucket counts, sum] per thread
+        self._shards = []
+
+    def observe(self, value):
+        """Count one observation."""
+        try:
+            shard = self._local.shard
+        except AttributeError:
+            shard = self._local.shard = [[0] * (len(self.bounds) + 1), 0.0]
+            self._shards.append(shard)
+        shard[0][bisect_left(self.bounds, value)] += 1
+        shard[1] += value
+
+    @property
+    def counts(self):
+        """Observations per bucket over all threads (not cumulative)."""
+        counts = [0] * (len(self.bounds) + 1)
+        for shard in self._shards:
+            for i, count in enumerate(shard[0]):
+                counts[i] += count
+        return counts
+
+    @property
+    def sum(self):
+        """Sum of all observations over all threads."""
+        return sum(shard[1] for shard in self._shards)
+
+
+class Registry:
+    """Named metrics of the process, rendered in the Prometheus text format."""
+
+    def __init__(self):
+        # name -> (type, help text, {label items: metric})
+        self._families = {}
+        self._lock = threading.Lock()
+
+    def _get(self, kind, name, help_text, labels, make):
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            family = self._families.setdefault(name, (kind, help_text, {}))
+            if family[0] != kind:
+                raise ValueError(f"Metric {name} is already a {family[0]}")
+            metric = family[2].get(key)
+            if metric is None:
+                metric = family[2][key] = make()
+        return metric
+
+    def counter(self, name, help_text, **labels):
+        """
+        Get a counter, registering it on first use.
+
+        Meant to be called once (e.g. at import) and the metric kept, so
+        the hot path only calls inc().
+
+        Args:
+            name: Metric name
+            help_text: Description for the HELP line
+            labels: Label values of this series
+
+        Returns:
+            Counter
+        """
+        return self._get('counter', name, help_text, labels, Counter)
+
+    def gauge(self, name, help_text, **labels):
+        """
+        Get a gauge, registering it on first use.
+
+        Args:
+            name: Metric name
+            help_text: Description for the HELP line
+            labels: Label values of this series
+
+        Returns:
+            Gauge
+        """
+        return self._get('gauge', name, help_text, labels, Gauge)
+
+    def histogram(self, name, help_text, buckets=DEFAULT_BUCKETS, **labels):
+        """
+        Get a histogram, registering it on first use.
+
+        Args:
+            name: Metric name
+            help_text: Description for the HELP line
+            buckets: Sorted upper bounds of the buckets
+            labels: Label values of this series
+
+        Returns:
+            Histogram
+        """
+        return self._get('histogram', name, help_text, labels,
+                         lambda: Histogram(buckets))
+
+    def render(self):
+        """
+        Render every metric.
+
+        Returns:
+            Text in the Prometheus exposition format (version 0.0.4)
+        """
+        with self._lock:
+            families = [(name, kind, help_text, list(series.items()))
+                        for name, (kind, help_text, series) in sorted(self._families.items())]
+
+        lines = []
+        for name, kind, help_text, series in families:
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            for labels, metric in series:
+                if kind != 'histogram':
+                    lines.append(f"{name}{_labels(labels)} {metric.value!r}")
+                    continue
+                counts = metric.counts
+                total = 0
+                for bound, count in zip(metric.bounds + (float('inf'),), counts):
+                    total += count
+                    le = '+Inf' if bound == float('inf') else repr(bound)
+                    lines.append(f"{name}_bucket{_labels(labels + (('le', le),))} {total}")
+                lines.append(f"{name}_sum{_labels(labels)} {metric.sum!r}")
+                lines.append(f"{name}_count{_labels(labels)} {total}")
+        return '\n'.join(lines) + '\n'
+
+
+def _labels(items):
+    """Format label items as {a="1",b="2"}, or nothing without labels."""
+    if not items:
+        return ''
+    return '{' + ','.join(f'{key}="{value}"' for key, value in items) + '}'
+
+
+# The registry the game modules report to
+REGISTRY = Registry()
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    """Serves the registry at /metrics."""
+
+    # A client that stops sending its request cannot hold the endpoint
+    timeout = 5.0
+
+    def do_GET(self):
+        if self.path.split('?')[0] not in ('/', '/metrics'):
+            self.send_error(404)
+            return
+        body = self.server.registry.render().encode()
+        self.send_response(200)
+        self.send_header('Content-Type', CONTENT_TYPE)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        """Keep scrapes out of the console."""
+
+
+class MetricsExporter:
+    """
+    Exports a registry over HTTP and/or to a snapshot file.
+
+    Both run on their own threads and only read the metrics, so exporting
+    never slows the game down. The HTTP thread blocks until a request
+    arrives and the snapshot thread wakes once per interval.
+    """
+
+    def __init__(self, registry=REGISTRY, port=None, host=METRICS_HOST,
+                 path=None, interval=METRICS_SNAPSHOT_INTERVAL):
+        """
+        Start exporting.
+
+        Args:
+            registry: Registry to export
+            port: TCP port of the HTTP endpoint (0 = any free port, see
+                  self.port), None for no endpoint
+            host: Address the endpoint listens on
+            path: File the metrics are written to every interval, None for
+                  no snapshots
+            interval: Seconds between snapshots
+        """
+        self.registry = registry
+        self.path = path
+        self.interval = interval
+        self.host = host
+        self.port = None
+        self.snapshots = 0
+        self._stopping = threading.Event()
+        self._threads = []
+
+        self._server = None
+        if port is not None:
+            self._server = HTTPServer((host, port), _MetricsHandler)
+            self._server.registry = registry
+            self.port = self._server.server_address[1]
+            self._start(self._serve, "metrics-http")
+            print(f"Metrics endpoint: http://{host}:{self.port}/metrics")
+
+        if path:
+            self._start(self._snapshot_loop, "metrics-snapshot")
+            print(f"Metrics snapshots: {path} every {interval:g} s")
+
+    def _start(self, target, name):
+        thread = threading.Thread(target=target, name=name, daemon=True)
+        thread.start()
+        self._threads.append(thread)
+
+    def _serve(self):
+        """HTTP thread: handle one request at a time until closed."""
+        while not self._stopping.is_set():
+            self._server.handle_request()
+
+    def _snapshot_loop(self):
+        while not self._stopping.wait(self.interval):
+            self.snapshot()
+
+    def snapshot(self):
+        """Write the metrics to the snapshot file, replacing it atomically."""
+        temp_path = self.path + '.tmp'
+        with open(temp_path, 'w') as f:
+            f.write(f"# Snapshot at {time.time():.3f}\n")
+            f.write(self.registry.render())
+        os.replace(temp_path, self.path)
+        self.snapshots += 1
+
+    def close(self):
+        """Stop exporting, writing a last snapshot."""
+        self._stopping.set()
+        if self._server is not None:
+            # Wake the HTTP thread out of its wait for a request
+            host = '127.0.0.1' if self.host in ('', '0.0.0.0') else self.host
+            try:
+                socket.create_connection((host, self.port), timeout=1.0).close()
+            except OSError:
+                pass
+        for thread in self._threads:
+            thread.join()
+        if self._server is not None:
+            self._server.server_close()
+        if self.path:
+            self.snapshot()
@@ -110,7 +110,7 @@ def get_pattern(symbol):
     Get the LED pattern for a given symbol.
     
     Args:
-        symbol: 'X', 'O', or panel number (0-8) for startup letters
+        symbol: 'X', 'O', or panel number for startup letters
         
     Returns:
         8x8 pattern array or None if invalid
@@ -119,7 +119,8 @@ def get_pattern(symbol):
         return PATTERN_X
     elif symbol == 'O':
         return PATTERN_O
-    elif isinstance(symbol, int) and 0 <= symbol <= 8:
+    elif isinstance(symbol, int):
+        # Panels beyond the 3x3 "TIC TAC TOE" letters stay dark
         return STARTUP_LETTERS.get(symbol)
     return None
 
@@ -0,0 +1,157 @@
+"""
+Game Replay for Tic-Tac-Toe
+Plays recorded games back through the game logic and the LED render path,
+as an attract mode on idle tables or as a repeatable load test
+"""
+
+import time
+from game_controller import GameController
+from game_log import read_games
+from config import REPLAY_SPEED, REPLAY_MAX_MOVE_GAP, RESET_DELAY, EMPTY_COLOR
+
+
+def loop_games(path):
+    """
+    Stream a game log over and over.
+    
+    Args:
+        path: Game log file path
+        
+    Yields:
+        GameRecord for each logged game, starting again at the end
+    """
+    while True:
+        empty = True
+        for record in read_games(path):
+            empty = False
+            yield record
+        if empty:
+            return
+
+
+class Replayer:
+    """
+    Turns recorded games into frame generators for LEDManager.
+    
+    Gaps between moves are taken from the recorded move times (capped at
+    REPLAY_MAX_MOVE_GAP) and, like the end-of-game animations, divided by
+    the speed multiplier. A speed of 0 drops every hold, so frames are
+    pushed as fast as the strips take them.
+    """
+    
+    def __init__(self, leds, speed=REPLAY_SPEED, turn_indicator=None):
+        """
+        Initialize the replayer.
+        
+        Args:
+            leds: LEDManager to draw on
+            speed: Playback speed multiplier (0 = as fast as possible)
+            turn_indicator: Optional TurnIndicator to drive as well
+        """
+        self.leds = leds
+        self.speed = speed
+        self.turn_indicator = turn_indicator
+        self.game = GameController(verbose=False, metrics=False)
+        
+        # Statistics
+        self.games = 0
+        self.moves = 0
+        self.frames = 0
+        self._start = None
+        self._end = None
+        self._start_shows = 0
+    
+    def _hold(self, seconds):
+        """Count a frame and scale its hold time by the speed."""
+        self.frames += 1
+        return seconds / self.speed if self.speed else 0
+    
+    def _scale(self, frames):
+        """Pass an animation through with its holds scaled by the speed."""
+        for hold in frames:
+            yield self._hold(hold)
+    
+    def game_frames(self, record):
+        """
+        Frames for one recorded game, including its end-of-game animation.
+        
+        Args:
+            record: GameRecord to replay
+            
+        Yields:
+            Seconds to hold each frame after it is pushed
+        """
+        game = self.game
+        game.reset_game(log=False)
+        for panel_num in range(game.num_panels):
+            self.leds.fill_panel(panel_num, EMPTY_COLOR)
+        if self.turn_indicator is not None:
+            self.turn_indicator.set_player('X')
+        yield self._hold(0)
+        
+        last_time = 0.0
+        for panel_num, move_time in zip(record.moves, record.times):
+            # Hold the previous frame for the recorded thinking time
+            gap = min(max(move_time - last_time, 0.0), REPLAY_MAX_MOVE_GAP)
+            last_time = move_time
+            player = game.get_current_player()
+            if not game.make_move(panel_num):
+                print(f"Replay: invalid move {panel_num} in {record!r}")
+                break
+            self.leds.draw_panel_symbol(panel_num, player)
+            if self.turn_indicator is not None and not game.is_game_over():
+                self.turn_indicator.set_player(game.get_current_player())
+            self.moves += 1
+            yield self._hold(gap)
+        
+        self.games += 1
+        if game.get_winner():
+            if self.turn_indicator is not None:
+                yield from self._scale(
+                    self.turn_indicator.flash_frames(game.get_winner(), times=5)
+                )
+            yield from self._scale(self.leds.win_frames(game.get_winning_line()))
+        elif game.is_draw():
+            yield from self._scale(self.leds.draw_frames())
+        yield self._hold(RESET_DELAY)
+    
+    def replay_frames(self, records):
+        """
+        Frames for a sequence of recorded games.
+        
+        Args:
+            records: Iterable of GameRecord
+            
+        Yields:
+            Seconds to hold each frame after it is pushed
+        """
+        self._start = time.perf_counter()
+        self._start_shows = self.leds.compositor.shows
+        try:
+            for record in records:
+                yield from self.game_frames(record)
+        finally:
+            self._end = time.perf_counter()
+    
+    def get_stats(self):
+        """
+        Get replay statistics.
+        
+        Returns:
+            Dict with games, moves, frames, strip shows, elapsed seconds,
+            frames per second and moves per second
+        """
+        if self._start is None:
+            elapsed = 0.0
+        else:
+            elapsed = (self._end or time.perf_counter()) - self._start
+        rate = 1 / elapsed if elapsed > 0 else 0.0
+        return {
+            'games': self.games,
+            'moves': self.moves,
+            'frames': self.frames,
+            'shows': self.leds.compositor.shows - self._start_shows,
+            'seconds': elapsed,
+            'frames_per_second': self.frames * rate,
+            'moves_per_second': self.moves * rate,
+        }
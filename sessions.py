@@ -0,0 +1,555 @@
+#!/usr/bin/env python3
+"""
+Multi-Table Session Manager for Tic-Tac-Toe
+Hosts the games of many boards in one process: one session per table ID,
+all fed from one input queue and driven by one scheduler thread
+
+Presses from every table go into a single queue. The scheduler thread
+handles them in arrival order and steps each table's end-of-game animation
+at its frame deadlines from a single timer heap, so a host needs one
+thread however many tables it serves. Sessions are created on a table's
+first press and dropped after SESSION_IDLE_TIMEOUT seconds without one.
+
+Usage:
+    python3 sessions.py     # tables one core can serve at the target latency
+"""
+
+import sys
+import heapq
+import random
+import argparse
+import itertools
+import threading
+import time
+from collections import OrderedDict, deque
+from game_controller import GameController
+from animation import FrameScheduler, pause
+from latency import LatencyTracker
+from config import (
+    SESSION_IDLE_TIMEOUT, SESSION_TARGET_LATENCY, SESSION_MOVE_INTERVAL,
+    SESSION_MAX_TABLES, RESET_DELAY, LATENCY_WINDOW
+)
+
+
+class TableSession:
+    """State of one table. Kept small, since a host holds many of them."""
+
+    __slots__ = ('table_id', 'game', 'leds', 'last_active', 'frames', 'scheduler')
+
+    def __init__(self, table_id, game, leds, now):
+        """
+        Create a session.
+
+        Args:
+            table_id: Key of the table
+            game: GameController for the table
+            leds: LEDManager of the table's board, or None
+            now: Clock value of the table's first press
+        """
+        self.table_id = table_id
+        self.game = game
+        self.leds = leds
+        self.last_active = now
+        # End-of-game animation playing now, and its frame deadlines
+        self.frames = None
+        self.scheduler = None
+
+
+class SessionManager:
+    """Many tables, one input queue, one scheduler."""
+
+    def __init__(self, make_leds=None, idle_timeout=SESSION_IDLE_TIMEOUT,
+                 clock=time.perf_counter, latency_window=LATENCY_WINDOW):
+        """
+        Initialize the manager.
+
+        Args:
+            make_leds: Function taking a table ID and returning the table's
+                       LEDManager, or None to run the games without LEDs
+            idle_timeout: Seconds without a press before a session is dropped
+            clock: Time source for latencies and frame deadlines
+            latency_window: Number of most recent moves kept for latency
+                            percentiles (None = all)
+        """
+        self.make_leds = make_leds
+        self.idle_timeout = idle_timeout
+        self.clock = clock
+        # Least recently active first
+        self.sessions = OrderedDict()
+        self.latency = LatencyTracker(latency_window)
+
+        self._events = deque()
+        self._cond = threading.Condition()
+        # Guards self.sessions and the folded-in frame counts, which the
+        # scheduler thread changes while get_stats() reads them
+        self._lock = threading.Lock()
+        # (deadline, sequence, session, frames) of every animation's next frame
+        self._timers = []
+        self._sequence = itertools.count()
+        self._stopping = False
+        self._thread = None
+
+        # Statistics
+        self.moves = 0
+        self.games = 0
+        self.frames = 0
+        self.missed = 0
+        self.evicted = 0
+
+    def put(self, table_id, panel_num, edge_time=None):
+        """
+        Queue a press. Safe to call from any thread.
+
+        Args:
+            table_id: Table the button belongs to
+            panel_num: Panel number (0-8) that was pressed
+            edge_time: Clock value of the press (default: now)
+        """
+        if edge_time is None:
+            edge_time = self.clock()
+        with self._cond:
+            self._events.append((table_id, panel_num, edge_time))
+            self._cond.notify()
+
+    def session(self, table_id):
+        """
+        Get a table's session, creating it on first use.
+
+        Args:
+            table_id: Table key
+
+        Returns:
+            TableSession
+        """
+        session = self.sessions.get(table_id)
+        if session is None:
+            leds = self.make_leds(table_id) if self.make_leds else None
+            session = TableSession(table_id, GameController(verbose=False), leds, self.clock())
+            with self._lock:
+                self.sessions[table_id] = session
+        return session
+
+    def is_animating(self, table_id):
+        """Check if a table is playing its end-of-game animation."""
+        session = self.sessions.get(table_id)
+        return session is not None and session.frames is not None
+
+    def handle(self, table_id, panel_num, edge_time):
+        """
+        Handle one press on the scheduler thread.
+
+        Args:
+            table_id: Table the button belongs to
+            panel_num: Panel number (0-8) that was pressed
+            edge_time: Clock value of the press
+        """
+        trace = self.latency.begin(edge_time)
+        trace.mark('queue', self.clock())
+        session = self.session(table_id)
+        session.last_active = self.clock()
+        with self._lock:
+            self.sessions.move_to_end(table_id)
+        game = session.game
+
+        # Any press during the end-of-game animation skips to the next game
+        if game.is_game_over():
+            if session.frames is not None:
+                self._stop_animation(session)
+                self._reset(session)
+            return
+
+        if not game.make_move(panel_num):
+            return
+        trace.mark('logic', self.clock())
+        if session.leds is not None:
+            session.leds.draw_panel_symbol(panel_num, game.get_board_state()[panel_num])
+            trace.mark('render', self.clock())
+            session.leds.commit()
+            trace.mark('push', self.clock())
+        self.latency.record(trace)
+        self.moves += 1
+
+        if game.is_game_over():
+            self.games += 1
+            self._start_animation(session)
+
+    def _end_frames(self, session):
+        """End-of-game animation of a session, then the pause before reset."""
+        game = session.game
+        if session.leds is not None:
+            if game.get_winner():
+                yield from session.leds.win_frames(game.get_winning_line())
+            else:
+                yield from session.leds.draw_frames()
+        yield from pause(RESET_DELAY)
+
+    def _start_animation(self, session):
+        commit = session.leds.commit if session.leds is not None else _no_commit
+        session.frames = self._end_frames(session)
+        session.scheduler = FrameScheduler(commit, clock=self.clock)
+        session.scheduler.start()
+        self._advance(session)
+
+    def _advance(self, session):
+        """Draw frames of a session until one has to be held, then set a timer."""
+        frames = session.frames
+        scheduler = session.scheduler
+        delay = 0.0
+        for hold in frames:
+            delay = scheduler.step(hold)
+            if delay is not None:
+                heapq.heappush(
+                    self._timers,
+                    (scheduler.deadline, next(self._sequence), session, frames)
+                )
+                return
+        if delay is None:
+            scheduler.flush()
+        self._stop_animation(session)
+        self._reset(session)
+
+    def _stop_animation(self, session):
+        """Close a session's animation; its pending timer goes stale."""
+        scheduler = session.scheduler
+        with self._lock:
+            self.frames += scheduler.frames
+            self.missed += scheduler.missed
+            session.scheduler = None
+        session.frames.close()
+        session.frames = None
+
+    def _reset(self, session):
+        session.game.reset_game(log=False)
+        if session.leds is not None:
+            session.leds.clear_all()
+
+    def next_due(self):
+        """
+        Get the deadline of the earliest animation frame.
+
+        Returns:
+            Clock value, or None if no table is animating
+        """
+        timers = self._timers
+        # Drop timers of animations that were skipped or evicted
+        while timers and timers[0][2].frames is not timers[0][3]:
+            heapq.heappop(timers)
+        return timers[0][0] if timers else None
+
+    def run_due(self):
+        """Advance every animation whose next frame is due."""
+        now = self.clock()
+        due = self.next_due()
+        while due is not None and due <= now:
+            _, _, session, _ = heapq.heappop(self._timers)
+            self._advance(session)
+            due = self.next_due()
+
+    def evict_idle(self):
+        """
+        Drop sessions that have had no press for the idle timeout.
+
+        Returns:
+            Clock value when the next session becomes idle, or None
+        """
+        limit = self.clock() - self.idle_timeout
+        while self.sessions:
+            session = next(iter(self.sessions.values()))
+            if session.last_active > limit or session.frames is not None:
+                return session.last_active + self.idle_timeout
+            self._evict(session)
+        return None
+
+    def _evict(self, session):
+        if session.frames is not None:
+            self._stop_animation(session)
+        if session.leds is not None:
+            session.leds.cleanup()
+        with self._lock:
+            del self.sessions[session.table_id]
+        self.evicted += 1
+
+    def run_pending(self):
+        """
+        Do all work that is due: queued presses, frames and evictions.
+
+        Returns:
+            Clock value when there is work again without a press, or None
+        """
+        while True:
+            with self._cond:
+                if not self._events:
+                    break
+                table_id, panel_num, edge_time = self._events.popleft()
+            self.handle(table_id, panel_num, edge_time)
+        self.run_due()
+        wake_times = [t for t in (self.next_due(), self.evict_idle()) if t is not None]
+        return min(wake_times) if wake_times else None
+
+    def start(self):
+        """Start the scheduler thread."""
+        self._stopping = False
+        self._thread = threading.Thread(target=self._run, name="sessions", daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        """Scheduler thread: sleep until a press or the next deadline."""
+        while True:
+            wake = self.run_pending()
+            with self._cond:
+                if self._stopping:
+                    return
+                if not self._events:
+                    timeout = None if wake is None else max(0.0, wake - self.clock())
+                    self._cond.wait(timeout)
+
+    def stop(self):
+        """Stop the scheduler thread and release every session's LEDs."""
+        if self._thread is not None:
+            with self._cond:
+                self._stopping = True
+                self._cond.notify()
+            self._thread.join()
+            self._thread = None
+        for session in list(self.sessions.values()):
+            self._evict(session)
+
+    def get_stats(self):
+        """
+        Get session statistics.
+
+        Returns:
+            Dict with live sessions, moves, finished games, animation frames
+            pushed and missed, evicted sessions and the p50/p99 move latency
+            in seconds (from the press to the strip push)
+        """
+        total = self.latency.percentiles()['total']
+        with self._lock:
+            count = len(self.sessions)
+            frames = self.frames
+            missed = self.missed
+            # Animations still playing have not been added up yet
+            for session in self.sessions.values():
+                scheduler = session.scheduler
+                if scheduler is not None:
+                    frames += scheduler.frames
+                    missed += scheduler.missed
+        return {
+            'sessions': count,
+            'moves': self.moves,
+            'games': self.games,
+            'frames': frames,
+            'missed': missed,
+            'evicted': self.evicted,
+            'p50': total['p50'],
+            'p99': total['p99'],
+        }
+
+
+def _no_commit():
+    """Commit function for tables without LEDs."""
+
+
+class VirtualClock:
+    """
+    Simulated time that also advances with the real time spent working.
+
+    set() jumps to a simulated moment; from there the clock runs with
+    time.perf_counter(), so the cost of the work done is charged to it.
+    """
+
+    def __init__(self):
+        self._base = 0.0
+        self._real = time.perf_counter()
+
+    def set(self, now):
+        """Jump to a simulated moment."""
+        self._base = now
+        self._real = time.perf_counter()
+
+    def __call__(self):
+        return self._base + time.perf_counter() - self._real
+
+
+def simulate_load(tables, move_interval=SESSION_MOVE_INTERVAL, duration=30.0,
+                  seed=0, leds=True):
+    """
+    Play many tables on one core in simulated time.
+
+    Each table is opened up front and then gets presses on random empty
+    panels at exponentially distributed intervals, except while it shows
+    its end-of-game animation.
+    Presses and frames are handled one at a time in simulated time, each
+    taking as long as it really takes, so work queues up exactly as it
+    would on a single core that is that busy.
+
+    Args:
+        tables: Number of tables
+        move_interval: Mean seconds between a table's presses
+        duration: Simulated seconds
+        seed: Random seed
+        leds: Render every table on an in-memory LED backend
+
+    Returns:
+        SessionManager.get_stats() dict plus 'tables' and 'utilization'
+        (fraction of the simulated time the core was busy)
+    """
+    clock = VirtualClock()
+    make_leds = _memory_leds() if leds else None
+    manager = SessionManager(make_leds, clock=clock, latency_window=None)
+    # Open every table first, so only moves and frames are timed
+    for table in range(tables):
+        manager.session(table)
+    rng = random.Random(seed)
+    presses = [(rng.expovariate(1 / move_interval), table) for table in range(tables)]
+    heapq.heapify(presses)
+
+    free = 0.0
+    busy = 0.0
+    while presses[0][0] < duration:
+        due = manager.next_due()
+        if due is not None and due <= presses[0][0]:
+            start = max(due, free)
+            clock.set(start)
+            manager.run_due()
+        else:
+            press_time, table = heapq.heappop(presses)
+            heapq.heappush(presses, (press_time + rng.expovariate(1 / move_interval), table))
+            if manager.is_animating(table):
+                # Players wait for the animation to finish
+                continue
+            start = max(press_time, free)
+            clock.set(start)
+            board = manager.session(table).game.get_board_state()
+            panel_num = rng.choice([i for i, mark in enumerate(board) if mark is None])
+            manager.handle(table, panel_num, press_time)
+        free = clock()
+        busy += free - start
+
+    stats = manager.get_stats()
+    # In-memory boards hold nothing that needs releasing
+    manager.sessions.clear()
+    stats['tables'] = tables
+    stats['utilization'] = busy / duration
+    return stats
+
+
+def _memory_leds():
+    """LEDManager factory for simulated boards sharing one cache and color table."""
+    from hardware import MemoryBackend
+    from led_manager import LEDManager
+    from colors import ColorPipeline
+    from animation_cache import AnimationCache
+    from config import ANIMATION_CACHE_PATH
+
+    cache = AnimationCache(ANIMATION_CACHE_PATH) if ANIMATION_CACHE_PATH else None
+    colors = ColorPipeline()
+
+    def make_leds(table_id):
+        return LEDManager(
+            MemoryBackend(record_frames=False), animation_cache=cache,
+            clear=False, colors=colors
+        )
+    return make_leds
+
+
+def capacity(target=SESSION_TARGET_LATENCY, move_interval=SESSION_MOVE_INTERVAL,
+             duration=30.0, seed=0, leds=True, max_tables=SESSION_MAX_TABLES):
+    """
+    Find how many tables one core can serve at a target move latency.
+
+    Doubles the table count until the p99 move latency of simulate_load()
+    goes over the target (or reaches max_tables), then narrows the bound
+    down to within 5%.
+
+    Args:
+        target: Highest acceptable p99 move latency in seconds
+        move_interval: Mean seconds between a table's presses
+        duration: Simulated seconds per trial
+        seed: Random seed
+        leds: Render every table on an in-memory LED backend
+        max_tables: Largest table count tried
+
+    Returns:
+        simulate_load() stats of the largest table count within the target,
+        plus 'met' (False when even one table misses it; the stats are then
+        those of one table and 'tables' is 0)
+    """
+    def trial(tables):
+        stats = simulate_load(tables, move_interval, duration, seed, leds)
+        # A trial too short to see a move has no latency to exceed
+        stats['met'] = stats['p99'] is None or stats['p99'] <= target
+        return stats, stats['met']
+
+    best, ok = trial(1)
+    if not ok:
+        best['tables'] = 0
+        return best
+    low, high = 1, 2
+    while high <= max_tables:
+        stats, ok = trial(high)
+        if not ok:
+            break
+        best, low, high = stats, high, high * 2
+    else:
+        # Every count within the limit met the target
+        return best
+    while high - low > max(1, low // 20):
+        middle = (low + high) // 2
+        stats, ok = trial(middle)
+        if ok:
+            best, low = stats, middle
+        else:
+            high = middle
+    return best
+
+
+def parse_args(argv=None):
+    """
+    Parse command line arguments.
+
+    Args:
+        argv: Argument list (default: sys.argv[1:])
+
+    Returns:
+        argparse.Namespace with the parsed options
+    """
+    parser = argparse.ArgumentParser(description="Tic-Tac-Toe tables per core")
+    parser.add_argument('--target-ms', type=float, default=SESSION_TARGET_LATENCY * 1000,
+                        help="p99 move latency to hold (default: %(default)s)")
+    parser.add_argument('--move-interval', type=float, default=SESSION_MOVE_INTERVAL,
+                        help="mean seconds between a table's moves (default: %(default)s)")
+    parser.add_argument('--duration', type=float, default=30.0,
+                        help="simulated seconds per trial (default: %(default)s)")
+    parser.add_argument('--seed', type=int, default=0,
+                        help="random seed (default: %(default)s)")
+    parser.add_argument('--no-leds', dest='leds', action='store_false',
+                        help="run the games without rendering")
+    return parser.parse_args(argv)
+
+
+def _ms(seconds):
+    """Format a latency, or 'n/a' when no move was timed."""
+    return 'n/a' if seconds is None else f"{seconds * 1000:.2f} ms"
+
+
+def main(argv=None):
+    """Main entry point."""
+    args = parse_args(argv)
+    stats = capacity(args.target_ms / 1000, args.move_interval,
+                     args.duration, args.seed, args.leds)
+    if not stats['met']:
+        print(f"Even one table misses p99 <= {args.target_ms:g} ms "
+              f"(one move per {args.move_interval:g} s)")
+    else:
+        print(f"{stats['tables']} tables on one core at p99 <= {args.target_ms:g} ms "
+              f"(one move per {args.move_interval:g} s each)")
+    print(f"  moves {stats['moves']}, games {stats['games']}, "
+          f"frames {stats['frames']} ({stats['missed']} missed)")
+    print(f"  move latency p50 {_ms(stats['p50'])}, p99 {_ms(stats['p99'])}, "
+          f"core busy {stats['utilization']:.0%}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,249 @@
+#!/usr/bin/env python3
+"""
+Perfect-Play Solver for Tic-Tac-Toe (classic 3x3 board)
+Solves every reachable position once, stores the result as a compact binary
+table and memory-maps it at startup so a move lookup costs no search
+
+Table file layout (little-endian):
+    header   magic b'TTTS', uint16 version, uint16 reserved, uint32 count
+    entries  count (3^9) x uint16, indexed by the base-3 code of the
+             position (X = 1, O = 2 per cell): bits 0-8 = best moves,
+             bits 9-10 = value for the side to move (0 draw, 1 win, 2 loss),
+             0xFFFF for positions no legal game reaches
+
+Every position has its own slot, so a lookup is one indexed read.
+
+Usage:
+    python3 solver.py           # (re)generate the table file
+"""
+
+import os
+import sys
+import mmap
+import array
+import random
+import struct
+from config import SOLVER_TABLE_PATH
+
+MAGIC = b'TTTS'
+VERSION = 2
+HEADER = struct.Struct('<4sHHI')
+
+# Values for the side to move
+DRAW, WIN, LOSS = 0, 1, 2
+VALUE_NAMES = {DRAW: 'draw', WIN: 'win', LOSS: 'loss'}
+
+MOVES_MASK = (1 << 9) - 1
+VALUE_SHIFT = 9
+
+# Entry of a position no legal game reaches
+UNREACHABLE = 0xFFFF
+
+# Slots in the table, one per base-3 position code
+SLOTS = 3 ** 9
+
+FULL_MASK = (1 << 9) - 1
+LINE_MASKS = [
+    sum(1 << i for i in line) for line in (
+        (0, 1, 2), (3, 4, 5), (6, 7, 8),
+        (0, 3, 6), (1, 4, 7), (2, 5, 8),
+        (0, 4, 8), (2, 4, 6),
+    )
+]
+
+# TERNARY[mask] is the base-3 code of a mask with every set cell = 1, so a
+# position's code is TERNARY[x_bits] + 2 * TERNARY[o_bits]
+TERNARY = [sum(3 ** i for i in range(9) if mask >> i & 1) for mask in range(512)]
+
+
+def position_code(x_bits, o_bits):
+    """
+    Base-3 code of a position, its slot in the table.
+    
+    Args:
+        x_bits: 9-bit mask of panels held by X
+        o_bits: 9-bit mask of panels held by O
+        
+    Returns:
+        Code in range(3 ** 9)
+    """
+    return TERNARY[x_bits] + 2 * TERNARY[o_bits]
+
+
+def _has_line(bits):
+    for mask in LINE_MASKS:
+        if bits & mask == mask:
+            return True
+    return False
+
+
+def solve():
+    """
+    Solve every reachable position.
+    
+    Returns:
+        Dict mapping position code to packed entry
+    """
+    scores = {}
+    table = {}
+    
+    def negamax(mover, other):
+        """Score for the side to move: +n win, -n loss, 0 draw (faster is larger)."""
+        key = (mover, other)
+        score = scores.get(key)
+        if score is not None:
+            return score
+        
+        empty = FULL_MASK & ~(mover | other)
+        if _has_line(other):
+            score = -(1 + bin(empty).count('1'))
+            best = 0
+        elif not empty:
+            score = 0
+            best = 0
+        else:
+            score = None
+            best = 0
+            for cell in range(9):
+                bit = 1 << cell
+                if not empty & bit:
+                    continue
+                child = -negamax(other, mover | bit)
+                if score is None or child > score:
+                    score = child
+                    best = bit
+                elif child == score:
+                    best |= bit
+        
+        scores[key] = score
+        
+        # X moves when both sides hold the same number of panels
+        if bin(mover).count('1') == bin(other).count('1'):
+            x_bits, o_bits = mover, other
+        else:
+            x_bits, o_bits = other, mover
+        value = WIN if score > 0 else LOSS if score < 0 else DRAW
+        table[position_code(x_bits, o_bits)] = best | value << VALUE_SHIFT
+        return score
+    
+    negamax(0, 0)
+    return table
+
+
+def write_table(path=SOLVER_TABLE_PATH):
+    """
+    Solve the game and write the table file.
+    
+    Args:
+        path: Output file path
+        
+    Returns:
+        Number of positions written
+    """
+    table = solve()
+    entries = array.array('H', [UNREACHABLE]) * SLOTS
+    for code, entry in table.items():
+        entries[code] = entry
+    if sys.byteorder != 'little':
+        entries.byteswap()
+    
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, VERSION, 0, SLOTS))
+        f.write(entries.tobytes())
+    os.replace(tmp_path, path)
+    return len(table)
+
+
+class Solver:
+    """Perfect-play move lookup backed by the memory-mapped table file."""
+    
+    def __init__(self, path=SOLVER_TABLE_PATH, rng=None):
+        """
+        Load the table, generating the file first if it is missing or stale.
+        
+        Args:
+            path: Table file path
+            rng: random.Random used to choose between equally good moves
+        """
+        self.path = path
+        self.rng = rng or random.Random()
+        try:
+            self._open()
+        except (OSError, ValueError, struct.error):
+            print(f"Generating solver table: {path}")
+            write_table(path)
+            self._open()
+    
+    def _open(self):
+        with open(self.path, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        
+        magic, version, _, count = HEADER.unpack_from(self._mmap)
+        if magic != MAGIC or version != VERSION:
+            self._mmap.close()
+            raise ValueError(f"Not a solver table (version {VERSION}): {self.path}")
+        if count != SLOTS or len(self._mmap) != HEADER.size + 2 * count:
+            self._mmap.close()
+            raise ValueError(f"Truncated solver table: {self.path}")
+        
+        start = HEADER.size
+        if sys.byteorder == 'little':
+            # Look up straight from the mapped pages
+            self._view = memoryview(self._mmap)
+            self._entries = self._view[start:].cast('H')
+        else:
+            self._view = None
+            self._entries = array.array('H')
+            self._entries.frombytes(self._mmap[start:])
+            self._entries.byteswap()
+        self.count = count
+    
+    def lookup(self, x_bits, o_bits):
+        """
+        Look up a position.
+        
+        Args:
+            x_bits: 9-bit mask of panels held by X
+            o_bits: 9-bit mask of panels held by O
+            
+        Returns:
+            Tuple of (value for the side to move, list of best panel numbers)
+            
+        Raises:
+            KeyError: If the position cannot be reached in a legal game
+        """
+        entry = UNREACHABLE
+        if not x_bits & o_bits:
+            entry = self._entries[TERNARY[x_bits] + 2 * TERNARY[o_bits]]
+        if entry == UNREACHABLE:
+            raise KeyError(f"Unreachable position: X={x_bits:09b} O={o_bits:09b}")
+        moves = entry & MOVES_MASK
+        return entry >> VALUE_SHIFT, [i for i in range(9) if moves >> i & 1]
+    
+    def best_move(self, game):
+        """
+        Choose a perfect-play move for the player to move.
+        
+        Args:
+            game: GameController on a 3x3 board
+            
+        Returns:
+            Panel number (0-8), or None if the game is over
+        """
+        if game.is_game_over():
+            return None
+        _, moves = self.lookup(game.x_bits, game.o_bits)
+        return self.rng.choice(moves) if moves else None
+    
+    def close(self):
+        """Release the memory map."""
+        if self._view is not None:
+            self._entries.release()
+            self._view.release()
+        self._mmap.close()
+
+
+if __name__ == "__main__":
+    count = write_table()
+    print(f"Wrote {count} positions to {SOLVER_TABLE_PATH}")
@@ -0,0 +1,424 @@
+#!/usr/bin/env python3
+"""
+Spectator Broadcast Server for Tic-Tac-Toe
+Streams the game to any number of TCP clients (scoreboards, screens) as
+compact binary board updates
+
+Every message is one type byte followed by a fixed-size payload. Marks
+and players are 0 (none), 1 (X) or 2 (O); k is the win length:
+    b'S'  uint8 width, uint8 height, uint8 win length, uint8 turn,
+          uint8 result (0 playing, 1 X won, 2 O won, 3 draw),
+          uint8[width x height] marks, uint8[k] winning line (0xFF padded)
+                                        full board, sent first and on resync
+    b'M'  uint8 panel, uint8 mark       a mark was placed
+    b'T'  uint8 player                  the turn passed to a player
+    b'W'  uint8 winner, uint8[k] line   the game was won
+    b'D'                                the game was drawn
+    b'R'                                the board was cleared, X to move
+
+The game only appends its updates to an outbox; a server thread sends them
+to every client without blocking. A client that falls more than
+SPECTATOR_BUFFER_LIMIT bytes behind stops getting updates until it has
+caught up, then gets one full board in their place. A client that makes
+no progress for SPECTATOR_STALL_TIMEOUT seconds is disconnected.
+
+Usage:
+    python3 spectators.py [HOST] [PORT]    # follow a game as text
+"""
+
+import sys
+import time
+import errno
+import socket
+import selectors
+import threading
+from collections import deque
+from config import (
+    SPECTATOR_HOST, SPECTATOR_PORT, SPECTATOR_BUFFER_LIMIT,
+    SPECTATOR_STALL_TIMEOUT, SPECTATOR_MAX_CLIENTS,
+    BOARD_WIDTH, BOARD_HEIGHT, WIN_LENGTH
+)
+
+PLAYERS = (None, 'X', 'O')
+NO_PANEL = 0xFF
+
+# Result byte of a full board
+PLAYING, X_WON, O_WON, DRAWN = range(4)
+
+
+def _mark(player):
+    return PLAYERS.index(player)
+
+
+class _Spectator:
+    """One connected client."""
+
+    __slots__ = ('sock', 'address', 'out', 'lagging', 'stalled_since')
+
+    def __init__(self, sock, address):
+        self.sock = sock
+        self.address = address
+        self.out = bytearray()
+        # Set while updates are held back until the client catches up
+        self.lagging = False
+        # Time of the last send progress while updates were waiting, or None
+        self.stalled_since = None
+
+
+class SpectatorServer:
+    """Non-blocking fan-out of board updates to TCP clients."""
+
+    def __init__(self, port=0, host=SPECTATOR_HOST,
+                 width=BOARD_WIDTH, height=BOARD_HEIGHT, win_length=WIN_LENGTH,
+                 buffer_limit=SPECTATOR_BUFFER_LIMIT,
+                 stall_timeout=SPECTATOR_STALL_TIMEOUT,
+                 max_clients=SPECTATOR_MAX_CLIENTS):
+        """
+        Start listening and start the server thread.
+
+        Args:
+            port: TCP port to listen on (0 = any free port, see self.port)
+            host: Address to listen on
+            width: Panels per row
+            height: Number of rows
+            win_length: Marks in a row needed to win
+            buffer_limit: Unsent bytes after which a client stops getting
+                          updates until it has caught up
+            stall_timeout: Seconds a client may hold unsent updates without
+                           reading any before it is disconnected
+            max_clients: Connections accepted at the same time
+        """
+        self.width = width
+        self.height = height
+        self.win_length = win_length
+        self.buffer_limit = buffer_limit
+        self.stall_timeout = stall_timeout
+        self.max_clients = max_clients
+
+        # The board as the clients see it, kept by the server thread
+        self._marks = bytearray(width * height)
+        self._turn = 1
+        self._result = PLAYING
+        self._line = bytes([NO_PANEL]) * win_length
+
+        self._outbox = deque()
+        self._clients = {}
+        self._selector = selectors.DefaultSelector()
+
+        self._listener = socket.create_server((host, port), backlog=128)
+        self._listener.setblocking(False)
+        self.port = self._listener.getsockname()[1]
+        self._selector.register(self._listener, selectors.EVENT_READ)
+        # Lets publishing threads and close() wake the server thread
+        self._wake_read, self._wake_write = socket.socketpair()
+        self._wake_read.setblocking(False)
+        self._wake_write.setblocking(False)
+        self._selector.register(self._wake_read, selectors.EVENT_READ)
+
+        # Statistics
+        self.published = 0
+        self.connections = 0
+        self.resyncs = 0
+        self.disconnected = 0
+
+        self._stopping = False
+        self._thread = threading.Thread(target=self._run, name="spectators", daemon=True)
+        self._thread.start()
+
+        print(f"Spectator server listening on {host}:{self.port}")
+
+    # Publishing (any thread; never blocks on a client)
+
+    def _publish(self, message):
+        self._outbox.append(message)
+        self.published += 1
+        try:
+            self._wake_write.send(b'x')
+        except BlockingIOError:
+            # The server thread already has wakeups pending
+            pass
+
+    def move(self, panel_num, player):
+        """A mark was placed on a panel."""
+        self._publish(bytes((ord('M'), panel_num, _mark(player))))
+
+    def turn(self, player):
+        """The turn passed to a player."""
+        self._publish(bytes((ord('T'), _mark(player))))
+
+    def win(self, winner, winning_line):
+        """The game was won."""
+        line = bytes(winning_line).ljust(self.win_length, bytes([NO_PANEL]))
+        self._publish(bytes((ord('W'), _mark(winner))) + line)
+
+    def draw(self):
+        """The game ended in a draw."""
+        self._publish(b'D')
+
+    def reset(self):
+        """The board was cleared for a new game."""
+        self._publish(b'R')
+
+    # Server thread
+
+    def _snapshot(self):
+        """Full board message of the current state."""
+        return (bytes((ord('S'), self.width, self.height, self.win_length,
+                       self._turn, self._result))
+                + self._marks + self._line)
+
+    def _apply(self, message):
+        """Update the board the clients see with one message."""
+        kind = message[0]
+        if kind == ord('M'):
+            self._marks[message[1]] = message[2]
+        elif kind == ord('T'):
+            self._turn = message[1]
+        elif kind == ord('W'):
+            self._result = message[1]
+            self._line = message[2:]
+        elif kind == ord('D'):
+            self._result = DRAWN
+        elif kind == ord('R'):
+            self._marks = bytearray(len(self._marks))
+            self._turn = 1
+            self._result = PLAYING
+            self._line = bytes([NO_PANEL]) * self.win_length
+
+    def _run(self):
+        """Server thread: accept clients and fan out the outbox."""
+        while not self._stopping:
+            # Wake up when the first stalled client runs out of time
+            stalls = [client.stalled_since for client in self._clients.values()
+                      if client.stalled_since is not None]
+            timeout = None
+            if stalls:
+                timeout = max(0.0, min(stalls) + self.stall_timeout - time.monotonic())
+            for key, events in self._selector.select(timeout):
+                sock = key.fileobj
+                if sock is self._listener:
+                    self._accept()
+                elif sock is self._wake_read:
+                    self._drain_wakeups()
+                else:
+                    client = self._clients.get(sock)
+                    if client is None:
+                        # Disconnected earlier in this round
+                        continue
+                    if events & selectors.EVENT_READ:
+                        self._receive(client)
+                    else:
+                        self._flush(client)
+            self._fan_out()
+            self._drop_stalled()
+
+    def _drain_wakeups(self):
+        try:
+            while self._wake_read.recv(4096):
+                pass
+        except BlockingIOError:
+            pass
+
+    def _accept(self):
+        """Accept waiting connections and send each a full board."""
+        while True:
+            try:
+                sock, address = self._listener.accept()
+            except BlockingIOError:
+                return
+            if len(self._clients) >= self.max_clients:
+                sock.close()
+                continue
+            sock.setblocking(False)
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            # Keep the kernel from buffering much more for a slow client
+            # than the server would
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, self.buffer_limit)
+            # Bring the board up to date first, so the queued updates go
+            # only to the clients that had connected before them
+            self._fan_out()
+            client = _Spectator(sock, address)
+            self._clients[sock] = client
+            self._selector.register(sock, selectors.EVENT_READ)
+            self.connections += 1
+            client.out += self._snapshot()
+            self._flush(client)
+
+    def _receive(self, client):
+        """Discard anything a client sends; disconnect it on EOF."""
+        try:
+            data = client.sock.recv(4096)
+        except BlockingIOError:
+            return
+        except OSError:
+            data = b''
+        if not data:
+            self._disconnect(client)
+
+    def _fan_out(self):
+        """Send every update in the outbox to every client."""
+        if not self._outbox:
+            return
+        batch = bytearray()
+        while self._outbox:
+            message = self._outbox.popleft()
+            self._apply(message)
+            batch += message
+        for client in list(self._clients.values()):
+            if client.lagging:
+                continue
+            if len(client.out) + len(batch) > self.buffer_limit:
+                # Too far behind: hold updates back until it catches up
+                client.lagging = True
+                self.resyncs += 1
+                self._flush(client)
+                continue
+            client.out += batch
+            self._flush(client)
+
+    def _flush(self, client):
+        """Send as much of a client's buffer as its socket takes."""
+        sent = 0
+        if client.out:
+            try:
+                sent = client.sock.send(client.out)
+            except BlockingIOError:
+                pass
+            except OSError:
+                self._disconnect(client)
+                return
+            del client.out[:sent]
+        if not client.out and client.lagging:
+            # Caught up: one full board replaces the updates it missed
+            client.lagging = False
+            client.out += self._snapshot()
+            self._flush(client)
+            return
+
+        events = selectors.EVENT_READ
+        if client.out:
+            events |= selectors.EVENT_WRITE
+            if client.stalled_since is None or sent:
+                client.stalled_since = time.monotonic()
+        else:
+            client.stalled_since = None
+        self._selector.modify(client.sock, events)
+
+    def _drop_stalled(self):
+        """Disconnect clients that have read nothing for the stall timeout."""
+        limit = time.monotonic() - self.stall_timeout
+        for client in list(self._clients.values()):
+            if client.stalled_since is not None and client.stalled_since <= limit:
+                self._disconnect(client)
+
+    def _disconnect(self, client):
+        if self._clients.pop(client.sock, None) is None:
+            return
+        self._selector.unregister(client.sock)
+        client.sock.close()
+        self.disconnected += 1
+
+    def get_stats(self):
+        """
+        Get broadcast statistics.
+
+        Returns:
+            Dict with connected clients, updates published, connections
+            accepted, resyncs of lagging clients and clients disconnected
+        """
+        return {
+            'clients': len(self._clients),
+            'published': self.published,
+            'connections': self.connections,
+            'resyncs': self.resyncs,
+            'disconnected': self.disconnected,
+        }
+
+    def close(self):
+        """Stop the server thread and disconnect every client."""
+        self._stopping = True
+        try:
+            self._wake_write.send(b'x')
+        except BlockingIOError:
+            pass
+        self._thread.join()
+        for client in list(self._clients.values()):
+            self._disconnect(client)
+        self._selector.close()
+        self._listener.close()
+        self._wake_read.close()
+        self._wake_write.close()
+
+
+def read_updates(sock):
+    """
+    Decode the update stream of a spectator connection.
+
+    Args:
+        sock: Connected blocking socket
+
+    Yields:
+        (kind, fields) per message: ('board', dict) for a full board, then
+        ('move', (panel, player)), ('turn', player), ('win', (winner,
+        line)), ('draw', None) or ('reset', None)
+    """
+    stream = sock.makefile('rb')
+    win_length = None
+    while True:
+        kind = stream.read(1)
+        if not kind:
+            return
+        if kind == b'S':
+            width, height, win_length, turn, result = stream.read(5)
+            marks = stream.read(width * height)
+            line = stream.read(win_length)
+            yield 'board', {
+                'width': width,
+                'height': height,
+                'win_length': win_length,
+                'turn': PLAYERS[turn],
+                'winner': PLAYERS[result] if result in (X_WON, O_WON) else None,
+                'draw': result == DRAWN,
+                'marks': [PLAYERS[mark] for mark in marks],
+                'winning_line': [p for p in line if p != NO_PANEL],
+            }
+        elif kind == b'M':
+            panel_num, mark = stream.read(2)
+            yield 'move', (panel_num, PLAYERS[mark])
+        elif kind == b'T':
+            yield 'turn', PLAYERS[stream.read(1)[0]]
+        elif kind == b'W':
+            winner = stream.read(1)[0]
+            line = stream.read(win_length)
+            yield 'win', (PLAYERS[winner], [p for p in line if p != NO_PANEL])
+        elif kind == b'D':
+            yield 'draw', None
+        elif kind == b'R':
+            yield 'reset', None
+        else:
+            raise ValueError(f"Unknown spectator message {kind!r}")
+
+
+def main(argv=None):
+    """Follow a game and print its updates."""
+    argv = sys.argv[1:] if argv is None else argv
+    host = argv[0] if argv else 'localhost'
+    port = int(argv[1]) if len(argv) > 1 else SPECTATOR_PORT
+    if port is None:
+        print("No port given and SPECTATOR_PORT is not set")
+        return 1
+    try:
+        with socket.create_connection((host, port)) as sock:
+            for kind, fields in read_updates(sock):
+                print(kind, '' if fields is None else fields)
+    except OSError as e:
+        if e.errno != errno.ECONNRESET:
+            print(f"Cannot follow {host}:{port}: {e}")
+            return 1
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
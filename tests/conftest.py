@@ -0,0 +1,10 @@
+"""
+Shared test setup: import the game modules from the repository root and
+run everything on the in-memory hardware backend
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('TICTACTOE_BACKEND', 'memory')
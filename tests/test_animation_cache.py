@@ -0,0 +1,128 @@
+"""Tests for building, invalidating and playing back the animation cache."""
+
+import os
+import shutil
+
+import pytest
+
+import animation_cache
+from animation_cache import AnimationCache, SOURCE_FILES, animation_names, cache_key
+from hardware import MemoryBackend
+from led_manager import LEDManager
+
+
+@pytest.fixture
+def cache_path(tmp_path):
+    path = str(tmp_path / 'animations.bin')
+    animation_cache.build(path)
+    return path
+
+
+@pytest.fixture
+def no_rebuild(monkeypatch):
+    def build(path):
+        raise AssertionError(f"Cache rebuilt: {path}")
+    monkeypatch.setattr(animation_cache, 'build', build)
+
+
+@pytest.fixture
+def rebuilds(monkeypatch):
+    """Paths the cache is rebuilt at."""
+    calls = []
+    build = animation_cache.build
+
+    def counting_build(path):
+        calls.append(path)
+        return build(path)
+    monkeypatch.setattr(animation_cache, 'build', counting_build)
+    return calls
+
+
+def new_leds(cache):
+    return LEDManager(MemoryBackend(record_frames=False), animation_cache=cache)
+
+
+def test_current_cache_is_used_as_is(cache_path, no_rebuild):
+    cache = AnimationCache(cache_path)
+    try:
+        assert set(cache.index) == set(animation_names())
+    finally:
+        cache.close()
+
+
+def test_missing_cache_is_built(tmp_path, rebuilds):
+    path = str(tmp_path / 'animations.bin')
+    AnimationCache(path).close()
+    assert rebuilds == [path]
+
+
+@pytest.mark.parametrize('name', SOURCE_FILES)
+def test_key_changes_with_every_source_file(tmp_path, monkeypatch, name):
+    repo = os.path.dirname(os.path.abspath(animation_cache.__file__))
+    here = tmp_path / 'src'
+    here.mkdir()
+    for source in SOURCE_FILES:
+        shutil.copy(os.path.join(repo, source), here / source)
+    monkeypatch.setattr(animation_cache, '__file__', str(here / 'animation_cache.py'))
+    before = cache_key()
+    with open(here / name, 'a') as f:
+        f.write('\n# changed\n')
+    assert cache_key() != before
+
+
+def test_stale_key_rebuilds(cache_path, monkeypatch, rebuilds):
+    monkeypatch.setattr(animation_cache, 'cache_key', lambda: b'\x01' * 32)
+    AnimationCache(cache_path).close()
+    assert rebuilds == [cache_path]
+    # The rebuilt file carries the new key and is used as is
+    AnimationCache(cache_path).close()
+    assert rebuilds == [cache_path]
+
+
+@pytest.mark.parametrize('damage', ['truncate', 'magic', 'version'])
+def test_damaged_cache_rebuilds(cache_path, rebuilds, damage):
+    with open(cache_path, 'r+b') as f:
+        data = bytearray(f.read())
+        if damage == 'truncate':
+            del data[-7:]
+        elif damage == 'magic':
+            data[0:4] = b'XXXX'
+        else:
+            data[4] += 1
+        f.seek(0)
+        f.truncate()
+        f.write(data)
+    AnimationCache(cache_path).close()
+    assert rebuilds == [cache_path]
+
+
+def frames_of(leds, frames):
+    """Back buffers and output table after every step of an animation."""
+    shown = []
+    for hold in frames:
+        shown.append(([bytes(frame) for frame in leds.compositor.frames.values()],
+                      leds.compositor.lut, hold))
+    return shown
+
+
+@pytest.mark.parametrize('name', ['startup', 'draw', 'win:0,4,8', 'win:2,5,8'])
+def test_cached_frames_match_live_rendering(cache_path, name):
+    cache = AnimationCache(cache_path)
+    try:
+        live = new_leds(None)
+        cached = new_leds(cache)
+        render = animation_names()[name]
+        expected = frames_of(live, render(live))
+        played = frames_of(cached, cache.frames(cached, name))
+        # The cache stores the state an animation leaves behind as one
+        # last frame with no hold
+        if len(played) == len(expected) + 1:
+            assert played[-1][2] == 0
+            played.pop()
+        assert len(played) == len(expected)
+        for (frame, lut, hold), (want_frame, want_lut, want_hold) in zip(played, expected):
+            assert frame == want_frame
+            assert lut == want_lut
+            assert hold == pytest.approx(want_hold)
+    finally:
+        cache.close()
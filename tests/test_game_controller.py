@@ -0,0 +1,101 @@
+"""Tests for win detection on boards of any geometry."""
+
+import random
+
+import pytest
+
+from game_controller import GameController, winning_lines
+
+GEOMETRIES = [
+    (3, 3, 3),
+    (4, 4, 3),
+    (4, 4, 4),
+    (5, 3, 3),
+    (3, 5, 3),
+    (7, 6, 4),
+    (6, 1, 3),
+]
+
+
+def new_game(width, height, win_length):
+    return GameController(verbose=False, width=width, height=height,
+                          win_length=win_length, metrics=False)
+
+
+def completed_line(lines, bits):
+    """First line fully held in a player's bitmask, or None."""
+    for line in lines:
+        if all(bits >> panel & 1 for panel in line):
+            return line
+    return None
+
+
+@pytest.mark.parametrize('width,height,win_length', GEOMETRIES)
+def test_random_games_match_brute_force(width, height, win_length):
+    lines = winning_lines(width, height, win_length)
+    rng = random.Random(width * 100 + height * 10 + win_length)
+    for _ in range(300):
+        game = new_game(width, height, win_length)
+        panels = list(range(width * height))
+        rng.shuffle(panels)
+        for panel in panels:
+            player = game.get_current_player()
+            assert game.make_move(panel)
+            bits = game.x_bits if player == 'X' else game.o_bits
+            won = completed_line(lines, bits) is not None
+            if won:
+                assert game.get_winner() == player
+                line = game.get_winning_line()
+                assert sorted(line) in lines
+                assert panel in line
+                assert all(bits >> p & 1 for p in line)
+                break
+            assert game.get_winner() is None
+            assert game.is_game_over() == (panel == panels[-1])
+        else:
+            assert game.is_draw()
+
+
+@pytest.mark.parametrize('width,height,win_length,moves,winner', [
+    # Rows do not continue onto the next row
+    (4, 4, 3, [2, 8, 3, 9, 4, 12], None),
+    # Diagonal and anti-diagonal on a wide board
+    (5, 3, 3, [1, 0, 7, 5, 13], 'X'),
+    (5, 3, 3, [4, 0, 8, 1, 12], 'X'),
+    # Column on a tall board, won by O
+    (3, 5, 3, [0, 4, 2, 7, 12, 10], 'O'),
+    # Four in a row joined in the middle
+    (7, 6, 4, [0, 7, 1, 8, 3, 9, 2], 'X'),
+])
+def test_known_games(width, height, win_length, moves, winner):
+    game = new_game(width, height, win_length)
+    for move in moves:
+        assert game.make_move(move)
+    assert game.get_winner() == winner
+    if winner is not None:
+        assert game.is_game_over()
+        assert set(game.get_winning_line()) <= set(moves)
+
+
+def test_no_moves_after_the_game_is_over():
+    game = new_game(3, 3, 3)
+    for move in (0, 3, 1, 4, 2):
+        game.make_move(move)
+    assert game.get_winner() == 'X'
+    assert not game.make_move(8)
+
+
+def test_reset_clears_runs():
+    game = new_game(4, 4, 3)
+    for move in (0, 4, 1, 5):
+        game.make_move(move)
+    game.reset_game(log=False)
+    # Panels 0 and 1 no longer count towards X's row
+    for move in (2, 5, 6, 9):
+        game.make_move(move)
+    assert not game.is_game_over()
+
+
+def test_win_length_larger_than_board_is_rejected():
+    with pytest.raises(ValueError):
+        new_game(3, 3, 4)
@@ -0,0 +1,99 @@
+"""Tests for encoding and decoding the binary game log."""
+
+import pytest
+
+import game_log
+from game_log import GameLog, GameRecord, read_games, summarize
+
+
+def write(path, records, **geometry):
+    log = GameLog(str(path), **geometry)
+    for record in records:
+        log.append(record)
+    log.close()
+    return log
+
+
+def test_round_trip(tmp_path):
+    path = tmp_path / 'games.log'
+    records = [
+        GameRecord(1700000000.25, [0, 3, 1, 4, 2], [0.5, 1.0, 1.5, 2.0, 2.5],
+                   'X', [0, 1, 2]),
+        GameRecord(1700000100.0, [4, 0, 8, 2, 1, 7, 6, 3, 5],
+                   [0.1 * (i + 1) for i in range(9)]),
+        GameRecord(1700000200.5, [0, 4, 1, 2, 8, 6], [1, 2, 3, 4, 5, 6],
+                   'O', [2, 4, 6]),
+        GameRecord(1700000300.0, [], []),
+    ]
+    log = write(path, records)
+    assert log.written == len(records)
+
+    games = list(read_games(str(path)))
+    assert len(games) == len(records)
+    for game, record in zip(games, records):
+        assert game.start == record.start
+        assert game.moves == record.moves
+        assert game.winner == record.winner
+        assert game.winning_line == record.winning_line
+        assert game.times == pytest.approx(record.times, abs=0.001)
+
+
+def test_round_trip_on_a_larger_board(tmp_path):
+    path = tmp_path / 'games.log'
+    moves = list(range(16))
+    record = GameRecord(5.0, moves, [i / 4 for i in moves], 'X', [0, 5, 10])
+    write(path, [record], width=4, height=4, win_length=3)
+    game, = read_games(str(path))
+    assert game.moves == moves
+    assert game.winning_line == [0, 5, 10]
+
+
+def test_move_time_edge_cases(tmp_path):
+    path = tmp_path / 'games.log'
+    times = [-2.5, 0.0, 0.0004, 1.9999, 5e9]
+    write(path, [GameRecord(0.0, [0, 1, 2, 3, 4], times)])
+    game, = read_games(str(path))
+    # Negative times clamp to 0, times are stored in whole milliseconds,
+    # and times past the uint32 range saturate
+    assert game.times == [0.0, 0.0, 0.0, 1.999, 0xFFFFFFFF / 1000]
+
+
+def test_torn_record_is_dropped_on_reopen(tmp_path):
+    path = tmp_path / 'games.log'
+    first = GameRecord(1.0, [4], [0.5])
+    write(path, [first])
+    with open(path, 'ab') as f:
+        f.write(b'\x01\x02\x03')
+
+    write(path, [GameRecord(2.0, [0, 4], [0.1, 0.2])])
+    assert [game.start for game in read_games(str(path))] == [1.0, 2.0]
+
+
+def test_torn_record_is_ignored_when_reading(tmp_path):
+    path = tmp_path / 'games.log'
+    write(path, [GameRecord(1.0, [4], [0.5])])
+    with open(path, 'ab') as f:
+        f.write(b'\x00' * 5)
+    assert len(list(read_games(str(path)))) == 1
+
+
+def test_reads_across_chunks(tmp_path, monkeypatch):
+    monkeypatch.setattr(game_log, 'READ_CHUNK', 3)
+    path = tmp_path / 'games.log'
+    write(path, [GameRecord(float(i), [i % 9], [0.25]) for i in range(10)])
+    assert [game.start for game in read_games(str(path))] == [float(i) for i in range(10)]
+    assert summarize(str(path))['draws'] == 10
+
+
+def test_geometry_mismatch_is_rejected(tmp_path):
+    path = tmp_path / 'games.log'
+    write(path, [])
+    with pytest.raises(ValueError):
+        GameLog(str(path), width=4, height=4, win_length=3)
+
+
+def test_other_files_are_rejected(tmp_path):
+    path = tmp_path / 'games.log'
+    path.write_bytes(b'not a game log at all')
+    with pytest.raises(ValueError):
+        list(read_games(str(path)))
@@ -0,0 +1,120 @@
+"""Tests for the perfect-play solver table."""
+
+import random
+from functools import lru_cache
+
+import pytest
+
+import solver
+from game_controller import GameController
+
+
+@pytest.fixture(scope='module')
+def table(tmp_path_factory):
+    path = str(tmp_path_factory.mktemp('solver') / 'solver_table.bin')
+    table = solver.Solver(path, rng=random.Random(0))
+    yield table
+    table.close()
+
+
+@lru_cache(maxsize=None)
+def brute_force(mover, other):
+    """Negamax value of a position for the side to move: 1, 0 or -1."""
+    if solver._has_line(other):
+        return -1
+    empty = solver.FULL_MASK & ~(mover | other)
+    if not empty:
+        return 0
+    return max(-brute_force(other, mover | 1 << cell)
+               for cell in range(9) if empty >> cell & 1)
+
+
+def reachable():
+    """Every position a legal game reaches, as (x_bits, o_bits)."""
+    seen = set()
+
+    def visit(x_bits, o_bits):
+        if (x_bits, o_bits) in seen:
+            return
+        seen.add((x_bits, o_bits))
+        if solver._has_line(x_bits) or solver._has_line(o_bits):
+            return
+        empty = solver.FULL_MASK & ~(x_bits | o_bits)
+        x_to_move = bin(x_bits).count('1') == bin(o_bits).count('1')
+        for cell in range(9):
+            if empty >> cell & 1:
+                if x_to_move:
+                    visit(x_bits | 1 << cell, o_bits)
+                else:
+                    visit(x_bits, o_bits | 1 << cell)
+
+    visit(0, 0)
+    return seen
+
+
+def test_table_has_one_slot_per_board_code(table):
+    assert table.count == 3 ** 9
+
+
+def test_every_reachable_position_is_in_the_table(table):
+    positions = reachable()
+    assert len(positions) == 5478
+    for x_bits, o_bits in positions:
+        table.lookup(x_bits, o_bits)
+
+
+def test_unreachable_positions_raise_key_error(table):
+    # X cannot be two marks ahead, and a panel cannot hold both marks
+    with pytest.raises(KeyError):
+        table.lookup(0b11, 0)
+    with pytest.raises(KeyError):
+        table.lookup(0b1, 0b1)
+
+
+def test_values_and_best_moves_match_brute_force():
+    positions = random.Random(1).sample(sorted(reachable()), 300)
+    entries = solver.solve()
+    for x_bits, o_bits in positions:
+        x_to_move = bin(x_bits).count('1') == bin(o_bits).count('1')
+        mover, other = (x_bits, o_bits) if x_to_move else (o_bits, x_bits)
+        entry = entries[solver.position_code(x_bits, o_bits)]
+        value = entry >> solver.VALUE_SHIFT
+        expected = brute_force(mover, other)
+        assert value == {1: solver.WIN, 0: solver.DRAW, -1: solver.LOSS}[expected]
+        for cell in range(9):
+            if entry >> cell & 1:
+                assert -brute_force(other, mover | 1 << cell) == expected
+
+
+def test_best_move_never_loses(table):
+    rng = random.Random(2)
+    for game_num in range(200):
+        game = GameController(verbose=False, width=3, height=3, win_length=3,
+                              metrics=False)
+        ai = 'XO'[game_num % 2]
+        while not game.is_game_over():
+            if game.get_current_player() == ai:
+                move = table.best_move(game)
+            else:
+                move = rng.choice([i for i in range(9) if game.is_valid_move(i)])
+            assert game.make_move(move)
+        assert game.get_winner() in (ai, None)
+
+
+def test_best_move_is_none_when_the_game_is_over(table):
+    game = GameController(verbose=False, width=3, height=3, win_length=3,
+                          metrics=False)
+    for move in (0, 3, 1, 4, 2):
+        game.make_move(move)
+    assert table.best_move(game) is None
+
+
+def test_stale_table_file_is_regenerated(tmp_path):
+    path = tmp_path / 'solver_table.bin'
+    path.write_bytes(b'TTTS\x01\x00')
+    table = solver.Solver(str(path))
+    try:
+        assert table.count == 3 ** 9
+        assert table.lookup(0, 0)[0] == solver.DRAW
+    finally:
+        table.close()
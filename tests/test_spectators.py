@@ -0,0 +1,107 @@
+"""Tests for the spectator update stream."""
+
+import socket
+
+import pytest
+
+from spectators import SpectatorServer, read_updates
+
+
+def decode(data):
+    """Decode a byte stream as a client would receive it."""
+    ours, theirs = socket.socketpair()
+    with ours, theirs:
+        theirs.sendall(data)
+        theirs.shutdown(socket.SHUT_WR)
+        return list(read_updates(ours))
+
+
+def board(width=3, height=3, win_length=3, turn=1, result=0, marks=None, line=None):
+    marks = bytes(marks or [0] * (width * height))
+    line = bytes(line or []).ljust(win_length, b'\xff')
+    return bytes((ord('S'), width, height, win_length, turn, result)) + marks + line
+
+
+def test_decodes_every_message_type():
+    data = (board(marks=[1, 0, 0, 0, 2, 0, 0, 0, 0], turn=1)
+            + b'M\x08\x01' + b'T\x02' + b'W\x01\x00\x04\x08' + b'D' + b'R')
+    updates = decode(data)
+    assert updates == [
+        ('board', {
+            'width': 3, 'height': 3, 'win_length': 3,
+            'turn': 'X', 'winner': None, 'draw': False,
+            'marks': ['X', None, None, None, 'O', None, None, None, None],
+            'winning_line': [],
+        }),
+        ('move', (8, 'X')),
+        ('turn', 'O'),
+        ('win', ('X', [0, 4, 8])),
+        ('draw', None),
+        ('reset', None),
+    ]
+
+
+@pytest.mark.parametrize('result,winner,draw', [(1, 'X', False), (2, 'O', False), (3, None, True)])
+def test_decodes_finished_boards(result, winner, draw):
+    (kind, fields), = decode(board(result=result, line=[2, 4, 6] if winner else None))
+    assert kind == 'board'
+    assert fields['winner'] == winner
+    assert fields['draw'] == draw
+    assert fields['winning_line'] == ([2, 4, 6] if winner else [])
+
+
+def test_win_line_length_follows_the_board():
+    data = board(width=4, height=4, win_length=4) + b'W\x02\x00\x05\x0a\x0f' + b'T\x01'
+    updates = decode(data)
+    assert updates[1] == ('win', ('O', [0, 5, 10, 15]))
+    assert updates[2] == ('turn', 'X')
+
+
+def test_unknown_message_raises():
+    with pytest.raises(ValueError):
+        decode(board() + b'?')
+
+
+def connect(server):
+    sock = socket.create_connection(('127.0.0.1', server.port))
+    sock.settimeout(5.0)
+    return sock, read_updates(sock)
+
+
+def test_server_stream_round_trip():
+    server = SpectatorServer(0, host='127.0.0.1', width=4, height=4, win_length=3)
+    try:
+        sock, updates = connect(server)
+        with sock:
+            kind, fields = next(updates)
+            assert kind == 'board'
+            assert fields['marks'] == [None] * 16
+
+            server.move(5, 'X')
+            server.turn('O')
+            server.win('X', [0, 5, 10])
+            server.reset()
+            assert next(updates) == ('move', (5, 'X'))
+            assert next(updates) == ('turn', 'O')
+            assert next(updates) == ('win', ('X', [0, 5, 10]))
+            assert next(updates) == ('reset', None)
+    finally:
+        server.close()
+
+
+def test_late_client_gets_the_current_board():
+    server = SpectatorServer(0, host='127.0.0.1')
+    try:
+        server.move(4, 'X')
+        server.turn('O')
+        server.move(0, 'O')
+        server.draw()
+        sock, updates = connect(server)
+        with sock:
+            kind, fields = next(updates)
+            assert kind == 'board'
+            assert fields['marks'] == ['O', None, None, None, 'X', None, None, None, None]
+            assert fields['turn'] == 'O'
+            assert fields['draw']
+    finally:
+        server.close()
@@ -3,23 +3,26 @@ Turn Indicator LED Controller
 Controls red and blue LEDs to show which player's turn it is
 """
 
-import RPi.GPIO as GPIO
+import time
 from config import TURN_LED_PINS
+from hardware import get_backend
 
 
 class TurnIndicator:
     """Manages the turn indicator LEDs (red for X, blue for O)."""
     
-    def __init__(self):
-        """Initialize turn indicator LEDs."""
-        # GPIO should already be set up by ButtonHandler
-        # But we set mode again in case this is used standalone
-        GPIO.setmode(GPIO.BCM)
+    def __init__(self, backend=None):
+        """
+        Initialize turn indicator LEDs.
+        
+        Args:
+            backend: Hardware backend (default: the process-wide backend)
+        """
+        self.backend = backend or get_backend()
         
-        # Configure LED pins as outputs
+        # Configure LED pins as outputs (they start off)
         for player, pin in TURN_LED_PINS.items():
-            GPIO.setup(pin, GPIO.OUT)
-            GPIO.output(pin, GPIO.LOW)  # Start with LEDs off
+            self.backend.setup_output(pin)
         
         print("Turn indicator initialized")
     
@@ -32,40 +35,55 @@ class TurnIndicator:
         """
         if player == 'X':
             # Turn on red LED, turn off blue LED
-            GPIO.output(TURN_LED_PINS['X'], GPIO.HIGH)
-            GPIO.output(TURN_LED_PINS['O'], GPIO.LOW)
+            self.backend.write_output(TURN_LED_PINS['X'], True)
+            self.backend.write_output(TURN_LED_PINS['O'], False)
             print("Turn indicator: Player X (Red)")
         elif player == 'O':
             # Turn on blue LED, turn off red LED
-            GPIO.output(TURN_LED_PINS['X'], GPIO.LOW)
-            GPIO.output(TURN_LED_PINS['O'], GPIO.HIGH)
+            self.backend.write_output(TURN_LED_PINS['X'], False)
+            self.backend.write_output(TURN_LED_PINS['O'], True)
             print("Turn indicator: Player O (Blue)")
     
-    def flash_winner(self, player, times=5):
+    def flash_frames(self, player, times=5):
         """
-        Flash the winning player's LED.
+        Frames that flash the winning player's LED.
         
         Args:
             player: 'X' or 'O'
             times: Number of times to flash
+            
+        Yields:
+            Seconds to hold each on/off state
         """
-        import time
-        
         pin = TURN_LED_PINS.get(player)
         if pin is None:
             return
         
+        try:
+            for _ in range(times):
+                self.backend.write_output(pin, True)
+                yield 0.2
+                self.backend.write_output(pin, False)
+                yield 0.2
+        finally:
+            self.backend.write_output(pin, False)
+    
+    def flash_winner(self, player, times=5):
+        """
+        Flash the winning player's LED.
+        
+        Args:
+            player: 'X' or 'O'
+            times: Number of times to flash
+        """
         print(f"Flashing winner: Player {player}")
-        for _ in range(times):
-            GPIO.output(pin, GPIO.HIGH)
-            time.sleep(0.2)
-            GPIO.output(pin, GPIO.LOW)
-            time.sleep(0.2)
+        for hold in self.flash_frames(player, times):
+            time.sleep(hold)
     
     def turn_off_all(self):
         """Turn off both indicator LEDs."""
         for pin in TURN_LED_PINS.values():
-            GPIO.output(pin, GPIO.LOW)
+            self.backend.write_output(pin, False)
         print("Turn indicators off")
     
     def cleanup(self):